@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module is the library interface of case_dfxml, for converting between DFXML and CASE within a Python process, without writing files or running the command-line programs.  Its public names are also available from the case_dfxml package.
+
+dfxml_to_triples maps DFXML objects, or the events of a DFXML reader, to CASE triples, as dfxml_to_case does.  case_to_dfxml_events assembles dfxml.objects volumes and files from a CASE graph, or from an iterable of triples, as case_to_dfxml does.  Both are generators, so callers can process output as it is produced.
+"""
+
+__version__ = "0.1.0"
+
+from typing import Any, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from case_utils.namespace import NS_UCO_OBSERVABLE
+from rdflib import Graph, Namespace, URIRef
+
+from case_dfxml.case_index import (
+    MAPPED_PREDICATES,
+    CaseIndex,
+    instances,
+    subclass_closure,
+)
+from case_dfxml.dfxml_reader import FILE_PROPERTY_NAMES, VolumeRecord
+from case_dfxml.dfxml_writer import DFXMLWriter
+from case_dfxml.mapping import HashInterner
+from case_dfxml.minting import NodeMinter
+from case_dfxml.sinks import GraphLike, ListSink, Triple, TripleSink, add_triples
+from case_dfxml.traces import EventMapper, dfxml_classes
+
+DEFAULT_KB_PREFIX_IRI = "http://example.org/kb/"
+
+
+def _dfxml_events(dfxml_input: Iterable[Any]) -> Iterator[Tuple[str, Any]]:
+    """
+    Pass through (event, object) pairs, and convert bare objects to the events a reader would yield for them.
+    """
+    classes: Optional[Tuple[Tuple[Any, ...], ...]] = None
+    for member in dfxml_input:
+        if isinstance(member, tuple):
+            yield member
+            continue
+        if classes is None:
+            classes = dfxml_classes()
+        image_classes, volume_classes, file_classes = classes
+        if isinstance(member, file_classes):
+            yield ("end", member)
+        elif isinstance(member, image_classes + volume_classes):
+            yield ("start", member)
+            yield ("end", member)
+        else:
+            raise TypeError("Unsupported DFXML object: %r." % member)
+
+
+def dfxml_to_triples(
+    dfxml_input: Iterable[Any],
+    *args: Any,
+    delta_annotations: bool = False,
+    hash_cache_size: int = 65536,
+    ns_kb: Union[str, Namespace] = DEFAULT_KB_PREFIX_IRI,
+    node_minter: Optional[NodeMinter] = None,
+    sink: Optional[GraphLike] = None,
+    use_inherent_uuids: bool = False,
+    **kwargs: Any
+) -> Iterator[Triple]:
+    """
+    Generator.  Maps DFXML to CASE triples, yielding the triples of each object as it is read from dfxml_input.
+
+    dfxml_input yields either (event, object) pairs, as yielded by dfxml.objects.iterparse and case_dfxml.dfxml_reader.iterparse, or bare disk image, volume and file objects of either module.  Files are only related to their volumes and disk images when read as events.  Node IRIs are minted in ns_kb, by node_minter if provided.  delta_annotations, hash_cache_size and use_inherent_uuids match the dfxml_to_case options --delta, --hash-cache-size and --use-inherent-uuids.  If sink, an rdflib Graph or a case_dfxml.sinks.TripleSink, is provided, each triple is also added to it before it is yielded, and a TripleSink is flushed after each object; closing it is left to the caller.
+
+    >>> import io
+    >>> from case_dfxml import dfxml_reader
+    >>> from rdflib import Literal
+    >>> dfxml_text = b'''<dfxml xmlns="%s" version="1.2.0">
+    ...   <volume><ftype_str>fat16</ftype_str>
+    ...     <fileobject><filename>a.txt</filename><filesize>3</filesize></fileobject>
+    ...   </volume>
+    ... </dfxml>''' % dfxml_reader.XMLNS_DFXML.encode()
+    >>> graph = Graph()
+    >>> triples = list(dfxml_to_triples(dfxml_reader.iterparse(io.BytesIO(dfxml_text)), sink=graph))
+    >>> len(triples) == len(graph)
+    True
+    >>> len(list(graph.subjects(NS_UCO_OBSERVABLE.filePath, Literal("a.txt"))))
+    1
+    """
+    if isinstance(ns_kb, str):
+        ns_kb = Namespace(ns_kb)
+    buffer = ListSink()
+    event_mapper = EventMapper(
+        buffer,
+        ns_kb,
+        delta_annotations=delta_annotations,
+        hash_interner=HashInterner(maxsize=hash_cache_size),
+        node_minter=node_minter,
+        use_inherent_uuids=use_inherent_uuids,
+    )
+
+    def _flush() -> Iterator[Triple]:
+        if sink is not None:
+            add_triples(sink, buffer.triples)
+            if isinstance(sink, TripleSink):
+                sink.flush()
+        yield from buffer.triples
+        buffer.triples.clear()
+
+    # Definitions inlined before the first object.
+    yield from _flush()
+    for event, obj in _dfxml_events(dfxml_input):
+        event_mapper.map_event(event, obj)
+        yield from _flush()
+
+
+class DFXMLAssembler:
+    """
+    Assembles the DFXML volumes and files of a CASE graph.  The graph is indexed when the assembler is constructed, and objects are assembled as events are iterated.  Instances of uco-observable:File and uco-observable:FileSystem are selected, including instances of their subclasses declared in the graph, or in the subclass hierarchy of the packaged CASE version built_version.
+    """
+
+    def __init__(
+        self, graph: Graph, *args: Any, built_version: str = "none", **kwargs: Any
+    ) -> None:
+        import case_utils.ontology
+
+        hierarchy_graph = Graph()
+        case_utils.ontology.load_subclass_hierarchy(
+            hierarchy_graph, built_version=built_version
+        )
+        self.graph = graph
+        self.n_file_classes = subclass_closure(
+            NS_UCO_OBSERVABLE.File, graph, hierarchy_graph
+        )
+        self.n_file_system_classes = subclass_closure(
+            NS_UCO_OBSERVABLE.FileSystem, graph, hierarchy_graph
+        )
+
+        # Get set of all files.
+        self.n_files: Set[URIRef] = set()
+        for n_file in instances(graph, self.n_file_classes):
+            assert isinstance(n_file, URIRef)
+            self.n_files.add(n_file)
+
+        # Extract the properties mapped to DFXML in one pass over the graph.
+        self.case_index = CaseIndex()
+        self.case_index.add_graph(graph)
+        self.case_index.add_relationships(graph)
+
+    @property
+    def file_count(self) -> int:
+        return len(self.n_files)
+
+    def records(self) -> Iterator[Tuple[str, Any]]:
+        """
+        Generator.  Yields ("start", VolumeRecord) for each file system, ("end", FileRecord) for each of its files, and ("end", VolumeRecord) after them, followed by ("end", FileRecord) for each file not in a file system.  Records are of case_dfxml.dfxml_reader.
+        """
+        case_index = self.case_index
+        # Files not yet yielded.
+        n_files = set(self.n_files)
+
+        for n_file_system in instances(self.graph, self.n_file_system_classes):
+            assert isinstance(n_file_system, URIRef)
+            l_ftype_str = case_index.file_system_type(n_file_system)
+
+            volume_record = VolumeRecord()
+            if l_ftype_str:
+                # File system names are lowercased in DFXML.
+                volume_record.ftype_str = l_ftype_str.toPython().lower()
+            volume_record.partition_offset = case_index.partition_offset(n_file_system)
+            yield ("start", volume_record)
+
+            for n_child in case_index.child_of_sources.get(n_file_system, dict()):
+                assert isinstance(n_child, URIRef)
+                yield ("end", case_index.file_record(n_child))
+                n_files.discard(n_child)
+
+            yield ("end", volume_record)
+
+        for n_file in n_files:
+            yield ("end", case_index.file_record(n_file))
+
+    def events(self, writer: Optional[DFXMLWriter] = None) -> Iterator[Tuple[str, Any]]:
+        """
+        Generator.  Yields the events of records as dfxml.objects events, as described for dfxml_object_events.
+        """
+        return dfxml_object_events(self.records(), writer=writer)
+
+
+def dfxml_object_events(
+    record_events: Iterable[Tuple[str, Any]],
+    *args: Any,
+    writer: Optional[DFXMLWriter] = None,
+    **kwargs: Any
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Generator.  Converts the volume and file record events of DFXMLAssembler.records to ("start", VolumeObject), ("end", FileObject) and ("end", VolumeObject) events of dfxml.objects; a volume's files are not appended to it.  If writer is provided, each volume and file is also written to it; writing the header and closing it are left to the caller.
+    """
+    from dfxml import objects as Objects
+
+    # The volume objects of the volumes being read.
+    volume_stack: List[Objects.VolumeObject] = []
+    for event, record in record_events:
+        if isinstance(record, VolumeRecord):
+            if event == "start":
+                # Define DFXML object.
+                fsobj = Objects.VolumeObject()
+
+                # Map.
+                if record.ftype_str:
+                    fsobj.ftype_str = record.ftype_str
+                if record.partition_offset is not None:
+                    fsobj.partition_offset = record.partition_offset
+
+                # The incremental writer needs the volume's own properties
+                # mapped before its opening tag is written.
+                if writer is not None:
+                    writer.open_volume(fsobj)
+                volume_stack.append(fsobj)
+                yield ("start", fsobj)
+            else:
+                fsobj = volume_stack.pop()
+                if writer is not None:
+                    writer.close_volume()
+                yield ("end", fsobj)
+            continue
+
+        # Assemble FileObject on-demand.
+        fobj = Objects.FileObject()
+        for field_name in FILE_PROPERTY_NAMES:
+            value = getattr(record, field_name)
+            if value is not None:
+                setattr(fobj, field_name, value)
+        if writer is not None:
+            writer.write_file(fobj)
+        yield ("end", fobj)
+
+
+def _mapped_graph(triples: Iterable[Triple]) -> Graph:
+    """
+    Load the triples DFXMLAssembler reads into a new graph.
+    """
+    graph = Graph()
+    batch: List[Triple] = []
+    for triple in triples:
+        if triple[1] in MAPPED_PREDICATES:
+            batch.append(triple)
+            if len(batch) >= 65536:
+                add_triples(graph, batch)
+                batch = []
+    add_triples(graph, batch)
+    return graph
+
+
+def case_to_dfxml_events(
+    case_input: Union[Graph, Iterable[Triple]],
+    *args: Any,
+    built_version: str = "none",
+    writer: Optional[DFXMLWriter] = None,
+    **kwargs: Any
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Index a CASE graph, and return a generator of its DFXML volume and file events, as described for DFXMLAssembler.events.  case_input is either an rdflib Graph, or an iterable of triples, of which only those with predicates case_to_dfxml maps are kept.  built_version matches the case_to_dfxml option --built-version.  If writer, a case_dfxml.dfxml_writer.DFXMLWriter, is provided, each volume and file is also written to it.
+    """
+    graph = case_input if isinstance(case_input, Graph) else _mapped_graph(case_input)
+    return DFXMLAssembler(graph, built_version=built_version).events(writer=writer)
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This script converts many DFXML files to CASE in one run, on a pool of long-lived worker processes.  Each conversion is done as by dfxml_to_case, with the same options, but without paying for interpreter start-up and imports per file.
+
+Conversions are listed either by a manifest file, of one tab-separated input and output path pair per line, or by an input directory, whose DFXML files are converted into a mirrored output directory.  Options not recognized by this script are passed to each conversion as dfxml_to_case options, except for the options naming a file written by each run, --stats, --profile and --progress-file.  A failed conversion does not stop the others; failures are summarized at the end, and optionally written with all conversions' timing to a JSON report.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import concurrent.futures
+import json
+import logging
+import os
+import sys
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from case_dfxml import dfxml_to_case
+
+_logger = logging.getLogger(os.path.basename(__file__))
+
+# The argument vector prefix of a standalone dfxml_to_case run, as seen
+# by a worker process.
+_worker_command: str = "dfxml_to_case"
+
+_worker_argument_parser: Optional[argparse.ArgumentParser] = None
+
+# dfxml_to_case options naming a file written by the run, and their
+# argument destinations.
+_PER_RUN_OUTPUT_OPTIONS: Tuple[Tuple[str, str], ...] = (
+    ("--profile", "profile"),
+    ("--progress-file", "progress_file"),
+    ("--stats", "stats"),
+)
+
+
+def read_manifest(manifest_path: str) -> List[Tuple[str, str]]:
+    """
+    Read (input, output) path pairs from a manifest file.  Each line holds an input path and an output path, separated by a tab.  Blank lines and lines starting with "#" are skipped.  Relative paths are relative to the manifest file's directory.
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     manifest_path = os.path.join(tmpdir, "manifest.tsv")
+    ...     with open(manifest_path, "w") as out_fh:
+    ...         _ = out_fh.write("# Partitions\\np1.dfxml\\tp1.ttl\\n\\n")
+    ...     [tuple(os.path.relpath(x, tmpdir) for x in pair) for pair in read_manifest(manifest_path)]
+    [('p1.dfxml', 'p1.ttl')]
+    """
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+    pairs: List[Tuple[str, str]] = []
+    with open(manifest_path, "r", encoding="utf-8") as in_fh:
+        for line_number, line in enumerate(in_fh, start=1):
+            line = line.rstrip("\n")
+            if line.strip() == "" or line.startswith("#"):
+                continue
+            fields = line.split("\t")
+            if len(fields) != 2:
+                raise ValueError(
+                    "%s:%d: Expected an input and an output path, separated by a tab."
+                    % (manifest_path, line_number)
+                )
+            pairs.append(
+                (
+                    os.path.join(manifest_dir, fields[0]),
+                    os.path.join(manifest_dir, fields[1]),
+                )
+            )
+    return pairs
+
+
+def directory_pairs(
+    input_dir: str,
+    output_dir: str,
+    *args: Any,
+    pattern: str,
+    extension: str,
+    **kwargs: Any
+) -> List[Tuple[str, str]]:
+    """
+    List (input, output) path pairs for the files under input_dir matching pattern.  Each output path mirrors its input path under output_dir, with its suffix replaced by extension.
+    """
+    pairs: List[Tuple[str, str]] = []
+    for in_path in sorted(Path(input_dir).rglob(pattern)):
+        if not in_path.is_file():
+            continue
+        out_path = Path(output_dir) / in_path.relative_to(input_dir)
+        pairs.append((str(in_path), str(out_path.with_suffix("." + extension))))
+    return pairs
+
+
+def _init_batch_worker(command: str) -> None:
+    global _worker_command
+    global _worker_argument_parser
+    _worker_command = command
+    _worker_argument_parser = dfxml_to_case.make_argument_parser()
+    # Import the conversion modules when the worker starts, instead of
+    # in its first conversion.
+    import case_dfxml.traces  # noqa: F401
+
+
+def _convert(argv: List[str]) -> Tuple[Optional[str], float]:
+    """
+    Worker-process function.  Runs one conversion, with dfxml_to_case command-line arguments argv.  Returns an error description, or None on success, and the conversion's duration in seconds.
+    """
+    assert _worker_argument_parser is not None
+    start_time = time.perf_counter()
+    # Set the command line a standalone run would have, so non-random
+    # UUIDs requested through cdo_local_uuid match those of a standalone
+    # run with the same arguments.  Each conversion's NodeMinter counts
+    # its own UUIDs.
+    sys.argv = [_worker_command] + argv
+    error: Optional[str] = None
+    try:
+        args = dfxml_to_case.parse_args(_worker_argument_parser, argv)
+        os.makedirs(os.path.dirname(os.path.abspath(args.out_graph)), exist_ok=True)
+        dfxml_to_case.convert(args)
+    except SystemExit as e:
+        error = "Invalid dfxml_to_case arguments (exit status %s)." % e.code
+    except Exception as e:
+        _logger.debug("Conversion failed.", exc_info=True)
+        error = "".join(traceback.format_exception_only(type(e), e)).strip()
+    return (error, time.perf_counter() - start_time)
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(
+        description=__doc__,
+        epilog="Options not listed here are passed to each conversion as dfxml_to_case options, e.g. --fast-reader, --streaming, or --output-format.",
+    )
+    argument_parser.add_argument("-d", "--debug", action="store_true")
+    input_group = argument_parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument(
+        "--manifest",
+        help="File listing conversions, one per line, as an input DFXML path and an output graph path separated by a tab.",
+    )
+    input_group.add_argument(
+        "--input-dir",
+        help="Directory of DFXML files to convert, searched recursively.  Requires --output-dir.",
+    )
+    argument_parser.add_argument(
+        "--output-dir",
+        help="With --input-dir, the directory to write graphs to, mirroring the layout of the input directory.",
+    )
+    argument_parser.add_argument(
+        "--input-pattern",
+        default="*.dfxml",
+        help="With --input-dir, the file name pattern of input files.  (Default: %(default)s.)",
+    )
+    argument_parser.add_argument(
+        "--output-extension",
+        default="ttl",
+        help="With --input-dir, the file extension of output graphs, which also selects their format unless --output-format is passed.  (Default: %(default)s.)",
+    )
+    argument_parser.add_argument(
+        "--report",
+        help="Write a JSON report of each conversion's duration and error, if any, to this file.",
+    )
+    argument_parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes.  (Default: the number of CPUs.)",
+    )
+    args, dfxml_to_case_args = argument_parser.parse_known_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    if args.workers < 1:
+        argument_parser.error("--workers must be at least 1.")
+    pairs: List[Tuple[str, str]]
+    if args.manifest is not None:
+        pairs = read_manifest(args.manifest)
+    else:
+        if args.output_dir is None:
+            argument_parser.error("--input-dir requires --output-dir.")
+        pairs = directory_pairs(
+            args.input_dir,
+            args.output_dir,
+            pattern=args.input_pattern,
+            extension=args.output_extension,
+        )
+    if len(pairs) == 0:
+        _logger.warning("No files to convert.")
+
+    jobs: List[Tuple[str, str, List[str]]] = [
+        (in_dfxml, out_graph, dfxml_to_case_args + [in_dfxml, out_graph])
+        for (in_dfxml, out_graph) in pairs
+    ]
+    if len(jobs) > 0:
+        # Check the passed options once, before starting workers.
+        dfxml_to_case_namespace = dfxml_to_case.parse_args(
+            dfxml_to_case.make_argument_parser(), jobs[0][2]
+        )
+        # Every conversion would write these files, overwriting each other.
+        for option, dest in _PER_RUN_OUTPUT_OPTIONS:
+            if getattr(dfxml_to_case_namespace, dest) is not None:
+                argument_parser.error(
+                    "%s is not supported, because every conversion would write the same file.  Run dfxml_to_case separately to use it."
+                    % option
+                )
+    # Start the largest inputs first, so one large input does not
+    # extend the run after the pool has otherwise drained.
+    jobs.sort(
+        key=lambda x: os.path.getsize(x[0]) if os.path.exists(x[0]) else 0,
+        reverse=True,
+    )
+
+    # Conversions run as the dfxml_to_case command installed alongside
+    # this one.
+    command = os.path.join(os.path.dirname(sys.argv[0]), "dfxml_to_case")
+    results: List[Dict[str, Any]] = []
+    start_time = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_batch_worker,
+        initargs=(command,),
+    ) as executor:
+        futures = {
+            executor.submit(_convert, argv): (in_dfxml, out_graph)
+            for (in_dfxml, out_graph, argv) in jobs
+        }
+        for future in concurrent.futures.as_completed(futures):
+            in_dfxml, out_graph = futures[future]
+            try:
+                error, seconds = future.result()
+            except Exception as e:
+                # E.g. the worker process was killed.
+                error, seconds = (str(e) or type(e).__name__, 0.0)
+            if error is None:
+                _logger.debug("Converted %r in %.2fs.", in_dfxml, seconds)
+            results.append(
+                {
+                    "in_dfxml": in_dfxml,
+                    "out_graph": out_graph,
+                    "seconds": round(seconds, 3),
+                    "error": error,
+                }
+            )
+    wall_seconds = time.perf_counter() - start_time
+
+    results.sort(key=lambda x: str(x["in_dfxml"]))
+    failures = [x for x in results if x["error"] is not None]
+    for failure in failures:
+        _logger.error("Failed to convert %r: %s", failure["in_dfxml"], failure["error"])
+    _logger.info(
+        "Converted %d of %d files in %.1fs.",
+        len(results) - len(failures),
+        len(results),
+        wall_seconds,
+    )
+    if args.report is not None:
+        with open(args.report, "w") as out_fh:
+            json.dump(
+                {
+                    "succeeded": len(results) - len(failures),
+                    "failed": len(failures),
+                    "wall_seconds": round(wall_seconds, 3),
+                    "conversions": results,
+                },
+                out_fh,
+                indent=4,
+            )
+    if len(failures) > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
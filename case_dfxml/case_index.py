@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module extracts the CASE graph content that case_to_dfxml maps into compact dictionaries, with one scan per relevant predicate.  Assembling a file's DFXML properties is then a dictionary walk, instead of a series of triple-store probes per file.  The facet properties read are those declared in case_dfxml.mapping, which dfxml_to_case also emits from.  Likewise, Child_Of and drafting:StorageMediumRange relationships are indexed once, so assigning files to file systems is linear in the size of the graph.
+
+Instances of uco-observable:File and uco-observable:FileSystem are selected with rdf:type index lookups over a precomputed subclass closure, instead of evaluating an rdf:type/rdfs:subClassOf* property path per candidate subject.
+"""
+
+__version__ = "0.1.0"
+
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from case_utils.namespace import (
+    NS_RDF,
+    NS_RDFS,
+    NS_UCO_CORE,
+    NS_UCO_OBSERVABLE,
+    NS_UCO_TYPES,
+)
+from rdflib import Graph, Literal
+from rdflib.term import Node
+
+from case_dfxml.dfxml_reader import FileRecord
+from case_dfxml.mapping import FILE_FIELDS, HASH_FIELDS, FieldMapping
+from case_dfxml.namespace import NS_DRAFTING
+from case_dfxml.terms import L_CHILD_OF
+
+# Key: Hash method literal.
+# Value: FileRecord attribute name.
+HASH_METHOD_FIELDS: Dict[Node, str] = {
+    x.l_hash_method: x.field_name for x in HASH_FIELDS
+}
+
+# Key: Facet class.
+# Value: Dictionary, keyed by facet property, of the mapping read back
+# from facets of that class.
+FACET_FIELDS: Dict[Node, Dict[Node, FieldMapping]] = dict()
+for _field in FILE_FIELDS:
+    if _field.extract:
+        FACET_FIELDS.setdefault(_field.facet_class, dict())[_field.n_property] = _field
+del _field
+
+# Predicates that CaseIndex and the class selection functions read.
+# Readers that extract a subset of a CASE graph need to retain at least
+# these.
+MAPPED_PREDICATES: Set[Node] = {
+    NS_RDF.type,
+    NS_RDFS.subClassOf,
+    NS_UCO_CORE.hasFacet,
+    NS_UCO_CORE.kindOfRelationship,
+    NS_UCO_CORE.source,
+    NS_UCO_CORE.target,
+    NS_UCO_OBSERVABLE.fileSystemType,
+    NS_UCO_OBSERVABLE.hash,
+    NS_UCO_OBSERVABLE.rangeOffset,
+    NS_UCO_TYPES.hashMethod,
+    NS_UCO_TYPES.hashValue,
+} | {x.n_property for x in FILE_FIELDS}
+
+
+def subclass_closure(n_class: Node, *graphs: Graph) -> List[Node]:
+    """
+    Return n_class and all of its direct and indirect subclasses, as declared with rdfs:subClassOf in any of the given graphs.  The class itself is first, and the remainder are in breadth-first order.
+
+    >>> from rdflib import Namespace
+    >>> ns_ex = Namespace("http://example.org/ontology/")
+    >>> graph = Graph()
+    >>> _ = graph.add((NS_UCO_OBSERVABLE.ArchiveFile, NS_RDFS.subClassOf, NS_UCO_OBSERVABLE.File))
+    >>> _ = graph.add((ns_ex.ZipFile, NS_RDFS.subClassOf, NS_UCO_OBSERVABLE.ArchiveFile))
+    >>> [str(x).rsplit("/", 1)[-1] for x in subclass_closure(NS_UCO_OBSERVABLE.File, graph)]
+    ['File', 'ArchiveFile', 'ZipFile']
+    """
+    closure: Dict[Node, None] = {n_class: None}
+    frontier = [n_class]
+    while len(frontier) > 0:
+        next_frontier = []
+        for n_superclass in frontier:
+            for graph in graphs:
+                for n_subclass in graph.subjects(NS_RDFS.subClassOf, n_superclass):
+                    if n_subclass not in closure:
+                        closure[n_subclass] = None
+                        next_frontier.append(n_subclass)
+        frontier = next_frontier
+    return list(closure)
+
+
+def instances(graph: Graph, n_classes: List[Node]) -> Iterator[Node]:
+    """
+    Yield each node in graph with an rdf:type in n_classes, once.
+    """
+    seen: Set[Node] = set()
+    for n_class in n_classes:
+        for n_instance in graph.subjects(NS_RDF.type, n_class):
+            if n_instance not in seen:
+                seen.add(n_instance)
+                yield n_instance
+
+
+class CaseIndex:
+    """
+    Dictionaries of the CASE graph content case_to_dfxml maps.  Populate with add_graph.
+
+    >>> from case_utils.inherent_uuid import L_MD5
+    >>> from case_utils.namespace import NS_XSD
+    >>> from rdflib import Namespace
+    >>> ns_kb = Namespace("http://example.org/kb/")
+    >>> graph = Graph()
+    >>> _ = graph.add((ns_kb["File-1"], NS_RDF.type, NS_UCO_OBSERVABLE.File))
+    >>> _ = graph.add((ns_kb["File-1"], NS_UCO_CORE.hasFacet, ns_kb["ContentDataFacet-1"]))
+    >>> _ = graph.add((ns_kb["ContentDataFacet-1"], NS_RDF.type, NS_UCO_OBSERVABLE.ContentDataFacet))
+    >>> _ = graph.add((ns_kb["ContentDataFacet-1"], NS_UCO_OBSERVABLE.sizeInBytes, Literal(5)))
+    >>> _ = graph.add((ns_kb["ContentDataFacet-1"], NS_UCO_OBSERVABLE.hash, ns_kb["Hash-1"]))
+    >>> _ = graph.add((ns_kb["Hash-1"], NS_UCO_TYPES.hashMethod, L_MD5))
+    >>> _ = graph.add((ns_kb["Hash-1"], NS_UCO_TYPES.hashValue, Literal("d41d8cd98f00b204e9800998ecf8427e", datatype=NS_XSD.hexBinary)))
+    >>> _ = graph.add((ns_kb["File-1"], NS_UCO_CORE.hasFacet, ns_kb["FileFacet-1"]))
+    >>> _ = graph.add((ns_kb["FileFacet-1"], NS_RDF.type, NS_UCO_OBSERVABLE.FileFacet))
+    >>> _ = graph.add((ns_kb["FileFacet-1"], NS_UCO_OBSERVABLE.filePath, Literal("a.txt")))
+    >>> case_index = CaseIndex()
+    >>> case_index.add_graph(graph)
+    >>> record = case_index.file_record(ns_kb["File-1"])
+    >>> (record.filename, record.filesize, record.md5)
+    ('a.txt', 5, 'd41d8cd98f00b204e9800998ecf8427e')
+    """
+
+    def __init__(self) -> None:
+        # Key: Node with facets.
+        # Value: Its facets.
+        self.facets: Dict[Node, List[Node]] = dict()
+
+        # Key: Facet class in FACET_FIELDS.
+        # Value: Facets of that class.
+        self.facets_by_class: Dict[Node, Set[Node]] = {
+            n_facet_class: set() for n_facet_class in FACET_FIELDS
+        }
+
+        # Key: Facet.
+        # Value: Dictionary keyed by FileRecord attribute name.
+        self.facet_values: Dict[Node, Dict[str, Any]] = dict()
+
+        # Key: ContentDataFacet.
+        self.hashes: Dict[Node, List[Node]] = dict()
+
+        # Key: Hash.
+        self.hash_methods: Dict[Node, Node] = dict()
+        self.hash_values: Dict[Node, Node] = dict()
+
+        # Key: Facet.
+        self.file_system_types: Dict[Node, Literal] = dict()
+
+        # Key: Relationship source.
+        # Value: Relationship targets, as an insertion-ordered set.
+        self.child_of_targets: Dict[Node, Dict[Node, None]] = dict()
+        # Key: Relationship target.
+        # Value: Relationship sources, as an insertion-ordered set.
+        self.child_of_sources: Dict[Node, Dict[Node, None]] = dict()
+
+        # Key: Relationship source.
+        # Value: Pairs of relationship target and range offset.  The
+        # offset is None if the relationship has no recorded offset.
+        self.storage_medium_ranges: Dict[Node, List[Tuple[Node, Optional[int]]]] = (
+            dict()
+        )
+
+    def add_graph(self, graph: Graph) -> None:
+        for n_facet_class, facets in self.facets_by_class.items():
+            for n_facet in graph.subjects(NS_RDF.type, n_facet_class):
+                facets.add(n_facet)
+        for n_subject, n_facet in graph.subject_objects(NS_UCO_CORE.hasFacet):
+            self.facets.setdefault(n_subject, []).append(n_facet)
+        for n_facet_class, fields in FACET_FIELDS.items():
+            facets = self.facets_by_class[n_facet_class]
+            for n_property, field in fields.items():
+                for n_facet, l_object in graph.subject_objects(n_property):
+                    if n_facet in facets:
+                        self.facet_values.setdefault(n_facet, dict())[
+                            field.field_name
+                        ] = field.to_python(l_object)
+        for n_facet, n_hash in graph.subject_objects(NS_UCO_OBSERVABLE.hash):
+            self.hashes.setdefault(n_facet, []).append(n_hash)
+        for n_hash, l_hash_method in graph.subject_objects(NS_UCO_TYPES.hashMethod):
+            self.hash_methods[n_hash] = l_hash_method
+        for n_hash, l_hash_value in graph.subject_objects(NS_UCO_TYPES.hashValue):
+            self.hash_values[n_hash] = l_hash_value
+        for n_facet, l_file_system_type in graph.subject_objects(
+            NS_UCO_OBSERVABLE.fileSystemType
+        ):
+            assert isinstance(l_file_system_type, Literal)
+            self.file_system_types[n_facet] = l_file_system_type
+
+    def add_relationships(self, graph: Graph) -> None:
+        """
+        Index Child_Of and drafting:StorageMediumRange relationships.  This method depends on add_graph having been called first, for the index of facets.
+
+        >>> from case_utils.namespace import NS_XSD
+        >>> from rdflib import Namespace
+        >>> ns_kb = Namespace("http://example.org/kb/")
+        >>> graph = Graph()
+        >>> _ = graph.add((ns_kb["Relationship-1"], NS_UCO_CORE.kindOfRelationship, L_CHILD_OF))
+        >>> _ = graph.add((ns_kb["Relationship-1"], NS_UCO_CORE.source, ns_kb["File-1"]))
+        >>> _ = graph.add((ns_kb["Relationship-1"], NS_UCO_CORE.target, ns_kb["FileSystem-1"]))
+        >>> _ = graph.add((ns_kb["Relationship-2"], NS_RDF.type, NS_DRAFTING.StorageMediumRange))
+        >>> _ = graph.add((ns_kb["Relationship-2"], NS_UCO_CORE.source, ns_kb["FileSystem-1"]))
+        >>> _ = graph.add((ns_kb["Relationship-2"], NS_UCO_CORE.target, ns_kb["Image-1"]))
+        >>> _ = graph.add((ns_kb["Relationship-2"], NS_UCO_CORE.hasFacet, ns_kb["DataRangeFacet-1"]))
+        >>> _ = graph.add((ns_kb["DataRangeFacet-1"], NS_UCO_OBSERVABLE.rangeOffset, Literal(512)))
+        >>> case_index = CaseIndex()
+        >>> case_index.add_graph(graph)
+        >>> case_index.add_relationships(graph)
+        >>> [str(x) for x in case_index.child_of_sources[ns_kb["FileSystem-1"]]]
+        ['http://example.org/kb/File-1']
+        >>> case_index.partition_offset(ns_kb["FileSystem-1"])
+        512
+        """
+        # Key: Relationship.
+        sources: Dict[Node, List[Node]] = dict()
+        targets: Dict[Node, List[Node]] = dict()
+        for n_relationship, n_source in graph.subject_objects(NS_UCO_CORE.source):
+            sources.setdefault(n_relationship, []).append(n_source)
+        for n_relationship, n_target in graph.subject_objects(NS_UCO_CORE.target):
+            targets.setdefault(n_relationship, []).append(n_target)
+
+        # Key: DataRangeFacet.
+        range_offsets: Dict[Node, int] = dict()
+        for n_facet, l_offset in graph.subject_objects(NS_UCO_OBSERVABLE.rangeOffset):
+            assert isinstance(l_offset, Literal)
+            range_offsets[n_facet] = int(l_offset)
+
+        for n_relationship in graph.subjects(
+            NS_UCO_CORE.kindOfRelationship, L_CHILD_OF
+        ):
+            for n_source in sources.get(n_relationship, []):
+                for n_target in targets.get(n_relationship, []):
+                    self.child_of_targets.setdefault(n_source, dict())[n_target] = None
+                    self.child_of_sources.setdefault(n_target, dict())[n_source] = None
+
+        for n_relationship in graph.subjects(
+            NS_RDF.type, NS_DRAFTING.StorageMediumRange
+        ):
+            offset: Optional[int] = None
+            for n_facet in self.facets.get(n_relationship, []):
+                if n_facet in range_offsets:
+                    offset = range_offsets[n_facet]
+            for n_source in sources.get(n_relationship, []):
+                for n_target in targets.get(n_relationship, []):
+                    self.storage_medium_ranges.setdefault(n_source, []).append(
+                        (n_target, offset)
+                    )
+
+    def partition_offset(self, n_source: Node) -> Optional[int]:
+        """
+        Return the range offset of a storage object within its containing storage medium, if recorded.
+        """
+        offset: Optional[int] = None
+        for _, range_offset in self.storage_medium_ranges.get(n_source, []):
+            if range_offset is not None:
+                offset = range_offset
+        return offset
+
+    def file_system_type(self, n_file_system: Node) -> Optional[Literal]:
+        """
+        Return the uco-observable:fileSystemType recorded on any facet of a file system.
+        """
+        l_file_system_type: Optional[Literal] = None
+        for n_facet in self.facets.get(n_file_system, []):
+            if n_facet in self.file_system_types:
+                l_file_system_type = self.file_system_types[n_facet]
+        return l_file_system_type
+
+    def file_record(self, n_file: Node) -> FileRecord:
+        """
+        Assemble the DFXML properties of a file from its facets.
+        """
+        record = FileRecord()
+        content_data_facets = self.facets_by_class[NS_UCO_OBSERVABLE.ContentDataFacet]
+        for n_facet in self.facets.get(n_file, []):
+            for field_name, value in self.facet_values.get(n_facet, dict()).items():
+                setattr(record, field_name, value)
+            if n_facet in content_data_facets:
+                for n_hash in self.hashes.get(n_facet, []):
+                    l_hash_method = self.hash_methods.get(n_hash)
+                    if l_hash_method is None:
+                        continue
+                    hash_field_name = HASH_METHOD_FIELDS.get(l_hash_method)
+                    if hash_field_name is None:
+                        continue
+                    l_hash_value = self.hash_values.get(n_hash)
+                    if l_hash_value is not None:
+                        setattr(record, hash_field_name, str(l_hash_value))
+        return record
@@ -17,50 +17,342 @@
 __version__ = "0.0.9"
 
 import argparse
+import contextlib
+import io
 import logging
 import os
+import pathlib
 import sys
-from typing import Dict, Set
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Iterator,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+    cast,
+)
 
-import dfxml
-import rdflib.plugins.sparql
-from case_utils.inherent_uuid import L_MD5, L_SHA1, L_SHA256
-from case_utils.namespace import NS_RDF, NS_UCO_CORE, NS_UCO_OBSERVABLE, NS_UCO_TYPES
-from dfxml import objects as Objects
-from rdflib import Literal, URIRef
-from rdflib.query import ResultRow
+from case_dfxml import compressed_io
+from case_dfxml.progress import ProgressReader, ProgressReporter
+from case_dfxml.stats import RunStats
+
+# rdflib, case_utils, dfxml and the modules built on them are imported by
+# the functions that use them, so --help and argument errors do not pay
+# for importing them.
+if TYPE_CHECKING:
+    from case_dfxml.sqlite_store import SQLiteStore
 
 _logger = logging.getLogger(os.path.basename(__file__))
 
+# Key: File name extension.  Value: rdflib parser name.
+INPUT_EXTENSION_FORMATS = {
+    "json": "json-ld",
+    "jsonld": "json-ld",
+    "nt": "nt",
+    "ttl": "ttl",
+    "xml": "xml",
+}
 
-def main() -> None:
+
+class _BuiltVersionChoices(Sequence[str]):
+    """
+    The choices of --built-version, read from case_utils when first used.  Reading them imports rdflib, so they are only read when --built-version is passed or --help is requested.
+    """
+
+    def _choices(self) -> Sequence[str]:
+        from case_utils.ontology.version_info import built_version_choices_list
+
+        return built_version_choices_list
+
+    def __getitem__(self, index: int) -> str:  # type: ignore[override]
+        return self._choices()[index]
+
+    def __len__(self) -> int:
+        return len(self._choices())
+
+    def __contains__(self, value: object) -> bool:
+        return value in self._choices()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._choices())
+
+
+def make_argument_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser()
     parser.add_argument("-d", "--debug", action="store_true")
-    # Thanks to case_plaso_export.py for this one-liner.
-    format_choices = sorted(
-        [
-            p.name
-            for p in rdflib.plugin.plugins(kind=rdflib.serializer.Serializer)
-            if "/" not in p.name
-        ]
-    )
-    parser.add_argument("--input-format", choices=format_choices)
-    parser.add_argument("in_file")
-    parser.add_argument("out_dfxml")
-    args = parser.parse_args()
+    parser.add_argument(
+        "--built-version",
+        choices=_BuiltVersionChoices(),
+        default="none",
+        metavar="VERSION",
+        help="Also recognize subclasses of uco-observable:File and uco-observable:FileSystem declared in this packaged CASE version's subclass hierarchy.  Subclasses declared in the input graph are always recognized.  One of: %(choices)s.  (Default: %(default)s.)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory of cached volume and file records.  If given, the records extracted from in_file are saved in this directory, in a file named after a hash of in_file's content and the options affecting the records.  A later run over input with the same content reads the records back, skipping parsing and indexing in_file.  Cache files are never updated, so they can be deleted at any time; a damaged cache file is rebuilt.  Cache files are not secure against malicious modification, so the directory should only be writable by trusted users.",
+    )
+    parser.add_argument(
+        "--input-format",
+        help="Name of the rdflib parser to read in_file with.  If absent, the format is guessed from the extension of in_file.",
+    )
+    parser.add_argument(
+        "--input-compression",
+        choices=compressed_io.COMPRESSION_CHOICES,
+        default="auto",
+        help="Compression codec of in_file, which is decompressed as it is read.  'auto' chooses by the file extension: .gz, .bz2, .xz or .zst; the input format is then guessed from the extension before it.  (Default: %(default)s.)",
+    )
+    parser.add_argument(
+        "--output-compression",
+        choices=compressed_io.COMPRESSION_CHOICES,
+        default="auto",
+        help="Compression codec of out_dfxml, which is compressed as it is written.  'auto' chooses by the file extension.  (Default: %(default)s.)",
+    )
+    parser.add_argument(
+        "--streaming-input",
+        action="store_true",
+        help="Read JSON-LD input with case_dfxml.jsonld_reader, which decodes one node object at a time and keeps only the triples this program maps.  Input using JSON-LD features that reader does not support is read with rdflib instead.",
+    )
+    parser.add_argument(
+        "--incremental-output",
+        action="store_true",
+        help="Write the DFXML header, volumes and files to out_dfxml as they are assembled, instead of building the whole DFXML document in memory and writing it at the end.",
+    )
+    parser.add_argument(
+        "--store",
+        help="Directory of disk-backed graph stores.  If given, the input graph is loaded into a SQLite database in this directory instead of into memory.  A database populated by an earlier run over the same, unmodified input file is reused without re-parsing.",
+    )
+    parser.add_argument(
+        "--progress-file",
+        help="Also write each progress report to this file, as one JSON object per line, including a final report when each phase ends.",
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=30.0,
+        help="Seconds between logged progress reports while parsing in_file and while assembling files, giving the rate, an estimated time remaining, and the resident set size.  Parsing progress is measured by the offset read into in_file; rdflib reads some formats, such as Turtle, completely before parsing them.  0 disables progress reports.  (Default: %(default)s.)",
+    )
+    parser.add_argument(
+        "--profile",
+        help="Write a cProfile profile of the mapping phase to this file, readable with the pstats module.",
+    )
+    parser.add_argument(
+        "--stats",
+        help="Write a JSON report of this run to this file: wall and CPU time of the parse, index, map and serialize phases, peak resident set size, and counts of input triples and of written volumes, files, hashes and file-to-volume relationships.  With --incremental-output, writing output is included in the map phase.",
+    )
+    parser.add_argument(
+        "in_file",
+        help="A CASE graph file, or '-' to read standard input, which requires --input-format.",
+    )
+    parser.add_argument(
+        "out_dfxml", help="A DFXML file, or '-' to write standard output."
+    )
+    return parser
 
-    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+def parse_args(
+    argument_parser: argparse.ArgumentParser, argv: Optional[Sequence[str]] = None
+) -> argparse.Namespace:
+    """
+    Parse and check a case_to_dfxml command line, exiting through argument_parser on errors.  If no input format was requested, the format guessed from in_file is stored in input_format.  The compression codecs of in_file and out_dfxml, or None, are stored in input_codec and output_codec.
+    """
+    args = argument_parser.parse_args(argv)
+
+    args.input_codec = compressed_io.codec_for_path(
+        args.in_file, args.input_compression
+    )
+    args.output_codec = compressed_io.codec_for_path(
+        args.out_dfxml, args.output_compression
+    )
 
     if args.input_format:
-        input_format = args.input_format
+        # Only parsers are looked up, instead of enumerating every rdflib
+        # plugin to list choices.
+        from rdflib.parser import Parser
+        from rdflib.plugin import PluginException, get
+
+        try:
+            get(args.input_format, Parser)
+        except PluginException:
+            argument_parser.error(
+                "--input-format: rdflib has no parser for %r." % args.input_format
+            )
+    elif args.in_file == compressed_io.STDIO_PATH:
+        argument_parser.error("Reading standard input requires --input-format.")
     else:
         # Guess format from input extension.
-        input_ext = os.path.splitext(args.in_file)[1][1:]
-        input_format = {"json": "json-ld", "ttl": "ttl", "xml": "xml"}[input_ext]
-    graph = rdflib.Graph()
-    graph.parse(args.in_file, format=input_format)
+        in_file_name = compressed_io.strip_codec_extension(args.in_file)
+        input_ext = os.path.splitext(in_file_name)[1][1:]
+        if input_ext not in INPUT_EXTENSION_FORMATS:
+            argument_parser.error(
+                "Cannot guess the format of in_file %r from its extension; pass --input-format."
+                % args.in_file
+            )
+        args.input_format = INPUT_EXTENSION_FORMATS[input_ext]
+    if args.store is not None and args.in_file == compressed_io.STDIO_PATH:
+        argument_parser.error("--store requires in_file to be a file.")
+    if args.cache_dir is not None and args.in_file == compressed_io.STDIO_PATH:
+        argument_parser.error("--cache-dir requires in_file to be a file.")
+    return args
+
 
-    _logger.debug("len(graph) = %d." % len(graph))
+def convert(args: argparse.Namespace) -> None:
+    """
+    Convert args.in_file to args.out_dfxml, with args as returned by parse_args.
+    """
+    import dfxml
+    import rdflib
+    from dfxml import objects as Objects
+
+    from case_dfxml import jsonld_reader
+    from case_dfxml.api import DFXMLAssembler, dfxml_object_events
+    from case_dfxml.dfxml_writer import DFXMLWriter
+    from case_dfxml.mapping import HASH_FIELDS
+
+    run_stats = RunStats("case_to_dfxml", profile_path=args.profile)
+
+    input_format = args.input_format
+
+    progress_file: Optional[TextIO] = None
+    if args.progress_file is not None:
+        progress_file = open(args.progress_file, "w", encoding="utf-8")
+
+    @contextlib.contextmanager
+    def _open_input() -> Iterator[IO[bytes]]:
+        """
+        Open the input file, decompressing it if needed, and reporting parsing progress by the offset read into the file.  The end of parsing is reported if the input is read without error.
+        """
+        parse_progress = ProgressReporter(
+            "case_to_dfxml",
+            "parse",
+            total=(
+                None
+                if args.in_file == compressed_io.STDIO_PATH
+                else os.path.getsize(args.in_file)
+            ),
+            interval=args.progress_interval,
+            side_channel=progress_file,
+        )
+        progress_reader = ProgressReader(
+            compressed_io.open_raw(args.in_file, "rb"), parse_progress
+        )
+        with io.BufferedReader(progress_reader) as raw_fh:
+            with compressed_io.decompressing_reader(raw_fh, args.input_codec) as in_fh:
+                yield in_fh
+        parse_progress.finish(progress_reader.offset)
+
+    def _parse_input(graph: rdflib.Graph) -> None:
+        with run_stats.phase("parse"):
+            if args.streaming_input and input_format == "json-ld":
+                try:
+                    with _open_input() as in_fh:
+                        with io.TextIOWrapper(in_fh, encoding="utf-8") as in_text_fh:
+                            jsonld_reader.parse(in_text_fh, graph)
+                    return
+                except jsonld_reader.UnsupportedJSONLDError as e:
+                    if args.in_file == compressed_io.STDIO_PATH:
+                        # Standard input cannot be read a second time.
+                        _logger.error(
+                            "Standard input cannot be re-read with the rdflib JSON-LD parser; rerun without --streaming-input.  Reason: %s",
+                            str(e),
+                        )
+                        sys.exit(2)
+                    _logger.warning(
+                        "Falling back to rdflib JSON-LD parser.  Reason: %s", str(e)
+                    )
+                    graph.remove((None, None, None))
+            with _open_input() as in_fh:
+                # The public ID keeps the base IRI rdflib would use when
+                # reading from the file's path.  Relative IRIs read from
+                # standard input are resolved against the working
+                # directory.
+                graph.parse(
+                    source=in_fh,
+                    format=input_format,
+                    publicID=(
+                        pathlib.Path.cwd().as_uri() + "/"
+                        if args.in_file == compressed_io.STDIO_PATH
+                        else pathlib.Path(args.in_file).absolute().as_uri()
+                    ),
+                )
+
+    cache_file: Optional[str] = None
+    if args.cache_dir is not None:
+        from case_dfxml import record_cache
+
+        # Fingerprinting reads the whole input, so it is timed as parsing.
+        with run_stats.phase("parse"):
+            cache_file = record_cache.cache_path(
+                args.cache_dir,
+                record_cache.fingerprint(
+                    args.in_file,
+                    built_version=args.built_version,
+                    input_format=input_format,
+                    program="case_to_dfxml",
+                ),
+            )
+
+    cached_counts: Optional[Tuple[int, int]] = None
+    if cache_file is not None and os.path.exists(cache_file):
+        try:
+            cached_counts = record_cache.read_counts(cache_file)
+        except ValueError as e:
+            _logger.warning(
+                "Rebuilding record cache %r.  Reason: %s", cache_file, str(e)
+            )
+            os.remove(cache_file)
+
+    store: Optional["SQLiteStore"] = None
+    record_events: Iterator[Tuple[str, Any]]
+    if cached_counts is not None:
+        assert cache_file is not None
+        _logger.info("Reusing record cache %r.", cache_file)
+        file_count, triple_count = cached_counts
+        run_stats.count("triples", triple_count)
+        record_events = record_cache.read_records(cache_file)
+    else:
+        if args.store is None:
+            graph = rdflib.Graph()
+            _parse_input(graph)
+        else:
+            from case_dfxml import sqlite_store
+
+            graph, store = sqlite_store.open_graph(
+                args.store,
+                sqlite_store.fingerprint(
+                    args.in_file,
+                    input_format=input_format,
+                    program="case_to_dfxml",
+                    streaming_input=args.streaming_input,
+                ),
+            )
+            if store.complete:
+                _logger.info("Reusing graph store in %r.", args.store)
+            else:
+                _parse_input(graph)
+                store.mark_complete()
+
+        run_stats.count("triples", len(graph))
+        _logger.debug("len(graph) = %d." % run_stats.counters["triples"])
+
+        # Compute the subclass closures of the selected classes once,
+        # drawing on subclasses declared in the input graph and optionally
+        # on a packaged CASE subclass hierarchy, and extract the properties
+        # mapped to DFXML in one pass over the graph.
+        with run_stats.phase("index"):
+            dfxml_assembler = DFXMLAssembler(graph, built_version=args.built_version)
+        file_count = dfxml_assembler.file_count
+        record_events = dfxml_assembler.records()
+        if cache_file is not None:
+            os.makedirs(args.cache_dir, exist_ok=True)
+            record_events = record_cache.write_records(
+                cache_file,
+                record_events,
+                file_count=file_count,
+                triple_count=run_stats.counters["triples"],
+            )
 
     dobj = Objects.DFXMLObject()
     dobj.program = sys.argv[0]
@@ -73,166 +365,78 @@ def main() -> None:
     dobj.add_creator_library("objects.py", Objects.__version__)
     dobj.add_creator_library("dfxml", dfxml.__version__)
 
-    nsdict = {k: v for (k, v) in graph.namespace_manager.namespaces()}
-
-    # Get set of all files.
-    n_files: Set[URIRef] = set()
-    file_query = rdflib.plugins.sparql.prepareQuery(
-        """\
-PREFIX uco-observable: <https://ontology.unifiedcyberontology.org/uco/observable/>
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-SELECT ?nFile
-WHERE {
-  ?nFile
-    a/rdfs:subClassOf* uco-observable:File ;
-    .
-}
-""",
-        initNs=nsdict,
+    map_progress = ProgressReporter(
+        "case_to_dfxml",
+        "map",
+        total=file_count,
+        unit="files",
+        interval=args.progress_interval,
+        side_channel=progress_file,
     )
-    for file_result in graph.query(file_query):
-        assert isinstance(file_result, ResultRow)
-        assert isinstance(file_result[0], URIRef)
-        n_file = file_result[0]
-        n_files.add(n_file)
 
-    def _n_file_to_file_object(n_file: URIRef) -> Objects.FileObject:
-        """
-        Assemble FileObject on-demand.
-        """
-        # This function uses graph.triples and like accessors instead of
-        # SPARQL to avoid unnecessary joins in a one-query-gets-all-
-        # OPTIONALs call.
-        fobj = Objects.FileObject()
-        for n_facet in graph.objects(n_file, NS_UCO_CORE.hasFacet):
-            if (n_facet, NS_RDF.type, NS_UCO_OBSERVABLE.ContentDataFacet) in graph:
-                for l_size in graph.objects(n_facet, NS_UCO_OBSERVABLE.sizeInBytes):
-                    assert isinstance(l_size, Literal)
-                    fobj.filesize = int(l_size)
-                for n_hash in graph.objects(n_facet, NS_UCO_OBSERVABLE.hash):
-                    for triple in graph.triples(
-                        (n_hash, NS_UCO_TYPES.hashMethod, L_MD5)
-                    ):
-                        for l_hash_value in graph.objects(
-                            n_hash, NS_UCO_TYPES.hashValue
-                        ):
-                            fobj.md5 = str(l_hash_value)
-                    for triple in graph.triples(
-                        (n_hash, NS_UCO_TYPES.hashMethod, L_SHA1)
-                    ):
-                        for l_hash_value in graph.objects(
-                            n_hash, NS_UCO_TYPES.hashValue
-                        ):
-                            fobj.sha1 = str(l_hash_value)
-                    for triple in graph.triples(
-                        (n_hash, NS_UCO_TYPES.hashMethod, L_SHA256)
-                    ):
-                        for l_hash_value in graph.objects(
-                            n_hash, NS_UCO_TYPES.hashValue
-                        ):
-                            fobj.sha256 = str(l_hash_value)
-            elif (n_facet, NS_RDF.type, NS_UCO_OBSERVABLE.FileFacet) in graph:
-                for l_object in graph.objects(n_facet, NS_UCO_OBSERVABLE.filePath):
-                    fobj.filename = str(l_object)
-                for l_object in graph.objects(n_facet, NS_UCO_OBSERVABLE.accessedTime):
-                    fobj.atime = str(l_object)
-                for l_object in graph.objects(n_facet, NS_UCO_OBSERVABLE.modifiedTime):
-                    fobj.mtime = str(l_object)
-                for l_object in graph.objects(
-                    n_facet, NS_UCO_OBSERVABLE.observableCreatedTime
-                ):
-                    fobj.crtime = str(l_object)
-                for l_object in graph.objects(
-                    n_facet, NS_UCO_OBSERVABLE.metadataChangeTime
-                ):
-                    fobj.ctime = str(l_object)
-        return fobj
-
-    # Key: UUID in the CASE graph.
-    # Value: DFXML Object with an 'append' method.
-    uriref_to_container: Dict[URIRef, Objects.AbstractParentObject] = dict()
-    filesystem_query = rdflib.plugins.sparql.prepareQuery(
-        """\
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-PREFIX uco-core: <https://ontology.unifiedcyberontology.org/uco/core/>
-PREFIX uco-observable: <https://ontology.unifiedcyberontology.org/uco/observable/>
-SELECT ?nFileSystem ?lFileSystemType
-WHERE {
-  ?nFileSystem
-    a/rdfs:subClassOf* uco-observable:FileSystem ;
-    .
-
-  OPTIONAL {
-    ?nFileSystem
-      uco-core:hasFacet / uco-observable:fileSystemType ?lFileSystemType ;
-      .
-  }
-}
-""",
-        initNs=nsdict,
-    )
-    for filesystem_result in graph.query(filesystem_query):
-        assert isinstance(filesystem_result, ResultRow)
-        assert isinstance(filesystem_result[0], URIRef)
-        assert filesystem_result[1] is None or isinstance(filesystem_result[1], Literal)
-        n_file_system = filesystem_result[0]
-        l_ftype_str = filesystem_result[1]
-
-        # Define and attach DFXML object.
-        fsobj = Objects.VolumeObject()
-        uriref_to_container[n_file_system] = fsobj
-        dobj.append(fsobj)
-
-        # Map.
-        if l_ftype_str:
-            # File system names are lowercased in DFXML.
-            fsobj.ftype_str = l_ftype_str.toPython().lower()
-
-        for parent_result in graph.query("""\
-PREFIX drafting: <http://example.org/ontology/drafting/>
-PREFIX uco-core: <https://ontology.unifiedcyberontology.org/uco/core/>
-SELECT ?lPartitionOffset
-WHERE {
-  ?nRelationship
-    a drafting:StorageMediumRange ;
-    uco-core:source ?nFileSystem ;
-    uco-core:hasFacet / uco-observable:rangeOffset ?lPartitionOffset
-    .
-}
-"""):
-            assert isinstance(parent_result, ResultRow)
-            assert isinstance(parent_result[0], Literal)
-            l_partition_offset = parent_result[0]
-            fsobj.partition_offset = int(l_partition_offset)
-
-        # Append all child file objects.
-        child_query = rdflib.plugins.sparql.prepareQuery("""\
-PREFIX uco-core: <https://ontology.unifiedcyberontology.org/uco/core/>
-SELECT DISTINCT ?nFile
-WHERE {
-  ?nRelationship
-    uco-core:kindOfRelationship "Child_Of" ;
-    uco-core:source ?nFile ;
-    uco-core:target ?nFileSystem ;
-    .
-}
-""")
-
-        for child_result in graph.query(
-            child_query, initBindings={"nFileSystem": n_file_system}
-        ):
-            assert isinstance(child_result, ResultRow)
-            assert isinstance(child_result[0], URIRef)
-            n_file = child_result[0]
-            fsobj.append(_n_file_to_file_object(n_file))
-            n_files -= {n_file}
-    _logger.debug("len(n_files) = %d." % len(n_files))
-
-    for n_file in n_files:
-        dobj.append(_n_file_to_file_object(n_file))
-
-    with open(args.out_dfxml, "w") as out_fh:
-        dobj.print_dfxml(output_fh=out_fh)
+    with run_stats.phase("map", profile=True):
+        writer: Optional[DFXMLWriter] = None
+        out_fh: Optional[TextIO] = None
+        if args.incremental_output:
+            out_fh = cast(
+                TextIO, compressed_io.open_text(args.out_dfxml, "w", args.output_codec)
+            )
+            writer = DFXMLWriter(out_fh, dobj)
+            writer.write_header()
+
+        # The volume whose files are being read, if any.
+        fsobj: Optional[Objects.VolumeObject] = None
+        for event, obj in dfxml_object_events(record_events, writer=writer):
+            if isinstance(obj, Objects.VolumeObject):
+                if event == "start":
+                    fsobj = obj
+                    run_stats.count("volumes")
+                    # Attach DFXML object.
+                    if writer is None:
+                        dobj.append(fsobj)
+                else:
+                    fsobj = None
+                continue
+            run_stats.count("files")
+            map_progress.update(run_stats.counters["files"])
+            run_stats.count(
+                "hashes", sum(1 for x in HASH_FIELDS if getattr(obj, x.field_name))
+            )
+            if fsobj is not None:
+                run_stats.count("relationships")
+            if writer is None:
+                if fsobj is None:
+                    dobj.append(obj)
+                else:
+                    fsobj.append(obj)
+
+        map_progress.finish(run_stats.counters["files"])
+
+    with run_stats.phase("serialize"):
+        if writer is None:
+            with compressed_io.open_text(
+                args.out_dfxml, "w", args.output_codec
+            ) as out_text_fh:
+                dobj.print_dfxml(output_fh=out_text_fh)
+        else:
+            assert out_fh is not None
+            writer.close()
+            out_fh.close()
+
+    if store is not None:
+        graph.close()
+    if progress_file is not None:
+        progress_file.close()
+    if args.stats is not None or args.profile is not None:
+        run_stats.write(args.stats)
+
+
+def main() -> None:
+    args = parse_args(make_argument_parser())
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    convert(args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module reads and writes compressed input and output files as streams, so compressed files are never inflated on disk.  gzip, bzip2 and xz are supported with the standard library.  Zstandard is supported with the zstandard package, or with the standard library's compression.zstd where available.
+
+A codec is either requested by name, or chosen by the extension of the file name: .gz, .bz2, .xz or .zst.  Formats guessed from file names, such as that of an RDF graph, are guessed from the name without the compression extension.  The path "-" names standard input or standard output, which are never compressed unless a codec is requested by name.
+"""
+
+__version__ = "0.1.0"
+
+import bz2
+import gzip
+import importlib
+import io
+import lzma
+import os
+import sys
+from typing import IO, Any, Dict, Optional, cast
+
+# Key: Codec name.  Value: File name extension.
+CODEC_EXTENSIONS: Dict[str, str] = {
+    "bz2": ".bz2",
+    "gzip": ".gz",
+    "xz": ".xz",
+    "zstd": ".zst",
+}
+
+# The path naming standard input, when read, or standard output, when
+# written.
+STDIO_PATH = "-"
+
+# Values of the --input-compression and --output-compression options.
+# "auto" chooses a codec by extension.
+COMPRESSION_CHOICES = ("auto", "none") + tuple(sorted(CODEC_EXTENSIONS.keys()))
+
+
+def codec_for_path(path: str, compression: str = "auto") -> Optional[str]:
+    """
+    Return the codec to read or write path with, or None for uncompressed files.  compression is a member of COMPRESSION_CHOICES.
+
+    >>> codec_for_path("disk.dfxml.gz")
+    'gzip'
+    >>> codec_for_path("disk.dfxml") is None
+    True
+    >>> codec_for_path("disk.dfxml.gz", "none") is None
+    True
+    """
+    if compression == "none":
+        return None
+    if compression != "auto":
+        if compression not in CODEC_EXTENSIONS:
+            raise ValueError("Unrecognized compression codec: %r." % compression)
+        return compression
+    extension = os.path.splitext(path)[1].lower()
+    for codec, codec_extension in CODEC_EXTENSIONS.items():
+        if extension == codec_extension:
+            return codec
+    return None
+
+
+def strip_codec_extension(path: str) -> str:
+    """
+    Return path without its compression extension, if any, for guessing the format of its content.
+
+    >>> strip_codec_extension("graph.ttl.zst")
+    'graph.ttl'
+    >>> strip_codec_extension("graph.ttl")
+    'graph.ttl'
+    """
+    if codec_for_path(path) is None:
+        return path
+    return os.path.splitext(path)[0]
+
+
+def open_raw(
+    path: str, mode: str, *args: Any, buffering: int = -1, **kwargs: Any
+) -> IO[bytes]:
+    """
+    Open path for binary reading ("rb") or writing ("wb"), without decompressing or compressing it.  STDIO_PATH opens standard input or standard output, which are left open when the returned file is closed.  buffering is passed to open.
+    """
+    if path != STDIO_PATH:
+        return open(path, mode, buffering=buffering)
+    stdio = sys.stdin if mode == "rb" else sys.stdout
+    stdio.flush()
+    return open(stdio.fileno(), mode, buffering=buffering, closefd=False)
+
+
+def _zstd_module() -> Any:
+    """
+    Return the standard library's compression.zstd module if available, and otherwise the zstandard package.  Both provide open.
+    """
+    # Neither module is available on every supported Python version, so
+    # they are imported by name.
+    for module_name in ("compression.zstd", "zstandard"):
+        try:
+            return importlib.import_module(module_name)
+        except ImportError:
+            pass
+    raise ValueError(
+        "Zstandard compression requires the zstandard package, e.g. installed with 'pip install case_dfxml[zstd]'."
+    )
+
+
+def decompressing_reader(raw: IO[bytes], codec: Optional[str]) -> IO[bytes]:
+    """
+    Return a binary reader of the content of raw decompressed with codec, which is read incrementally.  raw is left open when the reader is closed.  The codec is not detected from the content: if codec is None, raw is returned unchanged.
+    """
+    if codec is None:
+        return raw
+    elif codec == "gzip":
+        return cast(IO[bytes], gzip.GzipFile(fileobj=raw, mode="rb"))
+    elif codec == "bz2":
+        return cast(IO[bytes], bz2.BZ2File(raw, mode="rb"))
+    elif codec == "xz":
+        return cast(IO[bytes], lzma.LZMAFile(raw, mode="rb"))
+    elif codec == "zstd":
+        zstd = _zstd_module()
+        if hasattr(zstd, "ZstdDecompressor"):
+            # The zstandard package.
+            return zstd.ZstdDecompressor().stream_reader(raw, closefd=False)  # type: ignore[no-any-return]
+        return zstd.ZstdFile(raw, mode="rb")  # type: ignore[no-any-return]
+    raise ValueError("Unrecognized compression codec: %r." % codec)
+
+
+def _compressing_writer(raw: IO[bytes], codec: str) -> IO[bytes]:
+    """
+    Return a binary writer that compresses what is written to it into raw.  raw is left open when the writer is closed.
+    """
+    if codec == "gzip":
+        return cast(IO[bytes], gzip.GzipFile(fileobj=raw, mode="wb"))
+    elif codec == "bz2":
+        return cast(IO[bytes], bz2.BZ2File(raw, mode="wb"))
+    elif codec == "xz":
+        return cast(IO[bytes], lzma.LZMAFile(raw, mode="wb"))
+    elif codec == "zstd":
+        zstd = _zstd_module()
+        if hasattr(zstd, "ZstdCompressor"):
+            # The zstandard package.
+            return zstd.ZstdCompressor().stream_writer(raw, closefd=False)  # type: ignore[no-any-return]
+        return zstd.ZstdFile(raw, mode="wb")  # type: ignore[no-any-return]
+    raise ValueError("Unrecognized compression codec: %r." % codec)
+
+
+def open_binary(path: str, mode: str, codec: Optional[str]) -> IO[bytes]:
+    """
+    Open path for binary reading ("rb") or writing ("wb"), decompressing or compressing with codec.  Closing a writer finishes the compressed stream.  STDIO_PATH opens standard input or standard output, as with open_raw.
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     path = os.path.join(tmpdir, "example.dfxml.xz")
+    ...     with open_binary(path, "wb", codec_for_path(path)) as out_fh:
+    ...         _ = out_fh.write(b"<dfxml/>")
+    ...     with open_binary(path, "rb", codec_for_path(path)) as in_fh:
+    ...         in_fh.read()
+    b'<dfxml/>'
+    """
+    if mode not in ("rb", "wb"):
+        raise ValueError("Unsupported mode: %r." % mode)
+    if codec is None:
+        return open_raw(path, mode)
+    elif path == STDIO_PATH:
+        # The compression stream is closed without closing the standard
+        # stream under it, so that stream is not buffered.
+        raw = open_raw(path, mode, buffering=0)
+        if mode == "rb":
+            return decompressing_reader(raw, codec)
+        return _compressing_writer(raw, codec)
+    elif codec == "gzip":
+        return cast(IO[bytes], gzip.open(path, mode))
+    elif codec == "bz2":
+        return cast(IO[bytes], bz2.open(path, mode))
+    elif codec == "xz":
+        return cast(IO[bytes], lzma.open(path, mode))
+    elif codec == "zstd":
+        return _zstd_module().open(path, mode)  # type: ignore[no-any-return]
+    raise ValueError("Unrecognized compression codec: %r." % codec)
+
+
+def open_text(path: str, mode: str, codec: Optional[str]) -> IO[str]:
+    """
+    Open path for UTF-8 text reading ("r") or writing ("w"), decompressing or compressing with codec.  STDIO_PATH opens standard input or standard output, as with open_raw.
+    """
+    if codec is None and path != STDIO_PATH:
+        return open(path, mode, encoding="utf-8")
+    return io.TextIOWrapper(open_binary(path, mode + "b", codec), encoding="utf-8")
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module provides a fast-path DFXML reader, yielding compact records of only the DFXML properties that dfxml_to_case maps.
+
+dfxml.objects.iterparse builds a complete FileObject for each <fileobject>, including byte runs and all other child elements.  The iterparse function in this module instead reads the XML stream with xml.etree.ElementTree.iterparse, copies the mapped fields into __slots__ records, and discards each element once it has been read.
+
+The event stream mirrors dfxml.objects.iterparse, as consumed by dfxml_to_case:
+
+* ("start", DiskImageRecord) and ("end", DiskImageRecord) bracket disk images.
+* ("start", VolumeRecord) and ("end", VolumeRecord) bracket volumes.  As with dfxml.objects.iterparse, the start event is deferred until the volume's own properties have been read.
+* ("end", FileRecord) is yielded for each file.
+
+Differential DFXML annotations (e.g. delta:new_file="1") are read into the annos attribute of volume and file records, using the same short names as dfxml.objects ("new", "deleted", "renamed", "changed", "modified", "matched").
+"""
+
+__version__ = "0.1.0"
+
+import datetime
+import functools
+import re
+import xml.etree.ElementTree as ET
+from typing import (
+    IO,
+    AbstractSet,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+XMLNS_DELTA = "http://www.forensicswiki.org/wiki/Forensic_Disk_Differencing"
+XMLNS_DFXML = "http://www.forensicswiki.org/wiki/Category:Digital_Forensics_XML"
+
+_RX_EPOCH_TIMESTAMP = re.compile(r"^-?[0-9]+(\.[0-9]+)?$")
+
+# Elements whose completed children can be discarded as soon as they are
+# read.
+_CONTAINER_LOCAL_NAMES = {
+    "diskimageobject",
+    "dfxml",
+    "partition",
+    "partitionsystem",
+    "volume",
+}
+
+_DELTA_ATTRIBUTE_PREFIX = "{%s}" % XMLNS_DELTA
+
+# Shared by records without differential annotations.
+_NO_ANNOS: AbstractSet[str] = frozenset()
+
+_HASH_TYPES = {"md5", "sha1", "sha256"}
+
+# Elements that are mapped, or that can contain mapped elements.
+_STRUCTURAL_LOCAL_NAMES = {
+    "diskimageobject",
+    "fileobject",
+    "partition",
+    "partitionsystem",
+    "volume",
+}
+
+_TIMESTAMP_LOCAL_NAMES = {"atime", "crtime", "ctime", "mtime"}
+
+
+class DiskImageRecord:
+    __slots__ = ()
+
+
+class VolumeRecord:
+    __slots__ = ("annos", "ftype_str", "partition_offset")
+
+    def __init__(self) -> None:
+        self.annos: AbstractSet[str] = _NO_ANNOS
+        self.ftype_str: Optional[str] = None
+        self.partition_offset: Optional[int] = None
+
+
+# Attribute names of the file properties in FileRecord.
+FILE_PROPERTY_NAMES = (
+    "atime",
+    "crtime",
+    "ctime",
+    "filename",
+    "filesize",
+    "md5",
+    "mtime",
+    "sha1",
+    "sha256",
+)
+
+
+class FileRecord:
+    """
+    The file properties dfxml_to_case maps, and the file's differential annotations.  Attribute names match dfxml.objects.FileObject, so a FileRecord can be mapped in place of a FileObject.  Timestamps are kept as their ISO 8601 text.
+    """
+
+    __slots__ = FILE_PROPERTY_NAMES + ("annos",)
+
+    def __init__(self) -> None:
+        self.annos: AbstractSet[str] = _NO_ANNOS
+        self.atime: Optional[str] = None
+        self.crtime: Optional[str] = None
+        self.ctime: Optional[str] = None
+        self.filename: Optional[str] = None
+        self.filesize: Optional[int] = None
+        self.md5: Optional[str] = None
+        self.mtime: Optional[str] = None
+        self.sha1: Optional[str] = None
+        self.sha256: Optional[str] = None
+
+
+Record = Union[DiskImageRecord, FileRecord, VolumeRecord]
+
+
+@functools.lru_cache(maxsize=256)
+def _local_name(tag: str) -> str:
+    """
+    Strip the namespace from an element tag.  DFXML uses few distinct tags, so results are cached.
+
+    >>> _local_name("{http://www.forensicswiki.org/wiki/Category:Digital_Forensics_XML}fileobject")
+    'fileobject'
+    """
+    return tag.rsplit("}", 1)[-1]
+
+
+def _timestamp_text(text: str) -> str:
+    """
+    Return DFXML timestamp text as ISO 8601 text.  Older DFXML producers recorded timestamps as seconds since the Unix epoch.
+
+    >>> _timestamp_text("2001-02-03T04:05:06Z")
+    '2001-02-03T04:05:06Z'
+    >>> _timestamp_text("981173106")
+    '2001-02-03T04:05:06+00:00'
+    """
+    if _RX_EPOCH_TIMESTAMP.match(text):
+        return datetime.datetime.fromtimestamp(
+            float(text), datetime.timezone.utc
+        ).isoformat()
+    return text
+
+
+def _annos(element: ET.Element) -> AbstractSet[str]:
+    """
+    Read the differential annotations from an element's attributes.
+
+    >>> e_fileobject = ET.Element("fileobject", {
+    ...     "{%s}renamed_file" % XMLNS_DELTA: "1",
+    ...     "{%s}modified_file" % XMLNS_DELTA: "1",
+    ... })
+    >>> sorted(_annos(e_fileobject))
+    ['modified', 'renamed']
+    """
+    annos: Optional[Set[str]] = None
+    for key in element.attrib:
+        if not key.startswith(_DELTA_ATTRIBUTE_PREFIX):
+            continue
+        anno = key[len(_DELTA_ATTRIBUTE_PREFIX) :]
+        for suffix in ("_file", "_volume"):
+            if anno.endswith(suffix):
+                anno = anno[: -len(suffix)]
+                break
+        if annos is None:
+            annos = set()
+        annos.add(anno)
+    return _NO_ANNOS if annos is None else annos
+
+
+def _element_to_file_record(e_fileobject: ET.Element) -> FileRecord:
+    record = FileRecord()
+    if len(e_fileobject.attrib) > 0:
+        record.annos = _annos(e_fileobject)
+    for e_child in e_fileobject:
+        local_name = _local_name(e_child.tag)
+        text = e_child.text
+        if text is None:
+            continue
+        text = text.strip()
+        if text == "":
+            continue
+        if local_name == "filename":
+            # Filenames are not stripped of whitespace.
+            record.filename = e_child.text
+        elif local_name == "filesize":
+            record.filesize = int(text)
+        elif local_name in _TIMESTAMP_LOCAL_NAMES:
+            setattr(record, local_name, _timestamp_text(text))
+        elif local_name == "hashdigest":
+            hash_type = e_child.get("type", "").lower()
+            if hash_type in _HASH_TYPES:
+                setattr(record, hash_type, text)
+    return record
+
+
+def iterparse(source: Union[str, IO[bytes]]) -> Iterator[Tuple[str, Record]]:
+    """
+    Generator.  Yields (event, record) pairs for the disk images, volumes and files in a DFXML document.  source can be a file path or a binary file object.
+
+    >>> import io
+    >>> dfxml = b'''<dfxml xmlns="http://www.forensicswiki.org/wiki/Category:Digital_Forensics_XML" version="1.0">
+    ...   <volume>
+    ...     <partition_offset>512</partition_offset>
+    ...     <ftype_str>ntfs</ftype_str>
+    ...     <fileobject>
+    ...       <filename>a.txt</filename>
+    ...       <filesize>5</filesize>
+    ...       <mtime prec="100">2001-02-03T04:05:06Z</mtime>
+    ...       <hashdigest type="MD5">D41D8CD98F00B204E9800998ECF8427E</hashdigest>
+    ...       <byte_runs><byte_run file_offset="0" len="5"/></byte_runs>
+    ...     </fileobject>
+    ...   </volume>
+    ... </dfxml>'''
+    >>> for event, record in iterparse(io.BytesIO(dfxml)):
+    ...     if isinstance(record, VolumeRecord):
+    ...         print(event, "volume", record.ftype_str, record.partition_offset)
+    ...     elif isinstance(record, FileRecord):
+    ...         print(event, "file", record.filename, record.filesize, record.mtime, record.md5)
+    start volume ntfs 512
+    end file a.txt 5 2001-02-03T04:05:06Z D41D8CD98F00B204E9800998ECF8427E
+    end volume ntfs 512
+    """
+    element_stack: List[ET.Element] = []
+    # Volume records are held here until their properties are read.
+    # Key: id() of the volume element.
+    pending_volumes: Dict[int, VolumeRecord] = dict()
+    record_stack: List[Record] = []
+
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        local_name = _local_name(element.tag)
+        if event == "start":
+            parent = None if len(element_stack) == 0 else element_stack[-1]
+            element_stack.append(element)
+            if (
+                parent is not None
+                and _local_name(parent.tag) not in _CONTAINER_LOCAL_NAMES
+            ):
+                continue
+            if local_name not in _STRUCTURAL_LOCAL_NAMES:
+                continue
+            # A structural child ends the property list of a pending volume.
+            if parent is not None and id(parent) in pending_volumes:
+                yield ("start", pending_volumes.pop(id(parent)))
+            if local_name == "diskimageobject":
+                disk_image_record = DiskImageRecord()
+                record_stack.append(disk_image_record)
+                yield ("start", disk_image_record)
+            elif local_name == "volume":
+                volume_record = VolumeRecord()
+                if len(element.attrib) > 0:
+                    volume_record.annos = _annos(element)
+                record_stack.append(volume_record)
+                pending_volumes[id(element)] = volume_record
+            continue
+
+        # End event.
+        element_stack.pop()
+        parent = None if len(element_stack) == 0 else element_stack[-1]
+        parent_is_container = (
+            parent is None or _local_name(parent.tag) in _CONTAINER_LOCAL_NAMES
+        )
+        if not parent_is_container:
+            continue
+
+        if local_name == "fileobject":
+            yield ("end", _element_to_file_record(element))
+        elif local_name in {"diskimageobject", "volume"}:
+            if id(element) in pending_volumes:
+                yield ("start", pending_volumes.pop(id(element)))
+            yield ("end", record_stack.pop())
+        elif parent is not None and id(parent) in pending_volumes:
+            volume_record = pending_volumes[id(parent)]
+            text = (element.text or "").strip()
+            if text != "":
+                if local_name == "ftype_str":
+                    volume_record.ftype_str = text
+                elif local_name == "partition_offset":
+                    volume_record.partition_offset = int(text)
+
+        # Discard completed children of container elements.
+        if parent is not None:
+            element.clear()
+            parent.remove(element)
@@ -22,346 +22,126 @@ https://github.com/casework/CASE-Examples/blob/master/examples/illustrations/fil
 __version__ = "0.0.6"
 
 import argparse
+import io
 import logging
 import os
-from typing import Any, List, Optional
-
-import cdo_local_uuid
-from case_utils.inherent_uuid import (
-    L_MD5,
-    L_SHA1,
-    L_SHA256,
-    get_facet_uriref,
-    hash_method_value_uuid,
+import sys
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+    cast,
 )
-from case_utils.namespace import (
-    NS_OWL,
-    NS_RDF,
-    NS_RDFS,
-    NS_UCO_CORE,
-    NS_UCO_OBSERVABLE,
-    NS_UCO_TYPES,
-    NS_UCO_VOCABULARY,
-    NS_XSD,
-)
-from cdo_local_uuid import local_uuid
-from dfxml import objects as Objects
-from rdflib import Graph, Literal, Namespace, URIRef
-from rdflib.util import guess_format
+
+from case_dfxml import compressed_io
+from case_dfxml.progress import ProgressReader, ProgressReporter
+from case_dfxml.stats import RunStats
+
+# rdflib, case_utils, dfxml and the mapping modules built on them are
+# imported by the functions that use them, so --help, argument errors
+# and runs that do not need a module do not pay for importing it.
+if TYPE_CHECKING:
+    from case_dfxml.sqlite_store import SQLiteStore
 
 _logger = logging.getLogger(os.path.basename(__file__))
 
-NS_DRAFTING = Namespace("http://example.org/ontology/drafting/")
+# The output formats of case_dfxml.sinks.FORMAT_SINKS, listed here to
+# describe --streaming without importing rdflib.
+STREAMING_OUTPUT_FORMATS = (
+    "json-ld",
+    "nquads",
+    "nt",
+    "nt11",
+    "ntriples",
+    "ttl",
+    "turtle",
+)
 
+# Options that only affect how files are divided among worker processes,
+# and so are left out of the cdo_local_uuid demo base.
+_SCHEDULING_OPTIONS = ("--chunk-size", "--jobs")
 
-def _inline_storage_medium_range_definition(graph: Graph) -> None:
-    for triple in graph.triples(
-        (NS_DRAFTING.StorageMediumRange, NS_RDF.type, NS_OWL.Class)
-    ):
-        # Already defined once.
-        return
-    graph.add((NS_DRAFTING.StorageMediumRange, NS_RDF.type, NS_OWL.Class))
-    graph.add(
-        (
-            NS_DRAFTING.StorageMediumRange,
-            NS_RDFS.label,
-            Literal("StorageMediumRange", lang="en"),
-        )
-    )
-    graph.add(
-        (
-            NS_DRAFTING.StorageMediumRange,
-            NS_RDFS.subClassOf,
-            NS_UCO_OBSERVABLE.ObservableRelationship,
-        )
-    )
-    # The intended restrictions on the uco-core:Relationship properties
-    # are as follows, but aren't inlined in order to avoid duplicate blank node
-    # issues:
-    #
-    # kindOfRelationship: Contained_Within suggested.
-    # source: A storage system object, including File, FileSystem,
-    #         Partition, PartitionSystem, and non-File Image.
-    # target: The union of Image, Disk, and possibly a new class to
-    #         represent the available storage presented by multi-disk
-    #         storage systems (e.g. RAID arrays).
-
-
-def fileobject_to_trace(
-    graph: Graph,
-    ns_kb: Namespace,
-    fobj: Objects.FileObject,
-    *args: Any,
-    parent_trace: Optional[URIRef] = None,
-    use_inherent_uuids: bool = False,
-    **kwargs: Any
-) -> URIRef:
-    n_file = ns_kb["File-" + local_uuid()]
-    graph.add((n_file, NS_RDF.type, NS_UCO_OBSERVABLE.File))
-
-    # This variable should be accessed with one or more calls to _n_content_data_facet().
-    n_content_data_facet: Optional[URIRef] = None
-
-    def _n_content_data_facet(
-        *args: Any, use_inherent_uuids: bool = False, **kwargs: Any
-    ) -> URIRef:
-        """
-        Idempotent initialization of n_content_data_facet.
-        """
-        nonlocal n_content_data_facet
-        if n_content_data_facet is None:
-            if use_inherent_uuids:
-                n_content_data_facet = get_facet_uriref(
-                    n_file, NS_UCO_OBSERVABLE.ContentDataFacet, namespace=ns_kb
-                )
-            else:
-                n_content_data_facet = ns_kb["ContentDataFacet-" + local_uuid()]
-            graph.add(
-                (n_content_data_facet, NS_RDF.type, NS_UCO_OBSERVABLE.ContentDataFacet)
-            )
-            graph.add((n_file, NS_UCO_CORE.hasFacet, n_content_data_facet))
-        return n_content_data_facet
-
-    # This variable should be accessed with one or more calls to _n_file_facet().
-    n_file_facet: Optional[URIRef] = None
-
-    def _n_file_facet(
-        *args: Any, use_inherent_uuids: bool = False, **kwargs: Any
-    ) -> URIRef:
-        """
-        Idempotent initialization of n_file_facet.
-        """
-        nonlocal n_file_facet
-        if n_file_facet is None:
-            if use_inherent_uuids:
-                n_file_facet = get_facet_uriref(
-                    n_file, NS_UCO_OBSERVABLE.FileFacet, namespace=ns_kb
-                )
-            else:
-                n_file_facet = ns_kb["FileFacet-" + local_uuid()]
-            graph.add((n_file_facet, NS_RDF.type, NS_UCO_OBSERVABLE.FileFacet))
-            graph.add((n_file, NS_UCO_CORE.hasFacet, n_file_facet))
-        return n_file_facet
-
-    if fobj.filename:
-        graph.add((_n_file_facet(), NS_UCO_OBSERVABLE.filePath, Literal(fobj.filename)))
-    if fobj.atime:
-        graph.add(
-            (
-                _n_file_facet(),
-                NS_UCO_OBSERVABLE.accessedTime,
-                Literal(str(fobj.atime), datatype=NS_XSD.dateTime),
-            )
-        )
-    if fobj.ctime:
-        graph.add(
-            (
-                _n_file_facet(),
-                NS_UCO_OBSERVABLE.metadataChangeTime,
-                Literal(str(fobj.ctime), datatype=NS_XSD.dateTime),
-            )
-        )
-    if fobj.crtime:
-        graph.add(
-            (
-                _n_file_facet(),
-                NS_UCO_OBSERVABLE.observableCreatedTime,
-                Literal(str(fobj.crtime), datatype=NS_XSD.dateTime),
-            )
-        )
-    if fobj.mtime:
-        graph.add(
-            (
-                _n_file_facet(),
-                NS_UCO_OBSERVABLE.modifiedTime,
-                Literal(str(fobj.mtime), datatype=NS_XSD.dateTime),
-            )
-        )
+# Names formerly defined in this module, now defined in
+# case_dfxml.traces.
+_TRACES_NAMES = frozenset(
+    {"CHANGE_ANNOS", "fileobject_to_trace", "volumeobject_to_trace"}
+)
 
-    if fobj.filesize is not None:
-        graph.add(
-            (
-                _n_content_data_facet(use_inherent_uuids=use_inherent_uuids),
-                NS_UCO_OBSERVABLE.sizeInBytes,
-                Literal(fobj.filesize),
-            )
-        )
-        graph.add(
-            (_n_file_facet(), NS_UCO_OBSERVABLE.sizeInBytes, Literal(fobj.filesize))
-        )
 
-    def _add_hash(
-        l_hash_method: Literal,
-        s_hash_value: str,
-        *args: Any,
-        use_inherent_uuids: bool = False,
-        **kwargs: Any
-    ) -> None:
-        l_hash_value = Literal(s_hash_value, datatype=NS_XSD.hexBinary)
-        if use_inherent_uuids:
-            n_hash = ns_kb[
-                "Hash-" + str(hash_method_value_uuid(l_hash_method, l_hash_value))
-            ]
-        else:
-            n_hash = ns_kb["Hash-" + local_uuid()]
-        graph.add((n_hash, NS_RDF.type, NS_UCO_TYPES.Hash))
-        graph.add((n_hash, NS_UCO_TYPES.hashMethod, l_hash_method))
-        graph.add((n_hash, NS_UCO_TYPES.hashValue, l_hash_value))
-        graph.add((_n_content_data_facet(), NS_UCO_OBSERVABLE.hash, n_hash))
-
-    if fobj.md5:
-        _add_hash(L_MD5, fobj.md5)
-    if fobj.sha1:
-        _add_hash(L_SHA1, fobj.sha1)
-    if fobj.sha256:
-        _add_hash(L_SHA256, fobj.sha256)
-
-    if parent_trace is not None:
-        # Create a parent-child relationship.
-        n_relationship = ns_kb["Relationship-" + local_uuid()]
-        graph.add(
-            (n_relationship, NS_RDF.type, NS_UCO_OBSERVABLE.ObservableRelationship)
-        )
-        graph.add((n_relationship, NS_UCO_CORE.isDirectional, Literal(True)))
-        graph.add((n_relationship, NS_UCO_CORE.kindOfRelationship, Literal("Child_Of")))
-        graph.add((n_relationship, NS_UCO_CORE.source, n_file))
-        graph.add((n_relationship, NS_UCO_CORE.target, parent_trace))
-        # _logger.debug("Parent: %r." % parent_trace)
-        # _logger.debug("Child: %r." % n_file)
-
-    return n_file
-
-
-def volumeobject_to_trace(
-    graph: Graph,
-    ns_kb: Namespace,
-    vobj: Objects.VolumeObject,
-    *args: Any,
-    container_image_trace: Optional[URIRef] = None,
-    use_inherent_uuids: bool = False,
-    **kwargs: Any
-) -> URIRef:
-    # Behave differently depending on whether vobj is a file system or an archive.
-    if vobj.ftype_str == "7z":
-        n_volume = ns_kb["File-" + local_uuid()]
-        graph.add((n_volume, NS_RDF.type, NS_UCO_OBSERVABLE.ArchiveFile))
-    else:
-        n_volume = ns_kb["FileSystem-" + local_uuid()]
-        graph.add((n_volume, NS_RDF.type, NS_UCO_OBSERVABLE.FileSystem))
-
-        # This variable should be accessed with one or more calls to _n_file_system_facet().
-        n_file_system_facet: Optional[URIRef] = None
-
-        def _n_file_system_facet() -> URIRef:
-            """
-            Idempotent initialization of n_file_system_facet.
-            """
-            nonlocal n_file_system_facet
-            # nonlocal use_inherent_uuids
-            if n_file_system_facet is None:
-                if use_inherent_uuids:
-                    n_file_system_facet = get_facet_uriref(
-                        n_volume, NS_UCO_OBSERVABLE.FileSystemFacet, namespace=ns_kb
-                    )
-                else:
-                    n_file_system_facet = ns_kb["FileSystmFacet-" + local_uuid()]
-                graph.add(
-                    (
-                        n_file_system_facet,
-                        NS_RDF.type,
-                        NS_UCO_OBSERVABLE.FileSystemFacet,
-                    )
-                )
-                graph.add((n_volume, NS_UCO_CORE.hasFacet, n_file_system_facet))
-            return n_file_system_facet
+def __getattr__(name: str) -> Any:
+    if name in _TRACES_NAMES:
+        from case_dfxml import traces
 
-        if vobj.ftype_str:
-            # Default to uppercase of DFXML's value.
-            graph.add(
-                (
-                    _n_file_system_facet(),
-                    NS_UCO_OBSERVABLE.fileSystemType,
-                    Literal(vobj.ftype_str.upper()),
-                )
-            )
-        if vobj.partition_offset is not None:
-            # Create a contained-within relationship to anchor what the
-            # offset is relative to.
-            # To disambiguate from other Contained_Within-described
-            # relationships, assign a type.
-            # TODO - vobj.partition_offset entails that a
-            # PartitionObject exists.  This is something that may need
-            # to be adjusted in the schema.
-            _n_container: URIRef
-            if container_image_trace is None:
-                _n_container = ns_kb["ObservableObject-" + local_uuid()]
-                graph.add(
-                    (_n_container, NS_RDF.type, NS_UCO_OBSERVABLE.ObservableObject)
-                )
-                graph.add(
-                    (
-                        _n_container,
-                        NS_RDFS.comment,
-                        Literal(
-                            "This object was created as a placeholder for a file system object that described itself as having a location-offset from its most-directly-containing storage medium, but without having a recorded reference to the storage medium object."
-                        ),
-                    )
-                )
-            else:
-                _n_container = container_image_trace
+        return getattr(traces, name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
-            n_relationship = ns_kb["Relationship-" + local_uuid()]
-            graph.add(
-                (
-                    n_relationship,
-                    NS_RDF.type,
-                    NS_UCO_OBSERVABLE.ObservableRelationship,
-                )
-            )
-            graph.add(
-                (
-                    n_relationship,
-                    NS_RDF.type,
-                    NS_DRAFTING.StorageMediumRange,
-                )
-            )
-            _inline_storage_medium_range_definition(graph)
-            graph.add((n_relationship, NS_UCO_CORE.isDirectional, Literal(True)))
-            graph.add(
-                (
-                    n_relationship,
-                    NS_UCO_CORE.kindOfRelationship,
-                    Literal("Contained_Within"),
-                )
-            )
-            graph.add((n_relationship, NS_UCO_CORE.source, n_volume))
-            graph.add((n_relationship, NS_UCO_CORE.target, _n_container))
-            # _logger.debug("Container: %r." % _n_container)
-            # _logger.debug("Containee: %r." % n_file_system)
-            if use_inherent_uuids:
-                n_data_range_facet = get_facet_uriref(
-                    n_relationship, NS_UCO_OBSERVABLE.DataRangeFacet, namespace=ns_kb
-                )
-            else:
-                n_data_range_facet = ns_kb["DataRangeFacet-" + local_uuid()]
-            graph.add(
-                (n_data_range_facet, NS_RDF.type, NS_UCO_OBSERVABLE.DataRangeFacet)
-            )
-            graph.add(
-                (
-                    n_data_range_facet,
-                    NS_UCO_OBSERVABLE.rangeOffset,
-                    Literal(vobj.partition_offset),
-                )
-            )
-            graph.add((n_relationship, NS_UCO_CORE.hasFacet, n_data_range_facet))
 
-    return n_volume
+def _unscheduled_argv(argv: Sequence[str]) -> List[str]:
+    """
+    Return argv without the options of _SCHEDULING_OPTIONS and their values.
 
+    >>> _unscheduled_argv(["--jobs", "4", "--chunk-size=3", "--debug", "in.dfxml", "out.ttl"])
+    ['--debug', 'in.dfxml', 'out.ttl']
+    """
+    unscheduled_argv: List[str] = []
+    skip_value = False
+    for arg in argv:
+        if skip_value:
+            skip_value = False
+        elif arg in _SCHEDULING_OPTIONS:
+            skip_value = True
+        elif arg.split("=", 1)[0] not in _SCHEDULING_OPTIONS:
+            unscheduled_argv.append(arg)
+    return unscheduled_argv
 
-def main() -> None:
+
+def _configure_demo_uuid_base() -> Optional[str]:
+    """
+    Call cdo_local_uuid.configure, which builds its demo base from the command line, with the scheduling options left out of the command line, so non-random UUIDs do not depend on --jobs or --chunk-size.  Returns the demo base, or None if non-random UUIDs were not requested.
+    """
+    import cdo_local_uuid
+
+    argv = sys.argv
+    sys.argv = argv[:1] + _unscheduled_argv(argv[1:])
+    try:
+        cdo_local_uuid.configure()
+    finally:
+        sys.argv = argv
+    return cdo_local_uuid.DEMO_UUID_BASE
+
+
+def make_argument_parser() -> argparse.ArgumentParser:
     argument_parser = argparse.ArgumentParser()
     argument_parser.add_argument("-d", "--debug", action="store_true")
+    argument_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=10000,
+        help="With --jobs, the number of files mapped per work unit.",
+    )
+    argument_parser.add_argument(
+        "--hash-cache-size",
+        type=int,
+        default=65536,
+        help="With --use-inherent-uuids, the number of distinct hashes whose Hash nodes are remembered, so repeated file content references the Hash node already emitted instead of emitting it again.  With --jobs, each worker process keeps its own cache.  0 disables the cache.",
+    )
+    argument_parser.add_argument(
+        "--input-compression",
+        choices=compressed_io.COMPRESSION_CHOICES,
+        default="auto",
+        help="Compression codec of in_dfxml, which is decompressed as it is read.  'auto' chooses by the file extension: .gz, .bz2, .xz or .zst.  Compressed input implies --fast-reader.  (Default: %(default)s.)",
+    )
+    argument_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes to map files with.  Values above 1 imply --fast-reader.  When non-random UUIDs are requested through cdo_local_uuid, each file derives its UUIDs from its position in the input, and --jobs and --chunk-size are left out of the demo base, so output matches that of --jobs 1.",
+    )
     argument_parser.add_argument(
         "--kb-prefix-label",
         default="kb",
@@ -372,29 +152,201 @@ def main() -> None:
         default="http://example.org/kb/",
         help="Prefix IRI to use for knowledge-base individuals.  E.g. with defaults, 'http://example.org/kb/Thing-1' would compact to 'kb:Thing-1'.",
     )
+    argument_parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="Read in_dfxml as differential DFXML, such as output by make_differential_dfxml, and map only the files and volumes annotated as new, deleted, renamed, changed, or modified, annotating each with drafting:deltaAnnotation.  Disk images and volumes are only mapped if they are changed or contain a changed file.",
+    )
+    argument_parser.add_argument(
+        "--fast-reader",
+        action="store_true",
+        help="Read the DFXML input with case_dfxml.dfxml_reader, which only retains the DFXML properties this program maps, instead of with dfxml.objects.iterparse.",
+    )
+    argument_parser.add_argument(
+        "--graph-name",
+        help="IRI of the named graph to use when streaming N-Quads output.  If absent, triples are written to the default graph.",
+    )
+    argument_parser.add_argument(
+        "--output-compression",
+        choices=compressed_io.COMPRESSION_CHOICES,
+        default="auto",
+        help="Compression codec of out_graph, which is compressed as it is written.  'auto' chooses by the file extension, and the output format is then guessed from the extension before it.  (Default: %(default)s.)",
+    )
     argument_parser.add_argument(
         "--output-format", help="Override extension-based format guesser."
     )
+    argument_parser.add_argument(
+        "--progress-file",
+        help="Also write each progress report to this file, as one JSON object per line, including a final report when mapping ends.",
+    )
+    argument_parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=30.0,
+        help="Seconds between logged progress reports, giving the rate, an estimated time remaining, and the resident set size.  With --fast-reader, progress is measured by the offset into in_dfxml; otherwise, only by files read.  0 disables progress reports.  (Default: %(default)s.)",
+    )
+    argument_parser.add_argument(
+        "--profile",
+        help="Write a cProfile profile of the mapping phase to this file, readable with the pstats module.",
+    )
+    argument_parser.add_argument(
+        "--shard-by",
+        choices=("files", "triples", "volume"),
+        help="Write out_graph as a directory of shard files, as with --streaming, instead of as one file.  'volume' starts a shard at the start and end of each disk image and volume; 'files' and 'triples' start a shard once the current one holds --shard-size files or triples.  The directory's manifest.json lists the shards, their triple and file counts, and the disk images and file systems referenced from shards other than their own.  Each shard includes the Hash nodes it references, so only disk images and file systems are shared between shards.",
+    )
+    argument_parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=100000,
+        help="With --shard-by files or triples, the number of files or triples per shard.  Shards are only split between mapped objects, and with --jobs, between work units.  (Default: %(default)s.)",
+    )
+    argument_parser.add_argument(
+        "--stats",
+        help="Write a JSON report of this run to this file: wall and CPU time of the parse, map and serialize phases, peak resident set size, and counts of mapped images, volumes, files, hashes, relationships and triples.  When streaming, writing output is included in the map phase.",
+    )
+    argument_parser.add_argument(
+        "--store",
+        help="Directory of disk-backed graph stores.  If given, the output graph is accumulated in a SQLite database in this directory instead of in memory.  A database populated by an earlier run over the same, unmodified input file with the same options is reused without re-mapping.  Not compatible with --streaming.",
+    )
+    argument_parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Write triples to out_graph as each DFXML object is mapped, instead of accumulating an in-memory graph.  Memory use then does not grow with the number of files.  Supported output formats: %s."
+        % ", ".join(STREAMING_OUTPUT_FORMATS),
+    )
     argument_parser.add_argument("--use-inherent-uuids", action="store_true")
-    argument_parser.add_argument("in_dfxml")
+    argument_parser.add_argument(
+        "--uuid-mode",
+        choices=("counter", "random"),
+        default="random",
+        help="How to generate the UUIDs of node IRIs that are not inherent.  'random' generates random UUIDs in bulk, or non-random UUIDs when requested through cdo_local_uuid.  'counter' shares one random run UUID across the run, with its last 48 bits replaced by a counter; when non-random UUIDs are requested through cdo_local_uuid, the run UUID is derived from the cdo_local_uuid demo base.",
+    )
+    argument_parser.add_argument(
+        "in_dfxml",
+        help="A DFXML file, or '-' to read standard input.  Standard input implies --fast-reader.",
+    )
     argument_parser.add_argument(
         "out_graph",
-        help="A self-contained RDF graph file, in the format either requested by --output-format or guessed based on extension.",
+        help="A self-contained RDF graph file, in the format either requested by --output-format or guessed based on extension, or '-' to write standard output, in Turtle unless --output-format is passed.",
     )
-    args = argument_parser.parse_args()
+    return argument_parser
 
-    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+def parse_args(
+    argument_parser: argparse.ArgumentParser, argv: Optional[Sequence[str]] = None
+) -> argparse.Namespace:
+    """
+    Parse and check a dfxml_to_case command line, exiting through argument_parser on errors.  If no output format was requested, the format guessed from out_graph is stored in output_format.  The compression codecs of in_dfxml and out_graph, or None, are stored in input_codec and output_codec.
+    """
+    args = argument_parser.parse_args(argv)
+
+    args.input_codec = compressed_io.codec_for_path(
+        args.in_dfxml, args.input_compression
+    )
+    args.output_codec = compressed_io.codec_for_path(
+        args.out_graph, args.output_compression
+    )
+    if args.output_format is None:
+        from rdflib.util import guess_format
+
+        args.output_format = guess_format(
+            compressed_io.strip_codec_extension(args.out_graph)
+        )
+    if args.output_format is None:
+        args.output_format = "turtle"
+    if args.jobs < 1:
+        argument_parser.error("--jobs must be at least 1.")
+    if args.chunk_size < 1:
+        argument_parser.error("--chunk-size must be at least 1.")
+    if args.hash_cache_size < 0:
+        argument_parser.error("--hash-cache-size must not be negative.")
+    if args.store is not None and args.in_dfxml == compressed_io.STDIO_PATH:
+        argument_parser.error("--store requires in_dfxml to be a file.")
+    if args.shard_size < 1:
+        argument_parser.error("--shard-size must be at least 1.")
+    if args.shard_by is not None:
+        if args.out_graph == compressed_io.STDIO_PATH:
+            argument_parser.error("--shard-by requires out_graph to be a directory.")
+        if args.store is not None:
+            argument_parser.error("--shard-by and --store are mutually exclusive.")
+        if args.output_format not in STREAMING_OUTPUT_FORMATS:
+            argument_parser.error(
+                "--shard-by does not support output format %r." % args.output_format
+            )
+    if args.streaming and args.store is not None:
+        argument_parser.error("--streaming and --store are mutually exclusive.")
+    if args.streaming and args.output_format not in STREAMING_OUTPUT_FORMATS:
+        argument_parser.error(
+            "--streaming does not support output format %r." % args.output_format
+        )
+    return args
+
+
+def convert(args: argparse.Namespace) -> None:
+    """
+    Convert args.in_dfxml to args.out_graph, with args as returned by parse_args.
+    """
+    from case_utils.namespace import (
+        NS_OWL,
+        NS_RDFS,
+        NS_UCO_CORE,
+        NS_UCO_OBSERVABLE,
+        NS_UCO_TYPES,
+        NS_UCO_VOCABULARY,
+        NS_XSD,
+    )
+    from rdflib import Graph, Namespace, URIRef
+
+    from case_dfxml import dfxml_reader
+    from case_dfxml.mapping import HashInterner
+    from case_dfxml.minting import NodeMinter
+    from case_dfxml.namespace import NS_DRAFTING
+    from case_dfxml.sinks import (
+        FORMAT_EXTENSIONS,
+        FORMAT_SINKS,
+        GraphLike,
+        JSONLDSink,
+        NQuadsSink,
+        ShardedSink,
+        TripleSink,
+        write_graph,
+    )
+    from case_dfxml.traces import EventMapper, _ParallelFileMapper, dfxml_classes
+
+    output_format = args.output_format
 
     # See cdo_local_uuid._demo_uuid for how to use this to set up
     # a process call that opts in to nonrandom UUIDs.  Opting in is
     # beneficial for generating and version-controlling example runs of
     # this tool, but might not be appropriate for production operation.
-    cdo_local_uuid.configure()
+    demo_uuid_base = _configure_demo_uuid_base()
+
+    run_stats = RunStats("dfxml_to_case", profile_path=args.profile)
 
     # Define Namespace object to assist with generating individual nodes.
     ns_kb = Namespace(args.kb_prefix_iri)
+    node_minter = NodeMinter(
+        ns_kb, counter=args.uuid_mode == "counter", demo_uuid_base=demo_uuid_base
+    )
 
-    graph = Graph()
+    store: Optional["SQLiteStore"] = None
+    if args.store is None:
+        graph = Graph()
+    else:
+        from case_dfxml import sqlite_store
+
+        graph, store = sqlite_store.open_graph(
+            args.store,
+            sqlite_store.fingerprint(
+                args.in_dfxml,
+                demo_uuid_base=demo_uuid_base,
+                kb_prefix_iri=args.kb_prefix_iri,
+                delta=args.delta,
+                program="dfxml_to_case",
+                use_inherent_uuids=args.use_inherent_uuids,
+                uuid_mode=args.uuid_mode,
+            ),
+        )
     graph.bind("drafting", NS_DRAFTING)
     graph.bind("owl", NS_OWL)
     graph.bind("rdfs", NS_RDFS)
@@ -414,53 +366,207 @@ def main() -> None:
     # multiple tools contribute to the same graph.
     graph.namespace_manager.bind("xsd", NS_XSD)
 
-    trace_image_stack: List[URIRef] = []
-    trace_object_stack: List[URIRef] = []
-    for event, obj in Objects.iterparse(args.in_dfxml):
-        container_image_trace = (
-            None if len(trace_image_stack) == 0 else trace_image_stack[-1]
+    def _make_sink(out_fh: TextIO) -> TripleSink:
+        sink_class = FORMAT_SINKS[output_format]
+        if sink_class is NQuadsSink:
+            return NQuadsSink(
+                out_fh,
+                namespace_manager=graph.namespace_manager,
+                graph_name=None if args.graph_name is None else URIRef(args.graph_name),
+            )
+        return sink_class(out_fh, namespace_manager=graph.namespace_manager)
+
+    hash_interner = HashInterner(maxsize=args.hash_cache_size)
+
+    # When streaming, the Graph above is only used for its namespace
+    # bindings, and mapped triples go to the sink instead.
+    out_fh: Optional[TextIO] = None
+    sink: Optional[TripleSink] = None
+    sharded_sink: Optional[ShardedSink] = None
+    if args.shard_by is not None:
+        os.makedirs(args.out_graph, exist_ok=True)
+        # Each shard emits the Hash nodes it references.
+        sharded_sink = ShardedSink(
+            args.out_graph,
+            _make_sink,
+            codec=args.output_codec,
+            counted_class=(
+                NS_UCO_OBSERVABLE.File if args.shard_by == "files" else None
+            ),
+            extension=FORMAT_EXTENSIONS[output_format],
+            namespace_manager=graph.namespace_manager,
+            on_next_shard=hash_interner.clear,
+            shard_size=None if args.shard_by == "volume" else args.shard_size,
+            shared_classes=(
+                NS_UCO_OBSERVABLE.ArchiveFile,
+                NS_UCO_OBSERVABLE.FileSystem,
+                NS_UCO_OBSERVABLE.Image,
+            ),
         )
-        parent_trace = None if len(trace_object_stack) == 0 else trace_object_stack[-1]
-        if event == "start":
-            if isinstance(obj, Objects.DiskImageObject):
-                # TODO This logic implements a stub to handle volume.partition_offset.
-                trace = ns_kb["Image-" + local_uuid()]
-                graph.add((trace, NS_RDF.type, NS_UCO_OBSERVABLE.Image))
-                trace_image_stack.append(trace)
-                trace_object_stack.append(trace)
-            elif isinstance(obj, Objects.VolumeObject):
-                trace = volumeobject_to_trace(
-                    graph,
-                    ns_kb,
-                    obj,
-                    container_image_trace=container_image_trace,
-                    use_inherent_uuids=args.use_inherent_uuids,
-                )
-                trace_object_stack.append(trace)
-        elif event == "end":
-            if isinstance(obj, Objects.DiskImageObject):
-                trace_image_stack.pop()
-                trace_object_stack.pop()
-            elif isinstance(obj, Objects.VolumeObject):
-                trace_object_stack.pop()
-            elif isinstance(obj, Objects.FileObject):
-                trace = fileobject_to_trace(
-                    graph,
-                    ns_kb,
-                    obj,
-                    parent_trace=parent_trace,
-                    use_inherent_uuids=args.use_inherent_uuids,
-                )
+        sink = sharded_sink
+    elif args.streaming:
+        out_fh = cast(
+            TextIO, compressed_io.open_text(args.out_graph, "w", args.output_codec)
+        )
+        sink = _make_sink(out_fh)
+    target: GraphLike = graph if sink is None else sink
+
+    events: Iterator[Tuple[str, Any]]
+    parallel_file_mapper: Optional[_ParallelFileMapper] = None
+    # A completely populated store from an earlier run needs no mapping.
+    reuse_store = store is not None and store.complete
+    if args.jobs > 1 and not reuse_store:
+        parallel_file_mapper = _ParallelFileMapper(
+            target,
+            ns_kb,
+            jobs=args.jobs,
+            chunk_size=args.chunk_size,
+            delta_annotations=args.delta,
+            # Workers cannot tell where shards end, so when sharding,
+            # they emit each Hash node every time it is referenced.
+            hash_cache_size=0 if sharded_sink is not None else args.hash_cache_size,
+            node_minter=node_minter,
+            use_inherent_uuids=args.use_inherent_uuids,
+        )
+    # Progress is measured by the offset into the input file, where the
+    # reader can be given a file object, and otherwise by files read.
+    progress_file: Optional[TextIO] = None
+    if args.progress_file is not None:
+        progress_file = open(args.progress_file, "w", encoding="utf-8")
+    progress_reader: Optional[ProgressReader] = None
+    if reuse_store:
+        _logger.info("Reusing graph store in %r.", args.store)
+        events = iter(())
+    elif (
+        args.fast_reader
+        or parallel_file_mapper is not None
+        or args.input_codec is not None
+        or args.in_dfxml == compressed_io.STDIO_PATH
+    ):
+        # dfxml.objects.iterparse reads from a path, so compressed input
+        # and standard input are read with the fast reader.  Progress is
+        # then measured by the offset into the compressed file.
+        progress_reader = ProgressReader(compressed_io.open_raw(args.in_dfxml, "rb"))
+        events = dfxml_reader.iterparse(
+            compressed_io.decompressing_reader(
+                io.BufferedReader(progress_reader), args.input_codec
+            )
+        )
+    else:
+        from dfxml import objects as Objects
+
+        events = Objects.iterparse(args.in_dfxml)
+    progress = ProgressReporter(
+        "dfxml_to_case",
+        "map",
+        total=(
+            None
+            if progress_reader is None or args.in_dfxml == compressed_io.STDIO_PATH
+            else os.path.getsize(args.in_dfxml)
+        ),
+        unit="files" if progress_reader is None else "bytes",
+        interval=args.progress_interval,
+        side_channel=progress_file,
+    )
+    event_mapper = EventMapper(
+        target,
+        ns_kb,
+        delta_annotations=args.delta and not reuse_store,
+        hash_interner=hash_interner,
+        node_minter=node_minter,
+        parallel_file_mapper=parallel_file_mapper,
+        run_stats=run_stats,
+        use_inherent_uuids=args.use_inherent_uuids,
+    )
+    if args.stats is not None or args.profile is not None:
+        # Timing each event costs a generator frame and two clock reads,
+        # so parse time is only separated from map time when reported.
+        events = run_stats.timed_iter("parse", events)
+    # With --shard-by volume, each disk image and volume starts a shard,
+    # and so does the content following each.
+    shard_classes: Tuple[Any, ...] = ()
+    if sharded_sink is not None and args.shard_by == "volume":
+        image_classes, volume_classes, _ = dfxml_classes()
+        shard_classes = image_classes + volume_classes
+    with run_stats.phase("map", profile=True):
+        for event, obj in events:
+            if isinstance(obj, shard_classes):
+                assert sharded_sink is not None
+                if parallel_file_mapper is not None:
+                    parallel_file_mapper.drain()
+                sharded_sink.next_shard()
+            event_mapper.map_event(event, obj)
+            progress.update(
+                (
+                    event_mapper.files_read
+                    if progress_reader is None
+                    else progress_reader.offset
+                ),
+                event_mapper.files_read,
+            )
+            if sink is not None:
+                sink.flush()
+        if parallel_file_mapper is not None:
+            parallel_file_mapper.close()
+        if store is not None:
+            store.mark_complete()
+    if progress_reader is not None:
+        progress_reader.close()
+    progress.finish(
+        (
+            event_mapper.files_read
+            if progress_reader is None
+            else progress_reader.offset
+        ),
+        event_mapper.files_read,
+    )
 
     # Write output file.
-    output_format = (
-        guess_format(args.out_graph)
-        if args.output_format is None
-        else args.output_format
-    )
-    if output_format is None:
-        output_format = "turtle"
-    graph.serialize(destination=args.out_graph, format=output_format)
+    with run_stats.phase("serialize"):
+        if sink is None:
+            run_stats.count("triples", len(graph))
+            if output_format == "json-ld":
+                # rdflib's JSON-LD serializer is slow on large graphs, and
+                # the streaming writer's output reads back as the same
+                # graph.
+                with compressed_io.open_text(
+                    args.out_graph, "w", args.output_codec
+                ) as out_text_fh:
+                    write_graph(
+                        graph,
+                        JSONLDSink(
+                            cast(TextIO, out_text_fh),
+                            namespace_manager=graph.namespace_manager,
+                        ),
+                    )
+            elif (
+                args.output_codec is None and args.out_graph != compressed_io.STDIO_PATH
+            ):
+                graph.serialize(destination=args.out_graph, format=output_format)
+            else:
+                with compressed_io.open_binary(
+                    args.out_graph, "wb", args.output_codec
+                ) as out_binary_fh:
+                    graph.serialize(destination=out_binary_fh, format=output_format)
+            if store is not None:
+                graph.close()
+        else:
+            sink.close()
+            run_stats.count("triples", sink.triple_count)
+            if out_fh is not None:
+                out_fh.close()
+    if progress_file is not None:
+        progress_file.close()
+    if args.stats is not None or args.profile is not None:
+        run_stats.write(args.stats)
+
+
+def main() -> None:
+    args = parse_args(make_argument_parser())
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    convert(args)
 
 
 if __name__ == "__main__":
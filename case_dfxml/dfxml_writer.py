@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module provides an incremental DFXML writer.  Instead of appending every VolumeObject and FileObject to a DFXMLObject and serializing the whole document at the end, the writer emits the document header and metadata first, and then each element as soon as it is assembled.
+
+The writer relies only on the to_Element method of dfxml.objects classes, serializing each object's element on its own.  Container elements (the DFXML document itself, and volumes) are written as an opening tag with their own properties, and closed once their children have been written.
+"""
+
+__version__ = "0.1.0"
+
+import xml.etree.ElementTree as ET
+from typing import List, Protocol, TextIO, Tuple
+
+
+class ElementSource(Protocol):
+    def to_Element(self) -> ET.Element: ...
+
+
+def _split_element(element: ET.Element) -> Tuple[str, str]:
+    """
+    Serialize an element, and split the serialization into the text up to and including its last child, and its closing tag.
+
+    >>> element = ET.Element("volume")
+    >>> ET.SubElement(element, "ftype_str").text = "ntfs"
+    >>> _split_element(element)
+    ('<volume><ftype_str>ntfs</ftype_str>', '</volume>')
+    >>> _split_element(ET.Element("volume", attrib={"offset": "0"}))
+    ('<volume offset="0">', '</volume>')
+    """
+    text = ET.tostring(element, encoding="unicode")
+    if text.endswith("/>"):
+        start_tag = text[:-2].rstrip() + ">"
+        tag_name = start_tag[1:-1].split()[0]
+        return (start_tag, "</%s>" % tag_name)
+    split_index = text.rindex("</")
+    return (text[:split_index], text[split_index:])
+
+
+class DFXMLWriter:
+    """
+    Writes a DFXML document to out_fh incrementally.  The DFXMLObject passed to the constructor supplies the document header and metadata, and should not have volumes or files appended to it.
+
+    >>> import io
+    >>> class _Demo:
+    ...     def __init__(self, tag, text=None):
+    ...         self.tag = tag
+    ...         self.text = text
+    ...     def to_Element(self):
+    ...         element = ET.Element(self.tag)
+    ...         if self.text is not None:
+    ...             ET.SubElement(element, "filename").text = self.text
+    ...         return element
+    >>> out_fh = io.StringIO()
+    >>> with DFXMLWriter(out_fh, _Demo("dfxml")) as writer:
+    ...     writer.open_volume(_Demo("volume"))
+    ...     writer.write_file(_Demo("fileobject", "a.txt"))
+    ...     writer.close_volume()
+    ...     writer.write_file(_Demo("fileobject", "b.txt"))
+    >>> print(out_fh.getvalue())
+    <?xml version="1.0" encoding="UTF-8"?>
+    <dfxml>
+    <volume>
+    <fileobject><filename>a.txt</filename></fileobject>
+    </volume>
+    <fileobject><filename>b.txt</filename></fileobject>
+    </dfxml>
+    <BLANKLINE>
+    """
+
+    def __init__(self, out_fh: TextIO, dobj: ElementSource) -> None:
+        self.out_fh = out_fh
+        self.dobj = dobj
+        self._closing_tags: List[str] = []
+        self._header_written = False
+
+    def __enter__(self) -> "DFXMLWriter":
+        self.write_header()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def _open(self, obj: ElementSource) -> None:
+        start_text, closing_tag = _split_element(obj.to_Element())
+        self.out_fh.write(start_text)
+        self.out_fh.write("\n")
+        self._closing_tags.append(closing_tag)
+
+    def _close(self) -> None:
+        self.out_fh.write(self._closing_tags.pop())
+        self.out_fh.write("\n")
+
+    def write_header(self) -> None:
+        if self._header_written:
+            return
+        self.out_fh.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        self._open(self.dobj)
+        self._header_written = True
+
+    def open_volume(self, vobj: ElementSource) -> None:
+        """
+        Write a volume's opening tag and properties.  Files written until close_volume is called are written as children of the volume.
+        """
+        self.write_header()
+        self._open(vobj)
+
+    def close_volume(self) -> None:
+        if len(self._closing_tags) < 2:
+            raise ValueError("close_volume called without an open volume.")
+        self._close()
+
+    def write_file(self, fobj: ElementSource) -> None:
+        self.write_header()
+        self.out_fh.write(ET.tostring(fobj.to_Element(), encoding="unicode"))
+        self.out_fh.write("\n")
+
+    def close(self) -> None:
+        """
+        Close any open volumes and the document.  This does not close out_fh.
+        """
+        self.write_header()
+        while len(self._closing_tags) > 0:
+            self._close()
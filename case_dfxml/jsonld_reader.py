@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module provides a streaming reader for JSON-LD in the shape CASE data is commonly written: a top-level @graph array (or a bare top-level array) of node objects, with facets inline or referenced by @id, and an optional @context of prefixes and term definitions.
+
+Node objects are decoded one at a time from the input stream, and only triples with predicates in case_dfxml.case_index.MAPPED_PREDICATES are kept.  Peak memory is therefore proportional to the retained subset of the graph, plus the largest single node object.
+
+JSON-LD features outside that shape, such as remote or node-scoped contexts, @list, @reverse, or a @context that follows the @graph array, raise UnsupportedJSONLDError.  Callers can fall back to rdflib's JSON-LD parser in that case.
+"""
+
+__version__ = "0.1.0"
+
+import json
+from typing import Any, Dict, Iterator, Optional, Set, TextIO
+from urllib.parse import urljoin
+
+from rdflib import RDF, XSD, BNode, Graph, Literal, URIRef
+from rdflib.term import Node
+
+from case_dfxml.case_index import MAPPED_PREDICATES
+
+_WHITESPACE = " \t\n\r"
+
+# Keywords that do not describe triples on the node itself, and so are
+# skipped when reading node properties.
+_IGNORED_NODE_KEYWORDS = {"@id", "@index", "@type"}
+
+_UNSUPPORTED_NODE_KEYWORDS = {"@context", "@graph", "@included", "@nest", "@reverse"}
+
+
+class UnsupportedJSONLDError(ValueError):
+    pass
+
+
+class _JSONStream:
+    """
+    Incremental decoder of JSON values from a text stream, using json.JSONDecoder.raw_decode on a sliding buffer.
+    """
+
+    def __init__(self, in_fh: TextIO, *, chunk_size: int = 1 << 20) -> None:
+        self.in_fh = in_fh
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """
+        Read another chunk into the buffer, discarding consumed text.  Returns False at end of input.
+        """
+        if self.eof:
+            return False
+        chunk = self.in_fh.read(self.chunk_size)
+        if chunk == "":
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.position :] + chunk
+        self.position = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Skip whitespace, and return the next character without consuming it.  Returns "" at end of input.
+        """
+        while True:
+            while self.position < len(self.buffer):
+                if self.buffer[self.position] not in _WHITESPACE:
+                    return self.buffer[self.position]
+                self.position += 1
+            if not self._fill():
+                return ""
+
+    def expect(self, character: str) -> None:
+        found = self.peek()
+        if found != character:
+            raise ValueError(
+                "Expected %r in JSON input, found %r." % (character, found or "EOF")
+            )
+        self.position += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the end of the buffer might continue in the
+            # next chunk.
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.position = end
+            return value
+
+    def array_items(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self.position += 1
+            return
+        while True:
+            yield self.value()
+            character = self.peek()
+            self.position += 1
+            if character == "]":
+                return
+            if character != ",":
+                raise ValueError(
+                    "Expected ',' or ']' in JSON array, found %r."
+                    % (character or "EOF")
+                )
+
+
+class _Context:
+    """
+    The subset of a JSON-LD context needed to expand CASE data: prefixes, term definitions with @id and @type, @vocab and @base.
+    """
+
+    def __init__(self) -> None:
+        self.base: Optional[str] = None
+        self.coercions: Dict[str, str] = dict()
+        self.terms: Dict[str, str] = dict()
+        self.vocab: Optional[str] = None
+
+    def load(self, context_value: Any) -> None:
+        if isinstance(context_value, list):
+            for member in context_value:
+                self.load(member)
+            return
+        if not isinstance(context_value, dict):
+            raise UnsupportedJSONLDError("Only inline @context objects are supported.")
+        for key, value in context_value.items():
+            if key == "@base":
+                self.base = value
+            elif key == "@vocab":
+                self.vocab = value
+            elif key in {"@protected", "@version"}:
+                continue
+            elif key.startswith("@"):
+                raise UnsupportedJSONLDError("Unsupported @context keyword %r." % key)
+            elif value is None:
+                continue
+            elif isinstance(value, str):
+                self.terms[key] = value
+            elif isinstance(value, dict):
+                if value.get("@container", "@set") != "@set":
+                    raise UnsupportedJSONLDError(
+                        "Unsupported @container for term %r." % key
+                    )
+                if "@id" in value:
+                    self.terms[key] = value["@id"]
+                if "@type" in value:
+                    self.coercions[key] = value["@type"]
+            else:
+                raise UnsupportedJSONLDError("Unsupported definition of term %r." % key)
+
+    def expand(self, value: str, *, vocab: bool = False) -> str:
+        """
+        >>> context = _Context()
+        >>> context.load({"kb": "http://example.org/kb/", "File": "uco-observable:File", "uco-observable": "https://ontology.unifiedcyberontology.org/uco/observable/"})
+        >>> context.expand("kb:File-1")
+        'http://example.org/kb/File-1'
+        >>> context.expand("File", vocab=True)
+        'https://ontology.unifiedcyberontology.org/uco/observable/File'
+        >>> context.expand("urn:example:1")
+        'urn:example:1'
+        """
+        if vocab and value in self.terms:
+            value = self.terms[value]
+        if ":" in value:
+            prefix, suffix = value.split(":", 1)
+            if prefix != "_" and not suffix.startswith("//") and prefix in self.terms:
+                return self.terms[prefix] + suffix
+            return value
+        if vocab and self.vocab is not None:
+            return self.vocab + value
+        if self.base is not None:
+            return urljoin(self.base, value)
+        return value
+
+    def node(self, value: str) -> Node:
+        expanded = self.expand(value)
+        if expanded.startswith("_:"):
+            return BNode(expanded[2:])
+        return URIRef(expanded)
+
+
+def _lexical_form(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _native_literal(value: Any) -> Literal:
+    if isinstance(value, bool):
+        return Literal(value)
+    if isinstance(value, int):
+        return Literal(value)
+    if isinstance(value, float):
+        return Literal(value, datatype=XSD.double)
+    return Literal(value)
+
+
+def _object_term(
+    graph: Graph, context: _Context, key: str, item: Any
+) -> Optional[Node]:
+    coercion = context.coercions.get(key)
+    if isinstance(item, dict):
+        if "@value" in item:
+            if "@language" in item:
+                return Literal(_lexical_form(item["@value"]), lang=item["@language"])
+            if "@type" in item:
+                return Literal(
+                    _lexical_form(item["@value"]),
+                    datatype=URIRef(context.expand(item["@type"], vocab=True)),
+                )
+            return _native_literal(item["@value"])
+        if "@list" in item or "@set" in item:
+            raise UnsupportedJSONLDError("@list and @set values are not supported.")
+        if set(item.keys()) == {"@id"}:
+            return context.node(item["@id"])
+        return _add_node(graph, context, item)
+    if item is None:
+        return None
+    if isinstance(item, list):
+        raise UnsupportedJSONLDError("Nested arrays are not supported.")
+    if coercion == "@id":
+        return context.node(item)
+    if coercion == "@vocab":
+        return URIRef(context.expand(item, vocab=True))
+    if coercion is not None and not isinstance(item, (dict, list)):
+        return Literal(
+            _lexical_form(item), datatype=URIRef(context.expand(coercion, vocab=True))
+        )
+    return _native_literal(item)
+
+
+def _add_node(graph: Graph, context: _Context, node_object: Any) -> Node:
+    """
+    Add the retained triples of a node object, including any embedded node objects, to graph.  Returns the node.
+    """
+    if not isinstance(node_object, dict):
+        raise UnsupportedJSONLDError("Expected a JSON-LD node object.")
+    for keyword in _UNSUPPORTED_NODE_KEYWORDS:
+        if keyword in node_object:
+            raise UnsupportedJSONLDError(
+                "%s within a node object is not supported." % keyword
+            )
+
+    n_node: Node
+    if "@id" in node_object:
+        n_node = context.node(node_object["@id"])
+    else:
+        n_node = BNode()
+
+    types = node_object.get("@type", [])
+    for type_value in types if isinstance(types, list) else [types]:
+        graph.add((n_node, RDF.type, URIRef(context.expand(type_value, vocab=True))))
+
+    for key, value in node_object.items():
+        if key in _IGNORED_NODE_KEYWORDS:
+            continue
+        if key.startswith("@"):
+            raise UnsupportedJSONLDError("Unsupported keyword %r." % key)
+        n_predicate = URIRef(context.expand(key, vocab=True))
+        retained = n_predicate in MAPPED_PREDICATES
+        for item in value if isinstance(value, list) else [value]:
+            # Embedded node objects are read even under unretained
+            # predicates, because they can carry retained triples.
+            n_object = _object_term(graph, context, key, item)
+            if retained and n_object is not None:
+                graph.add((n_node, n_predicate, n_object))
+    return n_node
+
+
+def parse(in_fh: TextIO, graph: Graph) -> None:
+    """
+    Add to graph the triples from the JSON-LD stream in_fh that case_to_dfxml maps.
+
+    >>> import io
+    >>> from case_dfxml.case_index import CaseIndex, instances, subclass_closure
+    >>> from case_utils.namespace import NS_UCO_OBSERVABLE
+    >>> jsonld = '''{
+    ...   "@context": {
+    ...     "kb": "http://example.org/kb/",
+    ...     "uco-core": "https://ontology.unifiedcyberontology.org/uco/core/",
+    ...     "uco-observable": "https://ontology.unifiedcyberontology.org/uco/observable/",
+    ...     "xsd": "http://www.w3.org/2001/XMLSchema#"
+    ...   },
+    ...   "@graph": [
+    ...     {
+    ...       "@id": "kb:File-1",
+    ...       "@type": "uco-observable:File",
+    ...       "uco-core:description": "Not retained.",
+    ...       "uco-core:hasFacet": [
+    ...         {
+    ...           "@id": "kb:FileFacet-1",
+    ...           "@type": "uco-observable:FileFacet",
+    ...           "uco-observable:filePath": "a.txt"
+    ...         },
+    ...         {
+    ...           "@id": "kb:ContentDataFacet-1"
+    ...         }
+    ...       ]
+    ...     },
+    ...     {
+    ...       "@id": "kb:ContentDataFacet-1",
+    ...       "@type": "uco-observable:ContentDataFacet",
+    ...       "uco-observable:sizeInBytes": {"@type": "xsd:integer", "@value": "5"}
+    ...     }
+    ...   ]
+    ... }'''
+    >>> graph = Graph()
+    >>> parse(io.StringIO(jsonld), graph)
+    >>> len(graph)
+    7
+    >>> case_index = CaseIndex()
+    >>> case_index.add_graph(graph)
+    >>> for n_file in instances(graph, subclass_closure(NS_UCO_OBSERVABLE.File, graph)):
+    ...     record = case_index.file_record(n_file)
+    ...     print(n_file, record.filename, record.filesize)
+    http://example.org/kb/File-1 a.txt 5
+    """
+    stream = _JSONStream(in_fh)
+    context = _Context()
+    first_character = stream.peek()
+    if first_character == "[":
+        for node_object in stream.array_items():
+            _add_node(graph, context, node_object)
+        return
+    if first_character != "{":
+        raise ValueError("Expected a JSON object or array at start of input.")
+
+    stream.expect("{")
+    # Members of a top-level node object, other than @context and @graph.
+    top_level: Dict[str, Any] = dict()
+    seen_graph = False
+    seen_keys: Set[str] = set()
+    while stream.peek() != "}":
+        if len(seen_keys) > 0:
+            stream.expect(",")
+        key = stream.value()
+        if not isinstance(key, str):
+            raise ValueError("Expected a JSON object key.")
+        seen_keys.add(key)
+        stream.expect(":")
+        if key == "@context":
+            if seen_graph:
+                raise UnsupportedJSONLDError(
+                    "@context following @graph is not supported."
+                )
+            context.load(stream.value())
+        elif key == "@graph":
+            seen_graph = True
+            for node_object in stream.array_items():
+                _add_node(graph, context, node_object)
+        else:
+            top_level[key] = stream.value()
+    stream.expect("}")
+
+    if len(set(top_level.keys()) - {"@id"}) > 0:
+        if seen_graph:
+            raise UnsupportedJSONLDError("Named graphs are not supported.")
+        _add_node(graph, context, top_level)
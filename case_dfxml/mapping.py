@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module declares the mapping between DFXML file properties and UCO facet properties, in both directions.
+
+FILE_FIELDS and HASH_FIELDS are the single table of the mapping.  dfxml_to_case emits a file's facet and hash triples with file_facet_triples, which walks emitters compiled from the table at import time.  case_index reads the same table to extract DFXML properties from a CASE graph.  A DFXML property added to the table is therefore mapped in both directions.
+"""
+
+__version__ = "0.1.0"
+
+import collections
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from case_utils.inherent_uuid import (
+    L_MD5,
+    L_SHA1,
+    L_SHA256,
+    get_facet_uriref,
+    hash_method_value_uuid,
+)
+from case_utils.namespace import (
+    NS_RDF,
+    NS_UCO_CORE,
+    NS_UCO_OBSERVABLE,
+    NS_UCO_TYPES,
+    NS_XSD,
+)
+from rdflib import Literal, URIRef
+from rdflib.term import Node
+
+from case_dfxml.minting import NodeMinter
+from case_dfxml.sinks import Triple
+from case_dfxml.terms import datetime_literal, integer_literal
+
+
+class FieldMapping(NamedTuple):
+    """
+    A DFXML file property, mapped to a property of a facet of the uco-observable:File.  Properties with datatype xsd:integer are Python ints; others are mapped as their text.  extract is False for duplicate renderings of a property, which case_to_dfxml does not read back.
+    """
+
+    field_name: str
+    facet_class: URIRef
+    n_property: URIRef
+    datatype: Optional[URIRef] = None
+    extract: bool = True
+
+    def to_python(self, l_object: Node) -> Any:
+        """
+        Convert a mapped graph value to the DFXML property value.
+        """
+        if self.datatype == NS_XSD.integer:
+            assert isinstance(l_object, Literal)
+            return int(l_object)
+        return str(l_object)
+
+
+class HashMapping(NamedTuple):
+    """
+    A DFXML hash property, mapped to a uco-types:Hash with this hash method, on the uco-observable:ContentDataFacet.
+    """
+
+    field_name: str
+    l_hash_method: Literal
+
+
+# Emission order within a file follows this table.
+FILE_FIELDS: Tuple[FieldMapping, ...] = (
+    FieldMapping("filename", NS_UCO_OBSERVABLE.FileFacet, NS_UCO_OBSERVABLE.filePath),
+    FieldMapping(
+        "atime",
+        NS_UCO_OBSERVABLE.FileFacet,
+        NS_UCO_OBSERVABLE.accessedTime,
+        NS_XSD.dateTime,
+    ),
+    FieldMapping(
+        "ctime",
+        NS_UCO_OBSERVABLE.FileFacet,
+        NS_UCO_OBSERVABLE.metadataChangeTime,
+        NS_XSD.dateTime,
+    ),
+    FieldMapping(
+        "crtime",
+        NS_UCO_OBSERVABLE.FileFacet,
+        NS_UCO_OBSERVABLE.observableCreatedTime,
+        NS_XSD.dateTime,
+    ),
+    FieldMapping(
+        "mtime",
+        NS_UCO_OBSERVABLE.FileFacet,
+        NS_UCO_OBSERVABLE.modifiedTime,
+        NS_XSD.dateTime,
+    ),
+    FieldMapping(
+        "filesize",
+        NS_UCO_OBSERVABLE.ContentDataFacet,
+        NS_UCO_OBSERVABLE.sizeInBytes,
+        NS_XSD.integer,
+    ),
+    FieldMapping(
+        "filesize",
+        NS_UCO_OBSERVABLE.FileFacet,
+        NS_UCO_OBSERVABLE.sizeInBytes,
+        NS_XSD.integer,
+        extract=False,
+    ),
+)
+
+HASH_FIELDS: Tuple[HashMapping, ...] = (
+    HashMapping("md5", L_MD5),
+    HashMapping("sha1", L_SHA1),
+    HashMapping("sha256", L_SHA256),
+)
+
+# Facet classes in the order their IRI prefixes are listed.
+# Key: Facet class.
+# Value: Prefix of non-inherent facet IRIs.
+FACET_IRI_PREFIXES: Dict[URIRef, str] = {
+    NS_UCO_OBSERVABLE.FileFacet: "FileFacet-",
+    NS_UCO_OBSERVABLE.ContentDataFacet: "ContentDataFacet-",
+}
+
+_FACET_CLASSES: Tuple[URIRef, ...] = tuple(FACET_IRI_PREFIXES.keys())
+_CONTENT_DATA_FACET_SLOT = _FACET_CLASSES.index(NS_UCO_OBSERVABLE.ContentDataFacet)
+
+# Facet classes whose IRIs are inherent with use_inherent_uuids.  FileFacet
+# IRIs are always minted.
+_INHERENT_FACET_CLASSES = frozenset([NS_UCO_OBSERVABLE.ContentDataFacet])
+
+
+def _literal_factory(field: FieldMapping) -> Callable[[Any], Literal]:
+    if field.datatype is None:
+        # Strings are typed by the Literal constructor.
+        return Literal
+    if field.datatype == NS_XSD.integer:
+        # Cached, so a file's two renderings of its size share a Literal.
+        return integer_literal
+    if field.datatype == NS_XSD.dateTime:
+        return datetime_literal
+    datatype = field.datatype
+    return lambda value: Literal(str(value), datatype=datatype)
+
+
+# Compiled emitters.  Each member is: DFXML property name, index of the
+# facet class in _FACET_CLASSES, facet property, literal factory, and
+# whether the property is emitted when it is falsy but not None (e.g. a
+# file size of 0).
+_FIELD_EMITTERS: Tuple[Tuple[str, int, URIRef, Callable[[Any], Literal], bool], ...] = (
+    tuple(
+        (
+            field.field_name,
+            _FACET_CLASSES.index(field.facet_class),
+            field.n_property,
+            _literal_factory(field),
+            field.datatype == NS_XSD.integer,
+        )
+        for field in FILE_FIELDS
+    )
+)
+
+
+class HashInterner:
+    """
+    Bounded, least-recently-used map from (hash method, hash value) pairs to the inherent-UUID Hash IRIs already emitted for them.  Images commonly hold many copies of the same content, so this saves re-deriving each IRI and re-emitting each Hash node's triples.
+
+    >>> interner = HashInterner(maxsize=1)
+    >>> interner.put(L_MD5, "d41d8cd98f00b204e9800998ecf8427e", URIRef("urn:example:hash-1"))
+    >>> interner.get(L_MD5, "d41d8cd98f00b204e9800998ecf8427e")
+    rdflib.term.URIRef('urn:example:hash-1')
+    >>> interner.put(L_MD5, "0cc175b9c0f1b6a831c399e269772661", URIRef("urn:example:hash-2"))
+    >>> interner.get(L_MD5, "d41d8cd98f00b204e9800998ecf8427e") is None
+    True
+    """
+
+    def __init__(self, *args: Any, maxsize: int = 65536, **kwargs: Any) -> None:
+        self.maxsize = maxsize
+        self._iris: collections.OrderedDict[Tuple[Literal, str], URIRef] = (
+            collections.OrderedDict()
+        )
+
+    def get(self, l_hash_method: Literal, s_hash_value: str) -> Optional[URIRef]:
+        key = (l_hash_method, s_hash_value)
+        n_hash = self._iris.get(key)
+        if n_hash is not None:
+            self._iris.move_to_end(key)
+        return n_hash
+
+    def put(self, l_hash_method: Literal, s_hash_value: str, n_hash: URIRef) -> None:
+        if self.maxsize < 1:
+            return
+        self._iris[(l_hash_method, s_hash_value)] = n_hash
+        if len(self._iris) > self.maxsize:
+            self._iris.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Forget all Hash IRIs, so the next reference to each hash emits its Hash node again, e.g. when starting a new output shard.
+        """
+        self._iris.clear()
+
+
+def _n_facet(
+    triples: List[Triple],
+    facets: List[Optional[URIRef]],
+    slot: int,
+    node_minter: NodeMinter,
+    n_file: URIRef,
+    use_inherent_uuids: bool,
+) -> URIRef:
+    """
+    Idempotent initialization of the file's facet of class _FACET_CLASSES[slot].
+    """
+    n_facet = facets[slot]
+    if n_facet is None:
+        n_facet_class = _FACET_CLASSES[slot]
+        if use_inherent_uuids and n_facet_class in _INHERENT_FACET_CLASSES:
+            n_facet = get_facet_uriref(
+                n_file, n_facet_class, namespace=node_minter.ns_kb
+            )
+        else:
+            n_facet = node_minter.mint(FACET_IRI_PREFIXES[n_facet_class])
+        triples.append((n_facet, NS_RDF.type, n_facet_class))
+        triples.append((n_file, NS_UCO_CORE.hasFacet, n_facet))
+        facets[slot] = n_facet
+    return n_facet
+
+
+def file_facet_triples(
+    node_minter: NodeMinter,
+    n_file: URIRef,
+    fobj: Any,
+    *args: Any,
+    hash_interner: Optional[HashInterner] = None,
+    use_inherent_uuids: bool = False,
+    **kwargs: Any
+) -> List[Triple]:
+    """
+    Return the facet and hash triples of a file.  fobj is a dfxml.objects.FileObject or a case_dfxml.dfxml_reader.FileRecord.  Facets are only created for facet classes with at least one mapped property.
+
+    If hash_interner is provided and use_inherent_uuids is True, a Hash node already emitted for the same hash method and value is referenced instead of being emitted again.
+
+    >>> from rdflib import Namespace
+    >>> from case_dfxml.dfxml_reader import FileRecord
+    >>> ns_kb = Namespace("http://example.org/kb/")
+    >>> record = FileRecord()
+    >>> record.filename = "a.txt"
+    >>> record.filesize = 0
+    >>> triples = file_facet_triples(NodeMinter(ns_kb), ns_kb["File-1"], record, use_inherent_uuids=True)
+    >>> sorted(str(p).rsplit("/", 1)[-1] for (s, p, o) in triples)
+    ['22-rdf-syntax-ns#type', '22-rdf-syntax-ns#type', 'filePath', 'hasFacet', 'hasFacet', 'sizeInBytes', 'sizeInBytes']
+    """
+    triples: List[Triple] = []
+    # Indexed by facet class position in _FACET_CLASSES.
+    facets: List[Optional[URIRef]] = [None] * len(_FACET_CLASSES)
+
+    for field_name, slot, n_property, literal_factory, emit_falsy in _FIELD_EMITTERS:
+        value = getattr(fobj, field_name)
+        if value is None or not (value or emit_falsy):
+            continue
+        n_facet = _n_facet(
+            triples, facets, slot, node_minter, n_file, use_inherent_uuids
+        )
+        triples.append((n_facet, n_property, literal_factory(value)))
+
+    for field_name, l_hash_method in HASH_FIELDS:
+        s_hash_value = getattr(fobj, field_name)
+        if not s_hash_value:
+            continue
+        if use_inherent_uuids and hash_interner is not None:
+            n_interned_hash = hash_interner.get(l_hash_method, s_hash_value)
+            if n_interned_hash is not None:
+                # The Hash node's own triples were already emitted.
+                n_facet = _n_facet(
+                    triples,
+                    facets,
+                    _CONTENT_DATA_FACET_SLOT,
+                    node_minter,
+                    n_file,
+                    use_inherent_uuids,
+                )
+                triples.append((n_facet, NS_UCO_OBSERVABLE.hash, n_interned_hash))
+                continue
+        l_hash_value = Literal(s_hash_value, datatype=NS_XSD.hexBinary)
+        if use_inherent_uuids:
+            n_hash = node_minter.ns_kb[
+                "Hash-" + str(hash_method_value_uuid(l_hash_method, l_hash_value))
+            ]
+            if hash_interner is not None:
+                hash_interner.put(l_hash_method, s_hash_value, n_hash)
+        else:
+            n_hash = node_minter.mint("Hash-")
+        triples.append((n_hash, NS_RDF.type, NS_UCO_TYPES.Hash))
+        triples.append((n_hash, NS_UCO_TYPES.hashMethod, l_hash_method))
+        triples.append((n_hash, NS_UCO_TYPES.hashValue, l_hash_value))
+        n_facet = _n_facet(
+            triples,
+            facets,
+            _CONTENT_DATA_FACET_SLOT,
+            node_minter,
+            n_file,
+            use_inherent_uuids,
+        )
+        triples.append((n_facet, NS_UCO_OBSERVABLE.hash, n_hash))
+
+    return triples
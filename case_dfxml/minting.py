@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module mints the IRIs of knowledge-base nodes, such as "kb:File-" followed by a UUID.
+
+By default, NodeMinter draws random (version 4) UUIDs from a pool, generated in bulk from one os.urandom buffer per batch.  If non-random UUIDs were requested through cdo_local_uuid (see cdo_local_uuid.configure), each UUID is instead derived from a demo base and a count, as cdo_local_uuid.local_uuid derives them, so example generation is unchanged.  The demo base is held by the NodeMinter, so a caller can leave options out of it that do not affect the graph.
+
+As an opt-in, a NodeMinter in counter mode mints UUIDs sharing a run-scoped prefix, with the last 48 bits replaced by a counter.  These are cheaper still, sort in minting order, and are repeatable when the run UUID is.
+
+In either non-random mode, the IRIs of a file's nodes are derived from the file's position in the input, between begin_file and end_file, rather than from the count of all IRIs minted before them.  A file's IRIs are then the same whether the files of a run are mapped by one process or divided among several.
+"""
+
+__version__ = "0.1.0"
+
+import functools
+import os
+import uuid
+import weakref
+from typing import Any, List, Optional
+
+import cdo_local_uuid
+from rdflib import Namespace, URIRef
+
+# Key: Hex digit of a random UUID's variant position.
+# Value: Hex digit with the RFC 4122 variant bits set.
+_VARIANT_DIGITS = {digit: "89ab"[int(digit, 16) & 0x3] for digit in "0123456789abcdef"}
+
+# In counter mode, UUIDs minted outside files count up to _FILE_SCOPE_BIT
+# in their last 48 bits.  A file's UUIDs have the top counter bit set, followed
+# by the file's ordinal, followed by _FILE_COUNTER_BITS bits counting the
+# IRIs minted for the file.
+_FILE_COUNTER_BITS = 12
+_FILE_COUNTER_LIMIT = 1 << _FILE_COUNTER_BITS
+_FILE_ORDINAL_LIMIT = 1 << (47 - _FILE_COUNTER_BITS)
+_FILE_SCOPE_BIT = 1 << 47
+
+# Minters with pooled random UUIDs.  A forked process must not draw
+# from the pool it inherited, or it would repeat its parent's UUIDs.  Where
+# processes cannot fork, as on Windows, they are spawned with empty pools.
+_pooling_minters: "weakref.WeakSet[NodeMinter]" = weakref.WeakSet()
+
+
+def _clear_pools() -> None:
+    for minter in _pooling_minters:
+        minter._pool.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_clear_pools)
+
+
+def random_uuids(count: int) -> List[str]:
+    """
+    Generate count random (version 4) UUIDs, in their string form, from one os.urandom call.
+
+    >>> [uuid.UUID(x).version for x in random_uuids(3)]
+    [4, 4, 4]
+    >>> all(uuid.UUID(x).variant == uuid.RFC_4122 for x in random_uuids(100))
+    True
+    """
+    hex_text = os.urandom(16 * count).hex()
+    return [
+        "%s-%s-4%s-%s%s-%s"
+        % (
+            hex_text[i : i + 8],
+            hex_text[i + 8 : i + 12],
+            hex_text[i + 13 : i + 16],
+            _VARIANT_DIGITS[hex_text[i + 16]],
+            hex_text[i + 17 : i + 20],
+            hex_text[i + 20 : i + 32],
+        )
+        for i in range(0, 32 * count, 32)
+    ]
+
+
+class NodeMinter:
+    """
+    Mints node IRIs in the namespace ns_kb.
+
+    demo_uuid_base is the base from which non-random UUIDs are derived.  If not provided, it is cdo_local_uuid.DEMO_UUID_BASE, which is set if non-random UUIDs were requested through cdo_local_uuid.  If neither is set, UUIDs are random.
+
+    In counter mode, if run_uuid is not provided, it is random, or, with a demo base, derived from the demo base.
+
+    >>> ns_kb = Namespace("http://example.org/kb/")
+    >>> minter = NodeMinter(ns_kb, counter=True, run_uuid=uuid.UUID("12345678-1234-4234-8234-123456789abc"))
+    >>> minter.mint("File-")
+    rdflib.term.URIRef('http://example.org/kb/File-12345678-1234-4234-8234-000000000001')
+    >>> minter.mint("FileFacet-")
+    rdflib.term.URIRef('http://example.org/kb/FileFacet-12345678-1234-4234-8234-000000000002')
+    >>> minter.begin_file(3)
+    >>> minter.mint("File-")
+    rdflib.term.URIRef('http://example.org/kb/File-12345678-1234-4234-8234-800000003001')
+    >>> minter.end_file()
+    >>> minter.mint("Image-")
+    rdflib.term.URIRef('http://example.org/kb/Image-12345678-1234-4234-8234-000000000003')
+    >>> demo_minter = NodeMinter(ns_kb, demo_uuid_base="example.org/demo")
+    >>> demo_minter.mint("File-") == ns_kb["File-" + str(uuid.uuid5(uuid.NAMESPACE_URL, "example.org/demo/1"))]
+    True
+    """
+
+    def __init__(
+        self,
+        ns_kb: Namespace,
+        *args: Any,
+        batch_size: int = 4096,
+        counter: bool = False,
+        demo_uuid_base: Optional[str] = None,
+        run_uuid: Optional[uuid.UUID] = None,
+        **kwargs: Any
+    ) -> None:
+        self.ns_kb = ns_kb
+        self.batch_size = batch_size
+        self.counter = counter
+        self.demo_uuid_base: Optional[str] = (
+            cdo_local_uuid.DEMO_UUID_BASE if demo_uuid_base is None else demo_uuid_base
+        )
+        self._count = 0
+        # The ordinal of the file whose IRIs are being minted, and the
+        # count of its IRIs, between begin_file and end_file.
+        self._file_ordinal: Optional[int] = None
+        self._file_count = 0
+        self._pool: List[str] = []
+        if counter:
+            if run_uuid is None:
+                if self.demo_uuid_base is None:
+                    run_uuid = uuid.uuid4()
+                else:
+                    run_uuid = uuid.uuid5(uuid.NAMESPACE_URL, self.demo_uuid_base)
+            self.run_uuid: Optional[uuid.UUID] = run_uuid
+            # The UUID up to its last 48 bits.
+            self._run_prefix = str(run_uuid)[:24]
+        else:
+            self.run_uuid = None
+            self._run_prefix = ""
+            _pooling_minters.add(self)
+
+    def begin_file(self, ordinal: int) -> None:
+        """
+        Derive the UUIDs minted until end_file from ordinal, the position of a file among all the files of the input, counting from 1.  Random UUIDs are unaffected.
+        """
+        if not self.counter and self.demo_uuid_base is None:
+            return
+        if ordinal >= _FILE_ORDINAL_LIMIT:
+            raise ValueError("File ordinal %d exceeds the UUID counter." % ordinal)
+        self._file_ordinal = ordinal
+        self._file_count = 0
+
+    def end_file(self) -> None:
+        self._file_ordinal = None
+
+    def _file_uuid(self, ordinal: int) -> str:
+        self._file_count += 1
+        if self._file_count >= _FILE_COUNTER_LIMIT:
+            raise ValueError("UUID counter exhausted for file %d." % ordinal)
+        if self.counter:
+            return "%s%012x" % (
+                self._run_prefix,
+                _FILE_SCOPE_BIT | (ordinal << _FILE_COUNTER_BITS) | self._file_count,
+            )
+        return str(
+            uuid.uuid5(
+                uuid.NAMESPACE_URL,
+                "%s/file-%d/%d" % (self.demo_uuid_base, ordinal, self._file_count),
+            )
+        )
+
+    def uuid(self) -> str:
+        if self._file_ordinal is not None:
+            return self._file_uuid(self._file_ordinal)
+        if self.counter:
+            self._count += 1
+            if self._count >= _FILE_SCOPE_BIT:
+                raise ValueError("UUID counter exhausted for run %s." % self.run_uuid)
+            return "%s%012x" % (self._run_prefix, self._count)
+        if self.demo_uuid_base is not None:
+            # As cdo_local_uuid derives non-random UUIDs.
+            self._count += 1
+            return str(
+                uuid.uuid5(
+                    uuid.NAMESPACE_URL, "%s/%d" % (self.demo_uuid_base, self._count)
+                )
+            )
+        if len(self._pool) == 0:
+            self._pool = random_uuids(self.batch_size)
+        return self._pool.pop()
+
+    def mint(self, prefix: str) -> URIRef:
+        """
+        Return a new IRI in ns_kb, of prefix followed by a UUID.
+        """
+        return URIRef(self.ns_kb + prefix + self.uuid())
+
+
+@functools.lru_cache(maxsize=16)
+def default_minter(ns_kb: Namespace) -> NodeMinter:
+    """
+    Return a shared random-mode NodeMinter for ns_kb, for callers that do not manage their own.
+    """
+    return NodeMinter(ns_kb)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module reports the progress of long conversions: how far through its input a phase is, its current rate, an estimate of the time remaining, and the current resident set size.
+
+Progress is measured against a known total, such as the size of the input file, with the position read through a ProgressReader, or the number of files to assemble.  Reports are logged at an interval, and can also be written as JSON Lines to a side channel for monitoring tools.
+"""
+
+__version__ = "0.1.0"
+
+import io
+import json
+import logging
+import os
+import sys
+import time
+from types import ModuleType
+from typing import IO, Any, Dict, Optional, TextIO
+
+# resource is only available on Unix.
+resource: Optional[ModuleType]
+try:
+    import resource
+except ImportError:
+    resource = None
+
+_logger = logging.getLogger(os.path.basename(__file__))
+
+
+def current_rss_bytes() -> Optional[int]:
+    """
+    Return the current resident set size of this process.  Where it cannot be read, as on macOS, the peak resident set size is returned instead.  Where neither can be read, as on Windows, None is returned.
+    """
+    try:
+        with open("/proc/self/statm", "r") as in_fh:
+            return int(in_fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        if resource is None:
+            return None
+        ru_maxrss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kibibytes on Linux, and in bytes on macOS.
+        return ru_maxrss if sys.platform == "darwin" else ru_maxrss * 1024
+
+
+class ProgressReporter:
+    """
+    Reports the progress of one phase of a program.  position is measured in unit, against total if known.  Reports are logged, and written to side_channel if provided, by update at most once per interval seconds, and by finish.  An interval of 0 disables periodic reports.
+
+    >>> side_channel = io.StringIO()
+    >>> progress = ProgressReporter("example", "parse", total=100, interval=1e-9, side_channel=side_channel)
+    >>> progress.update(50, files=5)
+    >>> progress.finish(100, files=10)
+    >>> [(x["position"], x["files"], x["done"]) for x in map(json.loads, side_channel.getvalue().splitlines())]
+    [(50, 5, False), (100, 10, True)]
+    """
+
+    def __init__(
+        self,
+        program: str,
+        phase: str,
+        *args: Any,
+        total: Optional[int] = None,
+        unit: str = "bytes",
+        interval: float = 30.0,
+        side_channel: Optional[TextIO] = None,
+        **kwargs: Any
+    ) -> None:
+        self.program = program
+        self.phase = phase
+        self.total = total
+        self.unit = unit
+        self.interval = interval
+        self.side_channel = side_channel
+        self._reported = False
+        self._start_time = time.monotonic()
+        self._last_time = self._start_time
+        self._last_position = 0
+        self._last_files = 0
+        # The earliest time of the next periodic report.
+        self._next_time = self._start_time + interval if interval > 0 else float("inf")
+
+    def update(self, position: int, files: Optional[int] = None) -> None:
+        """
+        Record progress, reporting it if a report is due.  This is meant to be called often, e.g. once per file.
+        """
+        now = time.monotonic()
+        if now < self._next_time:
+            return
+        self._report(now, position, files, done=False)
+
+    def finish(self, position: int, files: Optional[int] = None) -> None:
+        """
+        Report the end of the phase.  The final report is only logged if a periodic report was logged before it, so short runs are not reported on.
+        """
+        self._report(time.monotonic(), position, files, done=True)
+
+    def _report(
+        self, now: float, position: int, files: Optional[int], done: bool
+    ) -> None:
+        elapsed = now - self._start_time
+        interval_elapsed = now - self._last_time
+        record: Dict[str, Any] = {
+            "program": self.program,
+            "phase": self.phase,
+            "done": done,
+            "elapsed_seconds": round(elapsed, 3),
+            "position": position,
+            "total": self.total,
+            "unit": self.unit,
+            "files": files,
+            "rss_bytes": current_rss_bytes(),
+        }
+        # Current rates are over the interval since the previous report.
+        position_rate: Optional[float] = None
+        if interval_elapsed > 0:
+            position_rate = (position - self._last_position) / interval_elapsed
+            record["%s_per_second" % self.unit] = round(position_rate, 1)
+            if files is not None and self.unit != "files":
+                record["files_per_second"] = round(
+                    (files - self._last_files) / interval_elapsed, 1
+                )
+        eta_seconds: Optional[float] = None
+        if done:
+            eta_seconds = 0.0
+        elif self.total is not None and position_rate is not None and position_rate > 0:
+            eta_seconds = max(self.total - position, 0) / position_rate
+        record["eta_seconds"] = None if eta_seconds is None else round(eta_seconds, 1)
+
+        if self._reported or not done:
+            self._reported = True
+            _logger.info(
+                "%s %s: %s%s%s, %s, RSS %s.",
+                self.program,
+                self.phase,
+                (
+                    "%d %s" % (position, self.unit)
+                    if self.total is None
+                    else "%.1f%% of %d %s"
+                    % (100.0 * position / max(self.total, 1), self.total, self.unit)
+                ),
+                "" if files is None or self.unit == "files" else ", %d files" % files,
+                (
+                    ""
+                    if position_rate is None
+                    else " (%.0f %s/s)" % (position_rate, self.unit)
+                ),
+                (
+                    "done in %.0fs" % elapsed
+                    if done
+                    else (
+                        "ETA unknown"
+                        if eta_seconds is None
+                        else "ETA %.0fs" % eta_seconds
+                    )
+                ),
+                (
+                    "unknown"
+                    if record["rss_bytes"] is None
+                    else "%.1f MiB" % (record["rss_bytes"] / (1 << 20))
+                ),
+            )
+        if self.side_channel is not None:
+            self.side_channel.write(json.dumps(record) + "\n")
+            self.side_channel.flush()
+
+        self._last_time = now
+        self._last_position = position
+        self._last_files = 0 if files is None else files
+        self._next_time = now + self.interval
+
+
+class ProgressReader(io.RawIOBase):
+    """
+    Reads a binary file, keeping count of the bytes read in offset.  If progress is provided, it is updated with the offset as reading proceeds.
+
+    >>> progress_reader = ProgressReader(io.BytesIO(b"<dfxml/>"))
+    >>> _ = progress_reader.read()
+    >>> progress_reader.offset
+    8
+    """
+
+    def __init__(
+        self, raw: IO[bytes], progress: Optional[ProgressReporter] = None
+    ) -> None:
+        super().__init__()
+        self._raw = raw
+        self.progress = progress
+        self.offset = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        data = self._raw.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        self.offset += size
+        if self.progress is not None:
+            self.progress.update(self.offset)
+        return size
+
+    def close(self) -> None:
+        self._raw.close()
+        super().close()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module caches the volume and file records case_to_dfxml extracts from a CASE graph, so a later run over the same input can skip parsing and indexing the graph.
+
+A cache file is named after a fingerprint of the input file's content, the options that affect the extracted records, and the marshal format version and Python version that encode them, so a modified input is never matched to a stale cache file, and a cache directory can be shared between Python versions.  Records are stored as frames of marshal-encoded tuples, which decode quickly, and are read back through a memory map of the cache file.  A cache file is only created once all its records are written, so an interrupted run leaves no partial cache behind, and read_counts checks a digest of the frames, so a truncated or corrupted cache file is detected before any record is read from it.
+
+The marshal module is not secure against maliciously constructed data.  Decoding a cache file does not run code from it, as unpickling could, but a crafted cache file can make decoding fail or exhaust memory, and the digest only detects accidental damage.  A cache directory must therefore only be writable by users trusted to run case_to_dfxml.
+"""
+
+__version__ = "0.1.0"
+
+import hashlib
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+from typing import Any, Iterable, Iterator, List, Tuple
+
+from case_dfxml.dfxml_reader import FILE_PROPERTY_NAMES, FileRecord, VolumeRecord
+
+# Identifies the cache file format.  Changing the encoding of records
+# requires a new value.
+_MAGIC = b"CDFXREC2"
+
+# Following _MAGIC: the marshal format version, the major and minor
+# Python version, the counts of files and of input triples, and the
+# SHA-256 digest of the frames.
+_HEADER = struct.Struct("<HBBQQ32s")
+
+# The versions a cache file must have been written with to be read.
+_VERSIONS = (marshal.version,) + tuple(sys.version_info[:2])
+
+# The byte length of each frame, preceding the frame.
+_FRAME_LENGTH = struct.Struct("<Q")
+
+# Number of events encoded per frame.
+_FRAME_EVENTS = 65536
+
+# Event tuple tags.
+_VOLUME_START = "s"
+_VOLUME_END = "e"
+_FILE = "f"
+
+
+def fingerprint(in_path: str, **options: Any) -> str:
+    """
+    Fingerprint an input file's content and the options that affect the records extracted from it.  Unlike case_dfxml.sqlite_store.fingerprint, the file's path is not included, so a cache file is matched to input content wherever that content is stored.
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     in_path = os.path.join(tmpdir, "graph.json")
+    ...     with open(in_path, "w") as out_fh:
+    ...         _ = out_fh.write("{}")
+    ...     fingerprint(in_path, built_version="none") == fingerprint(in_path, built_version="none")
+    True
+    """
+    content_hash = hashlib.sha256()
+    size = 0
+    with open(in_path, "rb") as in_fh:
+        while True:
+            chunk = in_fh.read(1 << 20)
+            if not chunk:
+                break
+            content_hash.update(chunk)
+            size += len(chunk)
+    description = {
+        "format": _MAGIC.decode("ascii"),
+        "marshal_version": marshal.version,
+        "options": options,
+        "python_version": list(sys.version_info[:2]),
+        "sha256": content_hash.hexdigest(),
+        "size": size,
+    }
+    return hashlib.sha256(
+        json.dumps(description, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def cache_path(cache_dir: str, cache_fingerprint: str) -> str:
+    return os.path.join(cache_dir, cache_fingerprint + ".records")
+
+
+def read_counts(path: str) -> Tuple[int, int]:
+    """
+    Return the number of files, and of input triples, recorded in a cache file.  Raises ValueError if path is not a complete cache file written with this Python version, in which case it should be rebuilt.
+
+    >>> import tempfile
+    >>> record_events = [("start", VolumeRecord()), ("end", VolumeRecord())]
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     path = cache_path(tmpdir, "example")
+    ...     _ = list(write_records(path, record_events, file_count=0, triple_count=0))
+    ...     with open(path, "r+b") as out_fh:
+    ...         _ = out_fh.truncate(os.path.getsize(path) - 1)
+    ...     try:
+    ...         _ = read_counts(path)
+    ...     except ValueError:
+    ...         print("Truncated.")
+    Truncated.
+    """
+    with open(path, "rb") as in_fh:
+        header = in_fh.read(len(_MAGIC) + _HEADER.size)
+        if not header.startswith(_MAGIC) or len(header) < len(_MAGIC) + _HEADER.size:
+            raise ValueError("Not a record cache file: %r." % path)
+        (
+            marshal_version,
+            python_major,
+            python_minor,
+            file_count,
+            triple_count,
+            digest,
+        ) = _HEADER.unpack_from(header, len(_MAGIC))
+        if (marshal_version, python_major, python_minor) != _VERSIONS:
+            raise ValueError(
+                "Record cache file %r was written with marshal version %d on Python %d.%d."
+                % (path, marshal_version, python_major, python_minor)
+            )
+        frames_hash = hashlib.sha256()
+        while True:
+            chunk = in_fh.read(1 << 20)
+            if not chunk:
+                break
+            frames_hash.update(chunk)
+    if frames_hash.digest() != digest:
+        raise ValueError("Corrupt record cache file: %r." % path)
+    return (file_count, triple_count)
+
+
+def write_records(
+    path: str,
+    record_events: Iterable[Tuple[str, Any]],
+    *args: Any,
+    file_count: int,
+    triple_count: int,
+    **kwargs: Any
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Generator.  Passes through record_events, as yielded by case_dfxml.api.DFXMLAssembler.records, writing them to the cache file path.  The cache file is created when record_events is exhausted.  file_count and triple_count describe the input, for read_counts.
+
+    >>> import tempfile
+    >>> volume_record = VolumeRecord()
+    >>> volume_record.ftype_str = "ntfs"
+    >>> file_record = FileRecord()
+    >>> file_record.filename = "a.txt"
+    >>> file_record.filesize = 3
+    >>> record_events = [("start", volume_record), ("end", file_record), ("end", volume_record)]
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     path = cache_path(tmpdir, "example")
+    ...     _ = list(write_records(path, record_events, file_count=1, triple_count=10))
+    ...     counts = read_counts(path)
+    ...     events = [(event, type(obj).__name__) for (event, obj) in read_records(path)]
+    >>> counts
+    (1, 10)
+    >>> events
+    [('start', 'VolumeRecord'), ('end', 'FileRecord'), ('end', 'VolumeRecord')]
+    """
+    tmp_path = "%s.%d.tmp" % (path, os.getpid())
+    try:
+        with open(tmp_path, "wb") as out_fh:
+            out_fh.write(_MAGIC)
+            # Rewritten with the digest once all frames are written.
+            out_fh.write(b"\0" * _HEADER.size)
+            frames_hash = hashlib.sha256()
+            frame: List[Tuple[Any, ...]] = []
+
+            def _write_frame() -> None:
+                data = marshal.dumps(frame)
+                frame_length = _FRAME_LENGTH.pack(len(data))
+                frames_hash.update(frame_length)
+                frames_hash.update(data)
+                out_fh.write(frame_length)
+                out_fh.write(data)
+                frame.clear()
+
+            for event, record in record_events:
+                if isinstance(record, VolumeRecord):
+                    if event == "start":
+                        frame.append(
+                            (_VOLUME_START, record.ftype_str, record.partition_offset)
+                        )
+                    else:
+                        frame.append((_VOLUME_END,))
+                else:
+                    frame.append(
+                        (_FILE,)
+                        + tuple(getattr(record, x) for x in FILE_PROPERTY_NAMES)
+                    )
+                if len(frame) >= _FRAME_EVENTS:
+                    _write_frame()
+                yield (event, record)
+            if len(frame) > 0:
+                _write_frame()
+            out_fh.seek(len(_MAGIC))
+            out_fh.write(
+                _HEADER.pack(*_VERSIONS, file_count, triple_count, frames_hash.digest())
+            )
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_records(path: str) -> Iterator[Tuple[str, Any]]:
+    """
+    Generator.  Yields the record events written to the cache file path by write_records, decoding one frame at a time from a memory map of the file.  Call read_counts first to check the file is intact; a frame that cannot be decoded raises ValueError.
+    """
+    # The end event of a volume is the record its start event yielded.
+    volume_stack: List[VolumeRecord] = []
+    with open(path, "rb") as in_fh:
+        with mmap.mmap(in_fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped[: len(_MAGIC)] != _MAGIC:
+                raise ValueError("Not a record cache file: %r." % path)
+            offset = len(_MAGIC) + _HEADER.size
+            while offset < len(mapped):
+                try:
+                    (frame_length,) = _FRAME_LENGTH.unpack_from(mapped, offset)
+                    offset += _FRAME_LENGTH.size
+                    frame = marshal.loads(mapped[offset : offset + frame_length])
+                except (EOFError, TypeError, ValueError, struct.error) as e:
+                    raise ValueError("Corrupt record cache file: %r." % path) from e
+                offset += frame_length
+                for event_tuple in frame:
+                    tag = event_tuple[0]
+                    if tag == _FILE:
+                        file_record = FileRecord()
+                        for field_name, value in zip(
+                            FILE_PROPERTY_NAMES, event_tuple[1:]
+                        ):
+                            setattr(file_record, field_name, value)
+                        yield ("end", file_record)
+                    elif tag == _VOLUME_START:
+                        volume_record = VolumeRecord()
+                        volume_record.ftype_str = event_tuple[1]
+                        volume_record.partition_offset = event_tuple[2]
+                        volume_stack.append(volume_record)
+                        yield ("start", volume_record)
+                    elif tag == _VOLUME_END:
+                        yield ("end", volume_stack.pop())
+                    else:
+                        raise ValueError("Corrupt record cache file: %r." % path)
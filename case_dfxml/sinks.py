@@ -0,0 +1,654 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module provides triple sinks, which write triples to an output stream as they are generated, instead of accumulating them in an rdflib.Graph.
+
+A sink can be passed anywhere dfxml_to_case passes a Graph for mapping functions to populate.  Instance data is written and then forgotten, so memory use does not grow with the size of the input.  The exception is OWL Class definitions that are inlined into the output (such as drafting:StorageMediumRange); their triples are retained so idempotent definition helpers can test for them with the "in" operator.
+"""
+
+__version__ = "0.1.0"
+
+import io
+import json
+import os
+import re
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
+
+from rdflib import OWL, RDF, BNode, Graph, Literal, URIRef
+from rdflib.namespace import NamespaceManager
+from rdflib.term import Node
+
+from case_dfxml import compressed_io
+from case_dfxml.sqlite_store import SQLiteStore
+
+Triple = Tuple[Node, Node, Node]
+
+# Pattern for a local name that is safe to write as a Turtle prefixed
+# name.  This is deliberately more conservative than the Turtle grammar.
+_RX_SAFE_LOCAL_NAME = re.compile(r"^[A-Za-z0-9_][A-Za-z0-9_\-]*$")
+
+# Types of the vocabulary terms mapping functions declare inline, such
+# as drafting:StorageMediumRange and drafting:deltaAnnotation.
+VOCABULARY_CLASSES = frozenset(
+    {OWL.AnnotationProperty, OWL.Class, OWL.DatatypeProperty, OWL.ObjectProperty}
+)
+
+
+def _escape_string(lexical_form: str) -> str:
+    """
+    Escape a lexical form for use within double quotes in N-Triples or Turtle.
+
+    >>> print(_escape_string('a "b"\\nc'))
+    a \\"b\\"\\nc
+    """
+    return (
+        lexical_form.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _sorted_prefixes(
+    namespace_manager: Optional[NamespaceManager],
+) -> List[Tuple[str, str]]:
+    """
+    Return the (namespace IRI, prefix) pairs bound in namespace_manager, longest namespaces first, so the most specific prefix of an IRI is found first.
+    """
+    if namespace_manager is None:
+        return []
+    return sorted(
+        ((str(iri), prefix) for (prefix, iri) in namespace_manager.namespaces()),
+        key=lambda x: len(x[0]),
+        reverse=True,
+    )
+
+
+class TripleSink:
+    """
+    Base class for streaming triple output.  Subclasses implement _write_triple, and optionally flush, _write_header and _write_footer.
+
+    Mapping functions call add or addN.  The caller driving the mapping calls flush after each complete DFXML object is mapped, and close once after all objects are mapped.  close does not close the underlying stream.
+
+    Triples describing a term declared as an instance of one of VOCABULARY_CLASSES are only written once, and membership tests with "in" find them, so mapping functions can declare terms when first used.
+    """
+
+    def __init__(
+        self,
+        out_fh: TextIO,
+        *args: Any,
+        namespace_manager: Optional[NamespaceManager] = None,
+        **kwargs: Any
+    ) -> None:
+        self.out_fh = out_fh
+        self.namespace_manager = namespace_manager
+        self.triple_count = 0
+        self._vocabulary_nodes: Set[Node] = set()
+        self._vocabulary_triples: Set[Triple] = set()
+        self._header_written = False
+        self._closed = False
+
+    def __contains__(self, triple: Triple) -> bool:
+        return triple in self._vocabulary_triples
+
+    def __enter__(self) -> "TripleSink":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def add(self, triple: Triple) -> None:
+        if triple[1] == RDF.type and triple[2] in VOCABULARY_CLASSES:
+            self._vocabulary_nodes.add(triple[0])
+        if triple[0] in self._vocabulary_nodes:
+            if triple in self._vocabulary_triples:
+                return
+            self._vocabulary_triples.add(triple)
+        if not self._header_written:
+            self._write_header()
+            self._header_written = True
+        self._write_triple(triple)
+        self.triple_count += 1
+
+    def addN(self, quads: Iterable[Tuple[Node, Node, Node, Any]]) -> None:
+        """
+        Add triples from quads, ignoring the context member, to match the calling convention of rdflib.Graph.addN.
+        """
+        for s, p, o, _ in quads:
+            self.add((s, p, o))
+
+    def flush(self) -> None:
+        """
+        Signal the end of a mapped unit.  Sinks that group triples write the buffered unit here.
+        """
+        pass
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self.flush()
+        if not self._header_written:
+            self._write_header()
+            self._header_written = True
+        self._write_footer()
+        self.out_fh.flush()
+        self._closed = True
+
+    def _write_header(self) -> None:
+        pass
+
+    def _write_footer(self) -> None:
+        pass
+
+    def _write_triple(self, triple: Triple) -> None:
+        raise NotImplementedError
+
+
+class ListSink(TripleSink):
+    """
+    Collects triples in a list, e.g. to return them from a worker process.
+
+    >>> from rdflib import Literal, URIRef
+    >>> sink = ListSink()
+    >>> sink.add((URIRef("urn:example:s"), URIRef("urn:example:p"), Literal("o")))
+    >>> len(sink.triples)
+    1
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(io.StringIO(), *args, **kwargs)
+        self.triples: List[Triple] = []
+
+    def _write_triple(self, triple: Triple) -> None:
+        self.triples.append(triple)
+
+
+class NTriplesSink(TripleSink):
+    """
+    >>> import io
+    >>> from rdflib import Literal, URIRef
+    >>> out_fh = io.StringIO()
+    >>> with NTriplesSink(out_fh) as sink:
+    ...     sink.add((URIRef("urn:example:s"), URIRef("urn:example:p"), Literal(1)))
+    >>> print(out_fh.getvalue(), end="")
+    <urn:example:s> <urn:example:p> "1"^^<http://www.w3.org/2001/XMLSchema#integer> .
+    """
+
+    def _write_triple(self, triple: Triple) -> None:
+        self.out_fh.write(
+            "%s %s %s .\n" % (triple[0].n3(), triple[1].n3(), triple[2].n3())
+        )
+
+
+class NQuadsSink(TripleSink):
+    """
+    If graph_name is None, triples are written to the default graph.
+
+    >>> import io
+    >>> from rdflib import Literal, URIRef
+    >>> out_fh = io.StringIO()
+    >>> with NQuadsSink(out_fh, graph_name=URIRef("urn:example:g")) as sink:
+    ...     sink.add((URIRef("urn:example:s"), URIRef("urn:example:p"), Literal("o")))
+    >>> print(out_fh.getvalue(), end="")
+    <urn:example:s> <urn:example:p> "o" <urn:example:g> .
+    """
+
+    def __init__(
+        self,
+        out_fh: TextIO,
+        *args: Any,
+        graph_name: Optional[URIRef] = None,
+        **kwargs: Any
+    ) -> None:
+        super().__init__(out_fh, *args, **kwargs)
+        self._graph_suffix = " ." if graph_name is None else " %s ." % graph_name.n3()
+
+    def _write_triple(self, triple: Triple) -> None:
+        self.out_fh.write(
+            "%s %s %s%s\n"
+            % (triple[0].n3(), triple[1].n3(), triple[2].n3(), self._graph_suffix)
+        )
+
+
+class TurtleSink(TripleSink):
+    """
+    Turtle output, with triples grouped by subject within each flushed unit.  Prefixes bound in namespace_manager are written as the document header, and used to compact IRIs.
+
+    >>> import io
+    >>> from rdflib import RDF, Graph, Literal, Namespace
+    >>> ns_ex = Namespace("http://example.org/ns/")
+    >>> graph = Graph(bind_namespaces="none")
+    >>> graph.bind("ex", ns_ex)
+    >>> out_fh = io.StringIO()
+    >>> with TurtleSink(out_fh, namespace_manager=graph.namespace_manager) as sink:
+    ...     sink.add((ns_ex.s, RDF.type, ns_ex.Thing))
+    ...     sink.add((ns_ex.s, ns_ex.p, Literal("o")))
+    >>> print(out_fh.getvalue(), end="")
+    @prefix ex: <http://example.org/ns/> .
+    <BLANKLINE>
+    ex:s
+        a ex:Thing ;
+        ex:p "o" ;
+        .
+    <BLANKLINE>
+    """
+
+    def __init__(self, out_fh: TextIO, *args: Any, **kwargs: Any) -> None:
+        super().__init__(out_fh, *args, **kwargs)
+        self._prefixes = _sorted_prefixes(self.namespace_manager)
+        self._unit: Dict[Node, Dict[Node, List[Node]]] = dict()
+
+    def _compact(self, term: Node) -> str:
+        if isinstance(term, URIRef):
+            iri = str(term)
+            for namespace_iri, prefix in self._prefixes:
+                if iri.startswith(namespace_iri):
+                    local_name = iri[len(namespace_iri) :]
+                    if _RX_SAFE_LOCAL_NAME.match(local_name):
+                        return "%s:%s" % (prefix, local_name)
+                    break
+            return term.n3()
+        if isinstance(term, Literal):
+            quoted = '"%s"' % _escape_string(str(term))
+            if term.language is not None:
+                return "%s@%s" % (quoted, term.language)
+            if term.datatype is not None:
+                return "%s^^%s" % (quoted, self._compact(term.datatype))
+            return quoted
+        if isinstance(term, BNode):
+            return term.n3()
+        raise TypeError("Unexpected term type: %r." % type(term))
+
+    def _write_header(self) -> None:
+        for namespace_iri, prefix in sorted(self._prefixes, key=lambda x: x[1]):
+            self.out_fh.write("@prefix %s: <%s> .\n" % (prefix, namespace_iri))
+        self.out_fh.write("\n")
+
+    def _write_triple(self, triple: Triple) -> None:
+        self._unit.setdefault(triple[0], dict()).setdefault(triple[1], []).append(
+            triple[2]
+        )
+
+    def flush(self) -> None:
+        for subject, predicate_objects in self._unit.items():
+            lines = [self._compact(subject)]
+            for predicate, objects in predicate_objects.items():
+                s_predicate = "a" if predicate == RDF.type else self._compact(predicate)
+                lines.append(
+                    "    %s %s ;"
+                    % (s_predicate, " , ".join(self._compact(x) for x in objects))
+                )
+            lines.append("    .\n\n")
+            self.out_fh.write("\n".join(lines))
+        self._unit.clear()
+
+
+class JSONLDSink(TripleSink):
+    """
+    JSON-LD output, as one document with a top-level "@graph" array, with triples grouped by subject into one node object within each flushed unit.  Prefixes bound in namespace_manager are written as the "@context", and used to compact IRIs.  Literals are written as value objects with their lexical forms, so they read back as the same RDF terms.
+
+    >>> import io
+    >>> from rdflib import RDF, Graph, Literal, Namespace
+    >>> ns_ex = Namespace("http://example.org/ns/")
+    >>> graph = Graph(bind_namespaces="none")
+    >>> graph.bind("ex", ns_ex)
+    >>> out_fh = io.StringIO()
+    >>> with JSONLDSink(out_fh, namespace_manager=graph.namespace_manager) as sink:
+    ...     sink.add((ns_ex.s, RDF.type, ns_ex.Thing))
+    ...     sink.add((ns_ex.s, ns_ex.p, Literal("o")))
+    ...     sink.add((ns_ex.s, ns_ex.q, ns_ex.t))
+    >>> print(out_fh.getvalue(), end="")
+    {
+      "@context": {"ex": "http://example.org/ns/"},
+      "@graph": [
+        {"@id": "ex:s", "@type": "ex:Thing", "ex:p": "o", "ex:q": {"@id": "ex:t"}}
+      ]
+    }
+    >>> len(Graph().parse(data=out_fh.getvalue(), format="json-ld"))
+    3
+    """
+
+    def __init__(self, out_fh: TextIO, *args: Any, **kwargs: Any) -> None:
+        super().__init__(out_fh, *args, **kwargs)
+        self._prefixes = _sorted_prefixes(self.namespace_manager)
+        self._unit: Dict[Node, Dict[Node, List[Node]]] = dict()
+        self._node_written = False
+        self._encoder = json.JSONEncoder(ensure_ascii=False)
+
+    def _compact(self, term: Node) -> str:
+        if isinstance(term, URIRef):
+            iri = str(term)
+            for namespace_iri, prefix in self._prefixes:
+                if iri.startswith(namespace_iri):
+                    local_name = iri[len(namespace_iri) :]
+                    if _RX_SAFE_LOCAL_NAME.match(local_name):
+                        return "%s:%s" % (prefix, local_name)
+                    break
+            return iri
+        if isinstance(term, BNode):
+            return "_:%s" % term
+        raise TypeError("Unexpected term type: %r." % type(term))
+
+    def _value(self, term: Node) -> Any:
+        if isinstance(term, Literal):
+            if term.language is not None:
+                return {"@value": str(term), "@language": term.language}
+            if term.datatype is not None:
+                return {"@value": str(term), "@type": self._compact(term.datatype)}
+            return str(term)
+        return {"@id": self._compact(term)}
+
+    def _write_header(self) -> None:
+        context = {
+            prefix: namespace_iri
+            for (namespace_iri, prefix) in sorted(self._prefixes, key=lambda x: x[1])
+        }
+        self.out_fh.write(
+            '{\n  "@context": %s,\n  "@graph": [' % self._encoder.encode(context)
+        )
+
+    def _write_footer(self) -> None:
+        self.out_fh.write("\n  ]\n}\n")
+
+    def _write_triple(self, triple: Triple) -> None:
+        self._unit.setdefault(triple[0], dict()).setdefault(triple[1], []).append(
+            triple[2]
+        )
+
+    def flush(self) -> None:
+        for subject, predicate_objects in self._unit.items():
+            node: Dict[str, Any] = {"@id": self._compact(subject)}
+            for predicate, objects in predicate_objects.items():
+                if predicate == RDF.type:
+                    types = [self._compact(x) for x in objects]
+                    node["@type"] = types[0] if len(types) == 1 else types
+                else:
+                    values = [self._value(x) for x in objects]
+                    node[self._compact(predicate)] = (
+                        values[0] if len(values) == 1 else values
+                    )
+            self.out_fh.write(
+                "%s\n    %s"
+                % ("," if self._node_written else "", self._encoder.encode(node))
+            )
+            self._node_written = True
+        self._unit.clear()
+
+
+class ShardedSink(TripleSink):
+    """
+    Writes triples to a directory of shard files, each written by a sink returned by make_sink for the shard's open text stream.  Shards are named shard-00000 and so on, followed by extension.
+
+    A shard is ended by next_shard, or, if shard_size is provided, by the first flush once the shard holds shard_size triples, or shard_size instances of counted_class if that is provided.  Shards are only ended between flushed units, and empty shards are not written.  Inlined vocabulary declarations, such as of OWL classes and properties, are repeated at the start of each shard that follows their first use, so each shard describes the terms it uses.
+
+    If on_next_shard is provided, it is called after each shard is ended, e.g. to forget which nodes were already written.  close writes manifest.json into out_dir.  It lists the count of distinct triples written; each shard, with its counts of triples, including repeated vocabulary declarations, and of counted_class instances; and each instance of shared_classes referenced from a shard other than the one it was first written in.
+
+    >>> import tempfile
+    >>> from rdflib import Namespace
+    >>> ns_ex = Namespace("http://example.org/ns/")
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     with ShardedSink(tmpdir, NTriplesSink, extension=".nt", counted_class=ns_ex.File, shard_size=1, shared_classes={ns_ex.Volume}) as sink:
+    ...         sink.add((ns_ex.Volume, RDF.type, OWL.Class))
+    ...         sink.add((ns_ex.v, RDF.type, ns_ex.Volume))
+    ...         sink.flush()
+    ...         sink.next_shard()
+    ...         for file_iri in (ns_ex.f1, ns_ex.f2):
+    ...             sink.add((file_iri, RDF.type, ns_ex.File))
+    ...             sink.add((file_iri, ns_ex.in_volume, ns_ex.v))
+    ...             sink.flush()
+    ...     with open(os.path.join(tmpdir, "manifest.json")) as in_fh:
+    ...         manifest = json.load(in_fh)
+    >>> [(x["path"], x["triples"], x["instances"]) for x in manifest["shards"]]
+    [('shard-00000.nt', 2, 0), ('shard-00001.nt', 3, 1), ('shard-00002.nt', 3, 1)]
+    >>> manifest["triples"]
+    6
+    >>> manifest["shared_iris"][0]["referenced_in"]
+    ['shard-00001.nt', 'shard-00002.nt']
+    """
+
+    def __init__(
+        self,
+        out_dir: str,
+        make_sink: Callable[[TextIO], TripleSink],
+        *args: Any,
+        codec: Optional[str] = None,
+        counted_class: Optional[URIRef] = None,
+        extension: str = "",
+        on_next_shard: Optional[Callable[[], None]] = None,
+        shard_size: Optional[int] = None,
+        shared_classes: Iterable[URIRef] = (),
+        **kwargs: Any
+    ) -> None:
+        super().__init__(io.StringIO(), *args, **kwargs)
+        self.out_dir = out_dir
+        self.make_sink = make_sink
+        self.codec = codec
+        self.counted_class = counted_class
+        self.extension = extension + (
+            "" if codec is None else compressed_io.CODEC_EXTENSIONS[codec]
+        )
+        self.on_next_shard = on_next_shard
+        self.shard_size = shard_size
+        self.shared_classes = frozenset(shared_classes)
+        self.shards: List[Dict[str, Any]] = []
+        self._shard_fh: Optional[TextIO] = None
+        self._shard_sink: Optional[TripleSink] = None
+        self._shard_triples = 0
+        self._shard_instances = 0
+        # Whether the shard holds triples other than vocabulary
+        # declarations.
+        self._shard_has_content = False
+        # Key: Instance of a shared class.
+        # Value: Index of the shard it was first written in, its class,
+        # and the indices of other shards referencing it.
+        self._shared_iris: Dict[URIRef, Tuple[int, URIRef, Set[int]]] = dict()
+
+    def _shard_path(self, shard_index: int) -> str:
+        return "shard-%05d%s" % (shard_index, self.extension)
+
+    def _open_shard(self) -> TripleSink:
+        self._shard_fh = cast(
+            TextIO,
+            compressed_io.open_text(
+                os.path.join(self.out_dir, self._shard_path(len(self.shards))),
+                "w",
+                self.codec,
+            ),
+        )
+        shard_sink = self.make_sink(self._shard_fh)
+        for vocabulary_triple in self._vocabulary_triples:
+            shard_sink.add(vocabulary_triple)
+        self._shard_triples = len(self._vocabulary_triples)
+        self._shard_sink = shard_sink
+        return shard_sink
+
+    def _note_reference(self, term: Node) -> None:
+        if not isinstance(term, URIRef):
+            return
+        shared = self._shared_iris.get(term)
+        if shared is not None and shared[0] != len(self.shards):
+            shared[2].add(len(self.shards))
+
+    def _write_triple(self, triple: Triple) -> None:
+        shard_sink = self._shard_sink
+        if shard_sink is None:
+            shard_sink = self._open_shard()
+            if triple in self._vocabulary_triples:
+                # Written, and counted, with the vocabulary declarations.
+                return
+        shard_sink.add(triple)
+        self._shard_triples += 1
+        if triple[0] not in self._vocabulary_nodes:
+            self._shard_has_content = True
+        if triple[1] == RDF.type:
+            if triple[2] == self.counted_class:
+                self._shard_instances += 1
+            if triple[2] in self.shared_classes and triple[0] not in self._shared_iris:
+                assert isinstance(triple[0], URIRef)
+                assert isinstance(triple[2], URIRef)
+                self._shared_iris[triple[0]] = (len(self.shards), triple[2], set())
+                return
+        self._note_reference(triple[0])
+        self._note_reference(triple[2])
+
+    def flush(self) -> None:
+        if self._shard_sink is None:
+            return
+        self._shard_sink.flush()
+        if self.shard_size is not None:
+            shard_count = (
+                self._shard_triples
+                if self.counted_class is None
+                else self._shard_instances
+            )
+            if shard_count >= self.shard_size:
+                self.next_shard()
+
+    def next_shard(self) -> None:
+        """
+        End the current shard, if any triples other than vocabulary declarations were written to it.
+        """
+        if not self._shard_has_content:
+            return
+        assert self._shard_sink is not None
+        assert self._shard_fh is not None
+        self._shard_sink.close()
+        self._shard_fh.close()
+        self.shards.append(
+            {
+                "path": self._shard_path(len(self.shards)),
+                "triples": self._shard_triples,
+                "instances": self._shard_instances,
+            }
+        )
+        self._shard_fh = None
+        self._shard_sink = None
+        self._shard_triples = 0
+        self._shard_instances = 0
+        self._shard_has_content = False
+        if self.on_next_shard is not None:
+            self.on_next_shard()
+
+    def _write_footer(self) -> None:
+        if self._shard_sink is not None:
+            # A shard of only vocabulary declarations is still written.
+            self._shard_has_content = True
+        self.next_shard()
+        shared_iris = [
+            {
+                "iri": str(iri),
+                "class": str(n_class),
+                "defined_in": self.shards[shard_index]["path"],
+                "referenced_in": [self.shards[x]["path"] for x in sorted(references)],
+            }
+            for (iri, (shard_index, n_class, references)) in self._shared_iris.items()
+            if len(references) > 0
+        ]
+        with open(
+            os.path.join(self.out_dir, "manifest.json"), "w", encoding="utf-8"
+        ) as out_fh:
+            json.dump(
+                {
+                    "counted_class": (
+                        None if self.counted_class is None else str(self.counted_class)
+                    ),
+                    "triples": self.triple_count,
+                    "shards": self.shards,
+                    "shared_iris": shared_iris,
+                },
+                out_fh,
+                indent=4,
+            )
+
+
+GraphLike = Union[Graph, TripleSink]
+
+
+def add_triples(graph: GraphLike, triples: Iterable[Triple]) -> None:
+    """
+    Add a batch of triples to a Graph or a TripleSink with one addN call.
+
+    >>> graph = Graph()
+    >>> add_triples(graph, [(URIRef("urn:example:s"), URIRef("urn:example:p"), Literal("o"))])
+    >>> len(graph)
+    1
+    """
+    if isinstance(graph, TripleSink):
+        graph.addN((s, p, o, None) for (s, p, o) in triples)
+    else:
+        graph.addN((s, p, o, graph) for (s, p, o) in triples)
+
+
+def write_graph(graph: Graph, sink: TripleSink) -> None:
+    """
+    Write the triples of graph to sink, one subject at a time, and close sink.  This lets a sink serialize a graph that was accumulated in memory or in a store.  A case_dfxml.sqlite_store.SQLiteStore lists its subjects in sorted order, so they are not collected in memory.
+
+    >>> out_fh = io.StringIO()
+    >>> graph = Graph()
+    >>> _ = graph.add((URIRef("urn:example:s"), URIRef("urn:example:p"), Literal("o")))
+    >>> write_graph(graph, NTriplesSink(out_fh))
+    >>> print(out_fh.getvalue(), end="")
+    <urn:example:s> <urn:example:p> "o" .
+    """
+    subjects: Iterable[Node] = (
+        graph.store.sorted_subjects()
+        if isinstance(graph.store, SQLiteStore)
+        else graph.subjects(unique=True)
+    )
+    for subject in subjects:
+        sink.addN((subject, p, o, None) for (p, o) in graph.predicate_objects(subject))
+        sink.flush()
+    sink.close()
+
+
+# Key: rdflib format name, as accepted by --output-format or returned by
+# rdflib.util.guess_format.
+# Value: Sink class able to stream that format.
+FORMAT_SINKS: Dict[str, Type[TripleSink]] = {
+    "json-ld": JSONLDSink,
+    "nquads": NQuadsSink,
+    "nt": NTriplesSink,
+    "nt11": NTriplesSink,
+    "ntriples": NTriplesSink,
+    "ttl": TurtleSink,
+    "turtle": TurtleSink,
+}
+
+# Key: rdflib format name, as in FORMAT_SINKS.
+# Value: File name extension of that format.
+FORMAT_EXTENSIONS: Dict[str, str] = {
+    "json-ld": ".jsonld",
+    "nquads": ".nq",
+    "nt": ".nt",
+    "nt11": ".nt",
+    "ntriples": ".nt",
+    "ttl": ".ttl",
+    "turtle": ".ttl",
+}
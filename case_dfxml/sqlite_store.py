@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module provides a disk-backed rdflib Store, using a SQLite database file, for graphs larger than available memory.
+
+Added triples are buffered and written in batches.  Secondary indexes are created on the first read that needs them, so bulk loading is not slowed by index maintenance.  The store is not context-aware: all triples are in one graph.
+
+A store directory can be reused across runs.  open_graph names each database file after a fingerprint of the input file's path and content and the options that affect the graph, and a database is only reused if it was marked complete by the run that populated it.
+"""
+
+__version__ = "0.1.0"
+
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Any, Dict, Generator, Iterator, List, Optional, Tuple, Union
+
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.graph import _ContextType, _TriplePatternType, _TripleType
+from rdflib.store import VALID_STORE, Store
+from rdflib.term import Identifier, Node
+
+_LITERAL_SEPARATOR = "\x1f"
+
+_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS meta (
+  key TEXT PRIMARY KEY,
+  value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS namespaces (
+  prefix TEXT PRIMARY KEY,
+  namespace TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS triples (
+  s TEXT NOT NULL,
+  p TEXT NOT NULL,
+  o TEXT NOT NULL,
+  PRIMARY KEY (s, p, o)
+) WITHOUT ROWID;
+"""
+
+_SECONDARY_INDEXES = """\
+CREATE INDEX IF NOT EXISTS triples_pos ON triples (p, o, s);
+CREATE INDEX IF NOT EXISTS triples_osp ON triples (o, s, p);
+"""
+
+
+def _encode(term: Node) -> str:
+    """
+    Encode an RDF term as text.  The first character records the term type.
+
+    >>> _encode(URIRef("urn:example:a"))
+    'Uurn:example:a'
+    >>> _decode(_encode(Literal("x", lang="en"))) == Literal("x", lang="en")
+    True
+    >>> _decode(_encode(Literal(1))) == Literal(1)
+    True
+    """
+    if isinstance(term, URIRef):
+        return "U" + str(term)
+    if isinstance(term, BNode):
+        return "B" + str(term)
+    if isinstance(term, Literal):
+        return "L" + _LITERAL_SEPARATOR.join(
+            (
+                "" if term.datatype is None else str(term.datatype),
+                "" if term.language is None else term.language,
+                str(term),
+            )
+        )
+    raise TypeError("Unsupported term type: %r." % type(term))
+
+
+@functools.lru_cache(maxsize=4096)
+def _decode(text: str) -> Node:
+    term_type = text[0]
+    if term_type == "U":
+        return URIRef(text[1:])
+    if term_type == "B":
+        return BNode(text[1:])
+    if term_type == "L":
+        datatype, language, lexical_form = text[1:].split(_LITERAL_SEPARATOR, 2)
+        return Literal(
+            lexical_form,
+            datatype=None if datatype == "" else URIRef(datatype),
+            lang=None if language == "" else language,
+        )
+    raise ValueError("Unrecognized term encoding: %r." % text)
+
+
+class SQLiteStore(Store):
+    """
+    An rdflib Store backed by a SQLite database file.  configuration is the database file path; to create a new database file, pass no configuration and call open with create=True.
+
+    >>> import tempfile
+    >>> from rdflib import RDF, Namespace
+    >>> ns_ex = Namespace("http://example.org/ns/")
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     store = SQLiteStore(batch_size=2)
+    ...     _ = store.open(os.path.join(tmpdir, "graph.sqlite3"), create=True)
+    ...     graph = Graph(store=store)
+    ...     for triple in [
+    ...         (ns_ex.a, RDF.type, ns_ex.Thing),
+    ...         (ns_ex.b, RDF.type, ns_ex.Thing),
+    ...         (ns_ex.b, RDF.type, ns_ex.Thing),
+    ...         (ns_ex.b, ns_ex.size, Literal(3)),
+    ...     ]:
+    ...         _ = graph.add(triple)
+    ...     print(len(graph), sorted(graph.subjects(RDF.type, ns_ex.Thing)))
+    ...     graph.close()
+    3 [rdflib.term.URIRef('http://example.org/ns/a'), rdflib.term.URIRef('http://example.org/ns/b')]
+    """
+
+    context_aware = False
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = False
+
+    def __init__(
+        self,
+        configuration: Optional[str] = None,
+        identifier: Optional[Identifier] = None,
+        *args: Any,
+        batch_size: int = 10000,
+        **kwargs: Any
+    ) -> None:
+        self.batch_size = batch_size
+        self._connection: Optional[sqlite3.Connection] = None
+        self._indexed = False
+        self._namespace: Dict[str, URIRef] = dict()
+        self._pending: List[Tuple[str, str, str]] = []
+        self._prefix: Dict[URIRef, str] = dict()
+        super().__init__(configuration, identifier)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            raise ValueError("Store is not open.")
+        return self._connection
+
+    @property
+    def complete(self) -> bool:
+        """
+        True if a previous run marked this store's contents complete with mark_complete.
+        """
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'complete'"
+        ).fetchone()
+        return row is not None and row[0] == "1"
+
+    def open(
+        self, configuration: Union[str, Tuple[str, str]], create: bool = False
+    ) -> Optional[int]:
+        assert isinstance(configuration, str)
+        if not create and not os.path.exists(configuration):
+            raise FileNotFoundError(configuration)
+        self._connection = sqlite3.connect(configuration)
+        # A store's contents are only trusted once marked complete, so
+        # durability of partial loads is not needed.
+        self._connection.execute("PRAGMA synchronous = OFF")
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.executescript(_SCHEMA)
+        self._indexed = (
+            self._connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'triples_pos'"
+            ).fetchone()
+            is not None
+        )
+        for prefix, namespace in self._connection.execute(
+            "SELECT prefix, namespace FROM namespaces"
+        ):
+            self._namespace[prefix] = URIRef(namespace)
+            self._prefix[URIRef(namespace)] = prefix
+        return VALID_STORE
+
+    def close(self, commit_pending_transaction: bool = False) -> None:
+        if self._connection is None:
+            return
+        self.commit()
+        self._connection.close()
+        self._connection = None
+
+    def commit(self) -> None:
+        self._flush()
+        self.connection.commit()
+
+    def rollback(self) -> None:
+        self._pending.clear()
+        self.connection.rollback()
+
+    def mark_complete(self) -> None:
+        self._flush()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('complete', '1')"
+        )
+        self.commit()
+
+    def reset(self) -> None:
+        """
+        Discard all triples and the completion mark.  Namespace bindings are kept.
+        """
+        self._pending.clear()
+        self.connection.execute("DELETE FROM triples")
+        self.connection.execute("DELETE FROM meta WHERE key = 'complete'")
+        self.connection.commit()
+
+    def _flush(self) -> None:
+        if len(self._pending) == 0:
+            return
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO triples (s, p, o) VALUES (?, ?, ?)", self._pending
+        )
+        self._pending.clear()
+
+    def _ensure_indexes(self) -> None:
+        if self._indexed:
+            return
+        self.connection.executescript(_SECONDARY_INDEXES)
+        self._indexed = True
+
+    def add(
+        self,
+        triple: _TripleType,
+        context: Optional[_ContextType] = None,
+        quoted: bool = False,
+    ) -> None:
+        self._pending.append(
+            (_encode(triple[0]), _encode(triple[1]), _encode(triple[2]))
+        )
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+
+    def addN(self, quads: Any) -> None:
+        for s, p, o, _ in quads:
+            self.add((s, p, o))
+
+    def _where(self, triple_pattern: _TriplePatternType) -> Tuple[str, Tuple[str, ...]]:
+        clauses: List[str] = []
+        parameters: List[str] = []
+        for column, term in zip(("s", "p", "o"), triple_pattern):
+            if term is None:
+                continue
+            assert isinstance(term, Node)
+            clauses.append("%s = ?" % column)
+            parameters.append(_encode(term))
+        if len(clauses) == 0:
+            return ("", tuple())
+        # The primary key serves patterns with a bound subject.
+        if len(clauses) < 3 and triple_pattern[0] is None:
+            self._ensure_indexes()
+        return (" WHERE " + " AND ".join(clauses), tuple(parameters))
+
+    def remove(
+        self,
+        triple_pattern: _TriplePatternType,
+        context: Optional[_ContextType] = None,
+    ) -> None:
+        self._flush()
+        where, parameters = self._where(triple_pattern)
+        self.connection.execute("DELETE FROM triples" + where, parameters)
+
+    def triples(
+        self,
+        triple_pattern: _TriplePatternType,
+        context: Optional[_ContextType] = None,
+    ) -> Iterator[Tuple[_TripleType, Iterator[Optional[_ContextType]]]]:
+        self._flush()
+        where, parameters = self._where(triple_pattern)
+        cursor = self.connection.execute(
+            "SELECT s, p, o FROM triples" + where, parameters
+        )
+        for s, p, o in cursor:
+            yield (_decode(s), _decode(p), _decode(o)), iter(())
+
+    def sorted_subjects(self) -> Iterator[Node]:
+        """
+        Yield each subject once, in the order of their encodings.  Subjects are read in primary key order, so they are not collected in memory.
+
+        >>> import tempfile
+        >>> from rdflib import RDF, Namespace
+        >>> ns_ex = Namespace("http://example.org/ns/")
+        >>> with tempfile.TemporaryDirectory() as tmpdir:
+        ...     store = SQLiteStore()
+        ...     _ = store.open(os.path.join(tmpdir, "graph.sqlite3"), create=True)
+        ...     graph = Graph(store=store)
+        ...     for triple in [
+        ...         (ns_ex.b, RDF.type, ns_ex.Thing),
+        ...         (ns_ex.a, RDF.type, ns_ex.Thing),
+        ...         (ns_ex.b, ns_ex.size, Literal(3)),
+        ...     ]:
+        ...         _ = graph.add(triple)
+        ...     print([str(x) for x in store.sorted_subjects()])
+        ...     graph.close()
+        ['http://example.org/ns/a', 'http://example.org/ns/b']
+        """
+        self._flush()
+        cursor = self.connection.execute("SELECT DISTINCT s FROM triples ORDER BY s")
+        for (s,) in cursor:
+            yield _decode(s)
+
+    def __len__(self, context: Optional[_ContextType] = None) -> int:
+        self._flush()
+        row = self.connection.execute("SELECT COUNT(*) FROM triples").fetchone()
+        return int(row[0])
+
+    def contexts(
+        self, triple: Optional[_TripleType] = None
+    ) -> Generator[_ContextType, None, None]:
+        yield from ()
+
+    def bind(self, prefix: str, namespace: URIRef, override: bool = True) -> None:
+        bound_namespace = self._namespace.get(prefix)
+        bound_prefix = self._prefix.get(namespace)
+        if not override and (bound_namespace is not None or bound_prefix is not None):
+            return
+        if bound_namespace is not None:
+            del self._prefix[bound_namespace]
+        if bound_prefix is not None:
+            del self._namespace[bound_prefix]
+        self._namespace[prefix] = namespace
+        self._prefix[namespace] = prefix
+        self.connection.execute(
+            "DELETE FROM namespaces WHERE prefix = ? OR namespace = ?",
+            (prefix, str(namespace)),
+        )
+        self.connection.execute(
+            "INSERT INTO namespaces (prefix, namespace) VALUES (?, ?)",
+            (prefix, str(namespace)),
+        )
+
+    def namespace(self, prefix: str) -> Optional[URIRef]:
+        return self._namespace.get(prefix)
+
+    def prefix(self, namespace: URIRef) -> Optional[str]:
+        return self._prefix.get(namespace)
+
+    def namespaces(self) -> Iterator[Tuple[str, URIRef]]:
+        yield from list(self._namespace.items())
+
+
+def fingerprint(in_path: str, **options: Any) -> str:
+    """
+    Fingerprint an input file and the options that affect the graph built from it.  The file is identified by its path and a digest of its content, so an input rewritten without changing its size or modification time is not matched to a stale store.
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     in_path = os.path.join(tmpdir, "in.dfxml")
+    ...     with open(in_path, "w") as out_fh:
+    ...         _ = out_fh.write("<dfxml>1</dfxml>")
+    ...     before = fingerprint(in_path)
+    ...     stat_result = os.stat(in_path)
+    ...     with open(in_path, "w") as out_fh:
+    ...         _ = out_fh.write("<dfxml>2</dfxml>")
+    ...     os.utime(in_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+    ...     before == fingerprint(in_path)
+    False
+    """
+    content_hash = hashlib.sha256()
+    size = 0
+    with open(in_path, "rb") as in_fh:
+        while True:
+            chunk = in_fh.read(1 << 20)
+            if not chunk:
+                break
+            content_hash.update(chunk)
+            size += len(chunk)
+    description = {
+        "options": options,
+        "path": os.path.realpath(in_path),
+        "sha256": content_hash.hexdigest(),
+        "size": size,
+    }
+    return hashlib.sha256(
+        json.dumps(description, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def open_graph(
+    store_dir: str, store_fingerprint: str, *args: Any, **kwargs: Any
+) -> Tuple[Graph, SQLiteStore]:
+    """
+    Open a Graph backed by the database for store_fingerprint in store_dir, creating the directory and database as needed.  If the database was not marked complete, its contents are discarded, so the caller can test the store's complete property to decide whether to populate the graph.  Keyword arguments are passed to SQLiteStore.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    store = SQLiteStore(**kwargs)
+    store.open(os.path.join(store_dir, store_fingerprint + ".sqlite3"), create=True)
+    if not store.complete:
+        store.reset()
+    return (Graph(store=store), store)
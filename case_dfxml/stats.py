@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module records the per-phase timing and object counts of a conversion run, for the --stats and --profile options of dfxml_to_case and case_to_dfxml.
+
+Phase times are exclusive: while a phase nested in another is running, such as reading input from within the mapping loop, only the nested phase accrues time.  Phases can be entered more than once, and accrue time across entries.
+"""
+
+__version__ = "0.1.0"
+
+import collections
+import contextlib
+import cProfile
+import json
+import sys
+import time
+from types import ModuleType
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+# resource is only available on Unix.  Elsewhere, resident set sizes and the usage of worker processes are reported as None.
+resource: Optional[ModuleType]
+try:
+    import resource
+except ImportError:
+    resource = None
+
+_T = TypeVar("_T")
+
+
+def _rss_bytes(ru_maxrss: int) -> int:
+    # ru_maxrss is in kibibytes on Linux, and in bytes on macOS.
+    return ru_maxrss if sys.platform == "darwin" else ru_maxrss * 1024
+
+
+class PhaseStats:
+    __slots__ = ("calls", "cpu_seconds", "wall_seconds")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.cpu_seconds = 0.0
+        self.wall_seconds = 0.0
+
+
+class RunStats:
+    """
+    Accumulates phase times and counters of a run.  If profile_path is provided, phases entered with profile=True are profiled with cProfile, and the profile is written to profile_path by write.
+
+    >>> run_stats = RunStats("example")
+    >>> with run_stats.phase("map"):
+    ...     for _ in run_stats.timed_iter("parse", range(3)):
+    ...         run_stats.count("files")
+    >>> report = run_stats.report()
+    >>> sorted(report["phases"].keys())
+    ['map', 'parse']
+    >>> report["phases"]["parse"]["calls"]
+    4
+    >>> report["counters"]
+    {'files': 3}
+    """
+
+    def __init__(
+        self,
+        program: str,
+        *args: Any,
+        profile_path: Optional[str] = None,
+        **kwargs: Any
+    ) -> None:
+        self.program = program
+        self.profile_path = profile_path
+        self.counters: collections.Counter[str] = collections.Counter()
+        # Key: Phase name, in order of first entry.
+        self.phases: Dict[str, PhaseStats] = dict()
+        self._profiler: Optional[cProfile.Profile] = (
+            None if profile_path is None else cProfile.Profile()
+        )
+        self._stack: List[PhaseStats] = []
+        self._start_wall = time.perf_counter()
+        self._mark_wall = self._start_wall
+        self._mark_cpu = time.process_time()
+
+    def _charge(self) -> None:
+        """
+        Charge the time since the last mark to the innermost running phase.
+        """
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        if len(self._stack) > 0:
+            self._stack[-1].wall_seconds += wall - self._mark_wall
+            self._stack[-1].cpu_seconds += cpu - self._mark_cpu
+        self._mark_wall = wall
+        self._mark_cpu = cpu
+
+    def _enter(self, name: str) -> None:
+        self._charge()
+        phase_stats = self.phases.get(name)
+        if phase_stats is None:
+            phase_stats = PhaseStats()
+            self.phases[name] = phase_stats
+        phase_stats.calls += 1
+        self._stack.append(phase_stats)
+
+    def _exit(self) -> None:
+        self._charge()
+        self._stack.pop()
+
+    @contextlib.contextmanager
+    def phase(self, name: str, *, profile: bool = False) -> Iterator[None]:
+        profiler = self._profiler if profile else None
+        self._enter(name)
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            self._exit()
+
+    def timed_iter(self, name: str, iterable: Iterable[_T]) -> Iterator[_T]:
+        """
+        Generator.  Yields the members of iterable, charging the time spent producing each to the phase name.
+        """
+        iterator = iter(iterable)
+        while True:
+            self._enter(name)
+            try:
+                member = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._exit()
+            yield member
+
+    def count(self, name: str, increment: int = 1) -> None:
+        self.counters[name] += increment
+
+    def report(self) -> Dict[str, Any]:
+        cpu_seconds = time.process_time()
+        peak_rss_bytes: Optional[int] = None
+        children_cpu_seconds: Optional[float] = None
+        children_peak_rss_bytes: Optional[int] = None
+        if resource is not None:
+            self_usage = resource.getrusage(resource.RUSAGE_SELF)
+            children_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+            cpu_seconds = self_usage.ru_utime + self_usage.ru_stime
+            peak_rss_bytes = _rss_bytes(self_usage.ru_maxrss)
+            children_cpu_seconds = round(
+                children_usage.ru_utime + children_usage.ru_stime, 6
+            )
+            children_peak_rss_bytes = _rss_bytes(children_usage.ru_maxrss)
+        return {
+            "program": self.program,
+            "wall_seconds": round(time.perf_counter() - self._start_wall, 6),
+            "cpu_seconds": round(cpu_seconds, 6),
+            "peak_rss_bytes": peak_rss_bytes,
+            # Worker processes, if any, once they have exited.
+            "children_cpu_seconds": children_cpu_seconds,
+            "children_peak_rss_bytes": children_peak_rss_bytes,
+            "phases": {
+                name: {
+                    "calls": phase_stats.calls,
+                    "wall_seconds": round(phase_stats.wall_seconds, 6),
+                    "cpu_seconds": round(phase_stats.cpu_seconds, 6),
+                }
+                for (name, phase_stats) in self.phases.items()
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def write(self, stats_path: Optional[str]) -> None:
+        """
+        Write the report to stats_path as JSON, if stats_path is provided, and the profile to profile_path, if profiling.
+        """
+        if stats_path is not None:
+            with open(stats_path, "w") as out_fh:
+                json.dump(self.report(), out_fh, indent=4)
+        if self._profiler is not None:
+            assert self.profile_path is not None
+            self._profiler.dump_stats(self.profile_path)
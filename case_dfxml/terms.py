@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module constructs the RDF literals emitted for every file and volume.
+
+rdflib parses and normalizes the lexical form of each typed Literal it constructs.  For literals that recur, this module constructs them once: constants are module-level, and integer and xsd:dateTime literals are cached by value.  xsd:dateTime literals in the ISO 8601 form DFXML records are parsed with datetime.fromisoformat instead of rdflib's general-purpose parser, yielding the same normalized literal.
+"""
+
+__version__ = "0.1.0"
+
+import datetime
+import functools
+import re
+from typing import Any
+
+from case_utils.namespace import NS_XSD
+from rdflib import Literal
+
+L_TRUE = Literal(True)
+L_CHILD_OF = Literal("Child_Of")
+L_CONTAINED_WITHIN = Literal("Contained_Within")
+
+# The xsd:dateTime lexical forms that datetime.fromisoformat reads with
+# the same meaning.  Other forms fall back to rdflib.
+_ISO_DATETIME_PATTERN = re.compile(
+    r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:\d{2})?\Z"
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def integer_literal(value: int) -> Literal:
+    """
+    Return the xsd:integer Literal of value.  Repeated values, such as the file sizes of a block-aligned file system, return the same Literal.
+
+    >>> integer_literal(4096) is integer_literal(4096)
+    True
+    """
+    return Literal(value)
+
+
+@functools.lru_cache(maxsize=4096)
+def _datetime_text_literal(text: str) -> Literal:
+    if _ISO_DATETIME_PATTERN.match(text) is not None:
+        try:
+            return Literal(datetime.datetime.fromisoformat(text))
+        except ValueError:
+            # E.g. a leap second, or an hour of 24.
+            pass
+    return Literal(text, datatype=NS_XSD.dateTime)
+
+
+def datetime_literal(value: Any) -> Literal:
+    """
+    Return the xsd:dateTime Literal of value, which is a datetime.datetime or an object whose string form is the timestamp, such as a dfxml.objects.TimestampObject.  The Literal is equal to Literal(str(value), datatype=NS_XSD.dateTime).
+
+    >>> datetime_literal("2009-01-01T12:34:56Z")
+    rdflib.term.Literal('2009-01-01T12:34:56+00:00', datatype=rdflib.term.URIRef('http://www.w3.org/2001/XMLSchema#dateTime'))
+    >>> all(
+    ...     datetime_literal(x) == Literal(x, datatype=NS_XSD.dateTime)
+    ...     for x in [
+    ...         "2009-01-01T12:34:56",
+    ...         "2009-01-01T12:34:56.5-05:00",
+    ...         "2009-01-01T12:34:56.123456789Z",
+    ...         "2009-01-01T24:00:00Z",
+    ...         "2009-01-01",
+    ...     ]
+    ... )
+    True
+    """
+    if isinstance(value, datetime.datetime):
+        return Literal(value)
+    return _datetime_text_literal(str(value))
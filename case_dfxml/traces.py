@@ -0,0 +1,676 @@
+#!/usr/bin/env python
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module maps DFXML disk images, volumes and files to CASE traces, for dfxml_to_case.  EventMapper maps the event stream of a DFXML reader, mapping files in the calling process with fileobject_to_trace, or in worker processes with _ParallelFileMapper.
+"""
+
+__version__ = "0.1.0"
+
+import collections
+import functools
+import sys
+import uuid
+from typing import (
+    TYPE_CHECKING,
+    AbstractSet,
+    Any,
+    Callable,
+    Deque,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from case_utils.inherent_uuid import get_facet_uriref
+from case_utils.namespace import (
+    NS_OWL,
+    NS_RDF,
+    NS_RDFS,
+    NS_UCO_CORE,
+    NS_UCO_OBSERVABLE,
+    NS_XSD,
+)
+from rdflib import Literal, Namespace, URIRef
+
+from case_dfxml import dfxml_reader
+from case_dfxml.mapping import HASH_FIELDS, HashInterner, file_facet_triples
+from case_dfxml.minting import NodeMinter, default_minter
+from case_dfxml.namespace import NS_DRAFTING
+from case_dfxml.sinks import GraphLike, ListSink, Triple, TripleSink, add_triples
+from case_dfxml.terms import L_CHILD_OF, L_CONTAINED_WITHIN, L_TRUE, integer_literal
+
+if TYPE_CHECKING:
+    # Imported when used, as only some runs need them.
+    import concurrent.futures
+
+    from dfxml import objects as Objects
+
+    from case_dfxml.stats import RunStats
+
+# Differential DFXML annotations that mark an object as changed.  Objects
+# with none of these (e.g. "matched" objects) are skipped under --delta.
+CHANGE_ANNOS = frozenset({"changed", "deleted", "modified", "new", "renamed"})
+
+
+def _inline_storage_medium_range_definition(graph: GraphLike) -> None:
+    if (NS_DRAFTING.StorageMediumRange, NS_RDF.type, NS_OWL.Class) in graph:
+        # Already defined once.
+        return
+    graph.add((NS_DRAFTING.StorageMediumRange, NS_RDF.type, NS_OWL.Class))
+    graph.add(
+        (
+            NS_DRAFTING.StorageMediumRange,
+            NS_RDFS.label,
+            Literal("StorageMediumRange", lang="en"),
+        )
+    )
+    graph.add(
+        (
+            NS_DRAFTING.StorageMediumRange,
+            NS_RDFS.subClassOf,
+            NS_UCO_OBSERVABLE.ObservableRelationship,
+        )
+    )
+    # The intended restrictions on the uco-core:Relationship properties
+    # are as follows, but aren't inlined in order to avoid duplicate blank node
+    # issues:
+    #
+    # kindOfRelationship: Contained_Within suggested.
+    # source: A storage system object, including File, FileSystem,
+    #         Partition, PartitionSystem, and non-File Image.
+    # target: The union of Image, Disk, and possibly a new class to
+    #         represent the available storage presented by multi-disk
+    #         storage systems (e.g. RAID arrays).
+
+
+def _inline_delta_annotation_definition(graph: GraphLike) -> None:
+    if (NS_DRAFTING.deltaAnnotation, NS_RDF.type, NS_OWL.DatatypeProperty) in graph:
+        # Already defined once.
+        return
+    graph.add((NS_DRAFTING.deltaAnnotation, NS_RDF.type, NS_OWL.DatatypeProperty))
+    graph.add(
+        (
+            NS_DRAFTING.deltaAnnotation,
+            NS_RDFS.label,
+            Literal("deltaAnnotation", lang="en"),
+        )
+    )
+    graph.add(
+        (
+            NS_DRAFTING.deltaAnnotation,
+            NS_RDFS.comment,
+            Literal(
+                "A differential DFXML annotation of how an object changed between two DFXML inputs, using the annotation names of dfxml.objects: new, deleted, renamed, changed, or modified.",
+                lang="en",
+            ),
+        )
+    )
+    graph.add((NS_DRAFTING.deltaAnnotation, NS_RDFS.range, NS_XSD.string))
+
+
+def _add_delta_annotations(
+    graph: GraphLike, n_object: URIRef, annos: AbstractSet[str]
+) -> None:
+    for anno in sorted(annos & CHANGE_ANNOS):
+        graph.add((n_object, NS_DRAFTING.deltaAnnotation, Literal(anno)))
+
+
+def fileobject_to_trace(
+    graph: GraphLike,
+    ns_kb: Namespace,
+    fobj: "Union[Objects.FileObject, dfxml_reader.FileRecord]",
+    *args: Any,
+    delta_annotations: bool = False,
+    hash_interner: Optional[HashInterner] = None,
+    node_minter: Optional[NodeMinter] = None,
+    parent_trace: Optional[URIRef] = None,
+    use_inherent_uuids: bool = False,
+    **kwargs: Any
+) -> URIRef:
+    """
+    Map a file, with the facet and hash triples declared in case_dfxml.mapping.  See case_dfxml.mapping.file_facet_triples for hash_interner.  node_minter mints the IRIs of new nodes in ns_kb; if absent, a shared random-mode minter is used.
+
+    >>> ns_kb = Namespace("http://example.org/kb/")
+    >>> record = dfxml_reader.FileRecord()
+    >>> record.filename = "a.txt"
+    >>> sink = ListSink()
+    >>> n_file = fileobject_to_trace(sink, ns_kb, record, parent_trace=ns_kb["FileSystem-1"])
+    >>> (n_file, NS_RDF.type, NS_UCO_OBSERVABLE.File) in sink.triples
+    True
+    >>> sorted(o for (s, p, o) in sink.triples if p == NS_UCO_CORE.kindOfRelationship)
+    [rdflib.term.Literal('Child_Of')]
+    """
+    if node_minter is None:
+        node_minter = default_minter(ns_kb)
+    n_file = node_minter.mint("File-")
+    triples: List[Triple] = [(n_file, NS_RDF.type, NS_UCO_OBSERVABLE.File)]
+    triples.extend(
+        file_facet_triples(
+            node_minter,
+            n_file,
+            fobj,
+            hash_interner=hash_interner,
+            use_inherent_uuids=use_inherent_uuids,
+        )
+    )
+
+    if parent_trace is not None:
+        # Create a parent-child relationship.
+        n_relationship = node_minter.mint("Relationship-")
+        triples.append(
+            (n_relationship, NS_RDF.type, NS_UCO_OBSERVABLE.ObservableRelationship)
+        )
+        triples.append((n_relationship, NS_UCO_CORE.isDirectional, L_TRUE))
+        triples.append((n_relationship, NS_UCO_CORE.kindOfRelationship, L_CHILD_OF))
+        triples.append((n_relationship, NS_UCO_CORE.source, n_file))
+        triples.append((n_relationship, NS_UCO_CORE.target, parent_trace))
+        # _logger.debug("Parent: %r." % parent_trace)
+        # _logger.debug("Child: %r." % n_file)
+
+    add_triples(graph, triples)
+    if delta_annotations:
+        _add_delta_annotations(graph, n_file, fobj.annos)
+
+    return n_file
+
+
+def volumeobject_to_trace(
+    graph: GraphLike,
+    ns_kb: Namespace,
+    vobj: "Union[Objects.VolumeObject, dfxml_reader.VolumeRecord]",
+    *args: Any,
+    container_image_trace: Optional[URIRef] = None,
+    delta_annotations: bool = False,
+    node_minter: Optional[NodeMinter] = None,
+    use_inherent_uuids: bool = False,
+    **kwargs: Any
+) -> URIRef:
+    """
+    Map a volume, as a uco-observable:FileSystem, or as a uco-observable:ArchiveFile if its file system type is "7z".  A volume with a partition offset is related to container_image_trace, or to a placeholder if that is absent, with a drafting:StorageMediumRange relationship.
+
+    >>> ns_kb = Namespace("http://example.org/kb/")
+    >>> record = dfxml_reader.VolumeRecord()
+    >>> record.ftype_str = "ntfs"
+    >>> record.partition_offset = 512
+    >>> sink = ListSink()
+    >>> n_volume = volumeobject_to_trace(sink, ns_kb, record)
+    >>> (n_volume, NS_RDF.type, NS_UCO_OBSERVABLE.FileSystem) in sink.triples
+    True
+    >>> sorted(o for (s, p, o) in sink.triples if p == NS_UCO_OBSERVABLE.fileSystemType)
+    [rdflib.term.Literal('NTFS')]
+    """
+    if node_minter is None:
+        node_minter = default_minter(ns_kb)
+    # Behave differently depending on whether vobj is a file system or an archive.
+    if vobj.ftype_str == "7z":
+        n_volume = node_minter.mint("File-")
+        graph.add((n_volume, NS_RDF.type, NS_UCO_OBSERVABLE.ArchiveFile))
+        if delta_annotations:
+            _add_delta_annotations(graph, n_volume, vobj.annos)
+    else:
+        n_volume = node_minter.mint("FileSystem-")
+        graph.add((n_volume, NS_RDF.type, NS_UCO_OBSERVABLE.FileSystem))
+        if delta_annotations:
+            _add_delta_annotations(graph, n_volume, vobj.annos)
+
+        # This variable should be accessed with one or more calls to _n_file_system_facet().
+        n_file_system_facet: Optional[URIRef] = None
+
+        def _n_file_system_facet() -> URIRef:
+            """
+            Idempotent initialization of n_file_system_facet.
+            """
+            nonlocal n_file_system_facet
+            # nonlocal use_inherent_uuids
+            if n_file_system_facet is None:
+                if use_inherent_uuids:
+                    n_file_system_facet = get_facet_uriref(
+                        n_volume, NS_UCO_OBSERVABLE.FileSystemFacet, namespace=ns_kb
+                    )
+                else:
+                    n_file_system_facet = node_minter.mint("FileSystmFacet-")
+                graph.add(
+                    (
+                        n_file_system_facet,
+                        NS_RDF.type,
+                        NS_UCO_OBSERVABLE.FileSystemFacet,
+                    )
+                )
+                graph.add((n_volume, NS_UCO_CORE.hasFacet, n_file_system_facet))
+            return n_file_system_facet
+
+        if vobj.ftype_str:
+            # Default to uppercase of DFXML's value.
+            graph.add(
+                (
+                    _n_file_system_facet(),
+                    NS_UCO_OBSERVABLE.fileSystemType,
+                    Literal(vobj.ftype_str.upper()),
+                )
+            )
+        if vobj.partition_offset is not None:
+            # Create a contained-within relationship to anchor what the
+            # offset is relative to.
+            # To disambiguate from other Contained_Within-described
+            # relationships, assign a type.
+            # TODO - vobj.partition_offset entails that a
+            # PartitionObject exists.  This is something that may need
+            # to be adjusted in the schema.
+            _n_container: URIRef
+            if container_image_trace is None:
+                _n_container = node_minter.mint("ObservableObject-")
+                graph.add(
+                    (_n_container, NS_RDF.type, NS_UCO_OBSERVABLE.ObservableObject)
+                )
+                graph.add(
+                    (
+                        _n_container,
+                        NS_RDFS.comment,
+                        Literal(
+                            "This object was created as a placeholder for a file system object that described itself as having a location-offset from its most-directly-containing storage medium, but without having a recorded reference to the storage medium object."
+                        ),
+                    )
+                )
+            else:
+                _n_container = container_image_trace
+
+            n_relationship = node_minter.mint("Relationship-")
+            graph.add(
+                (
+                    n_relationship,
+                    NS_RDF.type,
+                    NS_UCO_OBSERVABLE.ObservableRelationship,
+                )
+            )
+            graph.add(
+                (
+                    n_relationship,
+                    NS_RDF.type,
+                    NS_DRAFTING.StorageMediumRange,
+                )
+            )
+            _inline_storage_medium_range_definition(graph)
+            graph.add((n_relationship, NS_UCO_CORE.isDirectional, L_TRUE))
+            graph.add(
+                (
+                    n_relationship,
+                    NS_UCO_CORE.kindOfRelationship,
+                    L_CONTAINED_WITHIN,
+                )
+            )
+            graph.add((n_relationship, NS_UCO_CORE.source, n_volume))
+            graph.add((n_relationship, NS_UCO_CORE.target, _n_container))
+            # _logger.debug("Container: %r." % _n_container)
+            # _logger.debug("Containee: %r." % n_file_system)
+            if use_inherent_uuids:
+                n_data_range_facet = get_facet_uriref(
+                    n_relationship, NS_UCO_OBSERVABLE.DataRangeFacet, namespace=ns_kb
+                )
+            else:
+                n_data_range_facet = node_minter.mint("DataRangeFacet-")
+            graph.add(
+                (n_data_range_facet, NS_RDF.type, NS_UCO_OBSERVABLE.DataRangeFacet)
+            )
+            graph.add(
+                (
+                    n_data_range_facet,
+                    NS_UCO_OBSERVABLE.rangeOffset,
+                    integer_literal(vobj.partition_offset),
+                )
+            )
+            graph.add((n_relationship, NS_UCO_CORE.hasFacet, n_data_range_facet))
+
+    return n_volume
+
+
+def _image_to_trace(graph: GraphLike, node_minter: NodeMinter) -> URIRef:
+    # TODO This logic implements a stub to handle volume.partition_offset.
+    n_image = node_minter.mint("Image-")
+    graph.add((n_image, NS_RDF.type, NS_UCO_OBSERVABLE.Image))
+    return n_image
+
+
+class _DeferredTrace:
+    """
+    A trace for a disk image or volume, mapped when first resolved.  Under --delta, images and volumes are only mapped if they are annotated as changed or contain a changed file.
+    """
+
+    __slots__ = ("_map_function", "_trace")
+
+    def __init__(self, map_function: Callable[[], URIRef]) -> None:
+        self._map_function = map_function
+        self._trace: Optional[URIRef] = None
+
+    @property
+    def resolved(self) -> bool:
+        return self._trace is not None
+
+    def resolve(self) -> URIRef:
+        if self._trace is None:
+            self._trace = self._map_function()
+        return self._trace
+
+
+def _deferred_volume_trace(
+    graph: GraphLike,
+    ns_kb: Namespace,
+    vobj: "Union[Objects.VolumeObject, dfxml_reader.VolumeRecord]",
+    container_image: Optional[_DeferredTrace],
+    **kwargs: Any
+) -> URIRef:
+    return volumeobject_to_trace(
+        graph,
+        ns_kb,
+        vobj,
+        container_image_trace=(
+            None if container_image is None else container_image.resolve()
+        ),
+        **kwargs
+    )
+
+
+# Each worker process interns the Hash nodes it emits.
+_worker_hash_interner: Optional[HashInterner] = None
+
+
+def _init_worker(hash_cache_size: int) -> None:
+    global _worker_hash_interner
+    _worker_hash_interner = HashInterner(maxsize=hash_cache_size)
+
+
+def _map_file_chunk(
+    kb_prefix_iri: str,
+    chunk: List[Tuple[int, dfxml_reader.FileRecord, Optional[URIRef]]],
+    use_inherent_uuids: bool,
+    delta_annotations: bool,
+    run_uuid: Optional[uuid.UUID],
+    demo_uuid_base: Optional[str],
+) -> List[Triple]:
+    """
+    Worker-process function.  Maps a run of files, each with its ordinal in the input and its parent trace, and returns the resulting triples.  If run_uuid is provided, IRIs are minted in counter mode, with run_uuid.  If demo_uuid_base is provided, non-random UUIDs are derived from it.  Non-random IRIs are derived from each file's ordinal, so they do not depend on how files were divided into runs.
+    """
+    ns_kb = Namespace(kb_prefix_iri)
+    if run_uuid is None and demo_uuid_base is None:
+        node_minter = default_minter(ns_kb)
+    else:
+        node_minter = NodeMinter(
+            ns_kb,
+            counter=run_uuid is not None,
+            demo_uuid_base=demo_uuid_base,
+            run_uuid=run_uuid,
+        )
+    sink = ListSink()
+    for ordinal, fobj, parent_trace in chunk:
+        node_minter.begin_file(ordinal)
+        fileobject_to_trace(
+            sink,
+            ns_kb,
+            fobj,
+            delta_annotations=delta_annotations,
+            hash_interner=_worker_hash_interner,
+            node_minter=node_minter,
+            parent_trace=parent_trace,
+            use_inherent_uuids=use_inherent_uuids,
+        )
+        node_minter.end_file()
+    return sink.triples
+
+
+class _ParallelFileMapper:
+    """
+    Maps runs of file records in worker processes, and merges the resulting triples into the target graph or sink in input order.
+
+    Images and volumes are few, and are mapped by the calling process, so every file's parent trace is known when its run is submitted.
+    """
+
+    def __init__(
+        self,
+        target: GraphLike,
+        ns_kb: Namespace,
+        *args: Any,
+        jobs: int,
+        chunk_size: int,
+        delta_annotations: bool = False,
+        hash_cache_size: int = 0,
+        node_minter: Optional[NodeMinter] = None,
+        use_inherent_uuids: bool = False,
+        **kwargs: Any
+    ) -> None:
+        self.delta_annotations = delta_annotations
+        # Workers mint in counter mode if the calling process does, and
+        # derive non-random UUIDs from the same demo base.
+        self.run_uuid: Optional[uuid.UUID] = (
+            None if node_minter is None else node_minter.run_uuid
+        )
+        self.demo_uuid_base: Optional[str] = (
+            None if node_minter is None else node_minter.demo_uuid_base
+        )
+        self.target = target
+        self.ns_kb = ns_kb
+        self.jobs = jobs
+        self.chunk_size = chunk_size
+        self.use_inherent_uuids = use_inherent_uuids
+        self._chunk: List[Tuple[int, dfxml_reader.FileRecord, Optional[URIRef]]] = []
+        import concurrent.futures
+
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(hash_cache_size,),
+        )
+        self._pending: Deque["concurrent.futures.Future[List[Triple]]"] = (
+            collections.deque()
+        )
+
+    def add(
+        self,
+        ordinal: int,
+        fobj: dfxml_reader.FileRecord,
+        parent_trace: Optional[URIRef],
+    ) -> None:
+        """
+        Queue a file for mapping.  ordinal is the file's position among all the files of the input, counting from 1, from which its non-random IRIs are derived.
+        """
+        self._chunk.append((ordinal, fobj, parent_trace))
+        if len(self._chunk) >= self.chunk_size:
+            self._submit()
+
+    def close(self) -> None:
+        self.drain()
+        self._executor.shutdown()
+
+    def drain(self) -> None:
+        """
+        Map the files added so far, and merge their triples into the target.
+        """
+        if len(self._chunk) > 0:
+            self._submit()
+        while len(self._pending) > 0:
+            self._merge(self._pending.popleft())
+
+    def _merge(self, future: "concurrent.futures.Future[List[Triple]]") -> None:
+        add_triples(self.target, future.result())
+        if isinstance(self.target, TripleSink):
+            self.target.flush()
+
+    def _submit(self) -> None:
+        self._pending.append(
+            self._executor.submit(
+                _map_file_chunk,
+                str(self.ns_kb),
+                self._chunk,
+                self.use_inherent_uuids,
+                self.delta_annotations,
+                self.run_uuid,
+                self.demo_uuid_base,
+            )
+        )
+        self._chunk = []
+        # Bound the number of runs held in memory.
+        while len(self._pending) > 2 * self.jobs:
+            self._merge(self._pending.popleft())
+
+
+def dfxml_classes() -> Tuple[Tuple[Any, ...], Tuple[Any, ...], Tuple[Any, ...]]:
+    """
+    Return the classes of DFXML disk images, volumes and files this module maps: those of case_dfxml.dfxml_reader, and those of dfxml.objects if it has been imported.  Instances of dfxml.objects classes can only exist once dfxml.objects is imported, so it is not imported here.
+    """
+    image_classes: Tuple[Any, ...] = (dfxml_reader.DiskImageRecord,)
+    volume_classes: Tuple[Any, ...] = (dfxml_reader.VolumeRecord,)
+    file_classes: Tuple[Any, ...] = (dfxml_reader.FileRecord,)
+    objects_module = sys.modules.get("dfxml.objects")
+    if objects_module is not None:
+        image_classes += (objects_module.DiskImageObject,)
+        volume_classes += (objects_module.VolumeObject,)
+        file_classes += (objects_module.FileObject,)
+    return (image_classes, volume_classes, file_classes)
+
+
+class EventMapper:
+    """
+    Maps a stream of DFXML events, as yielded by dfxml.objects.iterparse or case_dfxml.dfxml_reader.iterparse, into target, one event at a time with map_event.  Disk images and volumes are kept on stacks while open, to relate their contents to them.  Under delta_annotations, only changed objects are mapped, and their containers are mapped when first needed.  If parallel_file_mapper is provided, files are mapped by it instead of in the calling process.  If run_stats is provided, mapped objects are counted in it.
+
+    >>> ns_kb = Namespace("http://example.org/kb/")
+    >>> volume_record = dfxml_reader.VolumeRecord()
+    >>> volume_record.ftype_str = "ntfs"
+    >>> unchanged_record = dfxml_reader.FileRecord()
+    >>> unchanged_record.filename = "a.txt"
+    >>> new_record = dfxml_reader.FileRecord()
+    >>> new_record.filename = "b.txt"
+    >>> new_record.annos = {"new"}
+    >>> sink = ListSink()
+    >>> event_mapper = EventMapper(sink, ns_kb, delta_annotations=True)
+    >>> for event, obj in [("start", volume_record), ("end", unchanged_record), ("end", new_record), ("end", volume_record)]:
+    ...     event_mapper.map_event(event, obj)
+    >>> event_mapper.files_read
+    2
+    >>> sorted(str(o) for (s, p, o) in sink.triples if p == NS_UCO_OBSERVABLE.filePath)
+    ['b.txt']
+    >>> sum(1 for (s, p, o) in sink.triples if o == NS_UCO_OBSERVABLE.FileSystem)
+    1
+    """
+
+    def __init__(
+        self,
+        target: GraphLike,
+        ns_kb: Namespace,
+        *args: Any,
+        delta_annotations: bool = False,
+        hash_interner: Optional[HashInterner] = None,
+        node_minter: Optional[NodeMinter] = None,
+        parallel_file_mapper: Optional[_ParallelFileMapper] = None,
+        run_stats: Optional["RunStats"] = None,
+        use_inherent_uuids: bool = False,
+        **kwargs: Any
+    ) -> None:
+        self.target = target
+        self.ns_kb = ns_kb
+        self.delta_annotations = delta_annotations
+        self.hash_interner = hash_interner
+        self.node_minter = default_minter(ns_kb) if node_minter is None else node_minter
+        self.parallel_file_mapper = parallel_file_mapper
+        self.run_stats = run_stats
+        self.use_inherent_uuids = use_inherent_uuids
+        # Files read, including unchanged files skipped under
+        # delta_annotations.
+        self.files_read = 0
+        self._image_stack: List[_DeferredTrace] = []
+        self._object_stack: List[_DeferredTrace] = []
+        # The classes of disk images, volumes and files, from
+        # dfxml_classes on the first event.
+        self._classes: Optional[Tuple[Tuple[Any, ...], ...]] = None
+        if delta_annotations:
+            _inline_delta_annotation_definition(target)
+
+    def _count(self, name: str, increment: int = 1) -> None:
+        if self.run_stats is not None:
+            self.run_stats.count(name, increment)
+
+    def map_event(self, event: str, obj: Any) -> None:
+        if self._classes is None:
+            self._classes = dfxml_classes()
+        image_classes, volume_classes, file_classes = self._classes
+        if event == "start":
+            if isinstance(obj, image_classes):
+                deferred_trace = _DeferredTrace(
+                    functools.partial(_image_to_trace, self.target, self.node_minter)
+                )
+                self._image_stack.append(deferred_trace)
+                self._object_stack.append(deferred_trace)
+                if not self.delta_annotations:
+                    deferred_trace.resolve()
+            elif isinstance(obj, volume_classes):
+                deferred_trace = _DeferredTrace(
+                    functools.partial(
+                        _deferred_volume_trace,
+                        self.target,
+                        self.ns_kb,
+                        obj,
+                        None if len(self._image_stack) == 0 else self._image_stack[-1],
+                        delta_annotations=self.delta_annotations,
+                        node_minter=self.node_minter,
+                        use_inherent_uuids=self.use_inherent_uuids,
+                    )
+                )
+                self._object_stack.append(deferred_trace)
+                if not self.delta_annotations or len(obj.annos & CHANGE_ANNOS) > 0:
+                    deferred_trace.resolve()
+        elif event == "end":
+            if isinstance(obj, image_classes):
+                self._image_stack.pop()
+                if self._object_stack.pop().resolved:
+                    self._count("images")
+            elif isinstance(obj, volume_classes):
+                if self._object_stack.pop().resolved:
+                    self._count("volumes")
+                    if obj.ftype_str != "7z" and obj.partition_offset is not None:
+                        # The volume's Contained_Within relationship.
+                        self._count("relationships")
+            elif isinstance(obj, file_classes):
+                self.files_read += 1
+                if self.delta_annotations and len(obj.annos & CHANGE_ANNOS) == 0:
+                    # Unchanged file.
+                    return
+                # Map the file's containers, if they were deferred.
+                parent_trace = (
+                    None
+                    if len(self._object_stack) == 0
+                    else self._object_stack[-1].resolve()
+                )
+                self._count("files")
+                self._count(
+                    "hashes",
+                    sum(1 for x in HASH_FIELDS if getattr(obj, x.field_name)),
+                )
+                if parent_trace is not None:
+                    self._count("relationships")
+                if self.parallel_file_mapper is None:
+                    self.node_minter.begin_file(self.files_read)
+                    fileobject_to_trace(
+                        self.target,
+                        self.ns_kb,
+                        obj,
+                        delta_annotations=self.delta_annotations,
+                        hash_interner=self.hash_interner,
+                        node_minter=self.node_minter,
+                        parent_trace=parent_trace,
+                        use_inherent_uuids=self.use_inherent_uuids,
+                    )
+                    self.node_minter.end_file()
+                else:
+                    self.parallel_file_mapper.add(self.files_read, obj, parent_trace)
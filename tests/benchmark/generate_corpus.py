@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This script writes a synthetic DFXML document of a chosen size, for benchmarking.  The document is written as it is generated, so its size is not bounded by memory.
+
+Files are spread evenly over the volumes of the disk images.  File content is identified by a content number, hashed to produce the file's hashes.  A share of files are empty, and a share repeat earlier content, more often content that is already common, so hash values recur as they do across an operating system installation.  Paths are built from a fixed vocabulary of directory names, with a depth drawn up to a maximum.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import array
+import datetime
+import hashlib
+import random
+from typing import TextIO
+from xml.sax.saxutils import escape
+
+XMLNS_DFXML = "http://www.forensicswiki.org/wiki/Category:Digital_Forensics_XML"
+
+_DIRECTORY_NAMES = [
+    "Program Files",
+    "Users",
+    "Windows",
+    "System32",
+    "AppData",
+    "Local",
+    "Temp",
+    "Documents",
+    "cache",
+    "lib",
+    "share",
+    "src",
+    "usr",
+    "var",
+]
+
+_EPOCH = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+
+# Approximately 12 years, in seconds.
+_TIME_SPAN = 12 * 365 * 24 * 60 * 60
+
+
+def _timestamp(seconds: int) -> str:
+    return (_EPOCH + datetime.timedelta(seconds=seconds)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _hashdigests(content_number: int) -> str:
+    if content_number == 0:
+        contents = b""
+    else:
+        contents = b"content-%d\n" % content_number
+    return "".join(
+        '<hashdigest type="%s">%s</hashdigest>'
+        % (hash_type, hashlib.new(hash_type.lower(), contents).hexdigest())
+        for hash_type in ("MD5", "SHA1", "SHA256")
+    )
+
+
+def write_corpus(
+    out_fh: TextIO,
+    *,
+    images: int = 1,
+    volumes: int = 1,
+    files: int = 1000,
+    duplicate_fraction: float = 0.3,
+    empty_fraction: float = 0.02,
+    max_depth: int = 8,
+    seed: int = 0
+) -> int:
+    """
+    Write a DFXML document of images disk images, each with volumes volumes, holding files files in total.  Returns the number of files written.  The document is determined by the arguments, including seed.
+
+    >>> import io
+    >>> out_fh = io.StringIO()
+    >>> write_corpus(out_fh, images=2, volumes=2, files=10)
+    10
+    >>> out_fh.getvalue().count("<volume>")
+    4
+    """
+    rng = random.Random(seed)
+    volume_count = images * volumes
+    # Content numbers of earlier non-empty files, one entry per file, so
+    # a draw favors content that is already common.
+    earlier_contents = array.array("q")
+    next_content_number = 1
+    files_written = 0
+
+    out_fh.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    out_fh.write('<dfxml xmlns="%s" version="1.1.1">\n' % XMLNS_DFXML)
+    for image_index in range(images):
+        out_fh.write("<diskimageobject>\n")
+        for volume_index in range(volumes):
+            out_fh.write("<volume>\n")
+            out_fh.write(
+                "<partition_offset>%d</partition_offset>\n"
+                % (1048576 * (volume_index + 1))
+            )
+            out_fh.write(
+                "<ftype_str>%s</ftype_str>\n" % rng.choice(("ntfs", "fat32", "ext4"))
+            )
+            # Spread the remainder over the first volumes.
+            volume_number = image_index * volumes + volume_index
+            volume_files = files // volume_count + (
+                1 if volume_number < files % volume_count else 0
+            )
+            for _ in range(volume_files):
+                draw = rng.random()
+                if draw < empty_fraction:
+                    content_number = 0
+                    filesize = 0
+                elif draw < empty_fraction + duplicate_fraction and earlier_contents:
+                    content_number = rng.choice(earlier_contents)
+                    filesize = 11 + len(str(content_number))
+                else:
+                    content_number = next_content_number
+                    next_content_number += 1
+                    filesize = 11 + len(str(content_number))
+                if content_number != 0:
+                    earlier_contents.append(content_number)
+                depth = rng.randint(0, max_depth)
+                path = "/".join(
+                    [rng.choice(_DIRECTORY_NAMES) for _ in range(depth)]
+                    + ["file-%d.dat" % files_written]
+                )
+                crtime = rng.randrange(_TIME_SPAN)
+                mtime = crtime + rng.randrange(_TIME_SPAN - crtime + 1)
+                out_fh.write(
+                    "<fileobject>"
+                    "<filename>%s</filename>"
+                    "<filesize>%d</filesize>"
+                    "<crtime>%s</crtime>"
+                    "<mtime>%s</mtime>"
+                    "<ctime>%s</ctime>"
+                    "<atime>%s</atime>"
+                    '<byte_runs><byte_run file_offset="0" img_offset="%d" len="%d"/></byte_runs>'
+                    "%s"
+                    "</fileobject>\n"
+                    % (
+                        escape(path),
+                        filesize,
+                        _timestamp(crtime),
+                        _timestamp(mtime),
+                        _timestamp(mtime),
+                        _timestamp(mtime + rng.randrange(86400)),
+                        4096 * files_written,
+                        filesize,
+                        _hashdigests(content_number),
+                    )
+                )
+                files_written += 1
+            out_fh.write("</volume>\n")
+        out_fh.write("</diskimageobject>\n")
+    out_fh.write("</dfxml>\n")
+    return files_written
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--images", type=int, default=1)
+    argument_parser.add_argument(
+        "--volumes", type=int, default=1, help="Volumes per disk image."
+    )
+    argument_parser.add_argument(
+        "--files", type=int, default=1000, help="Files in total."
+    )
+    argument_parser.add_argument(
+        "--duplicate-fraction",
+        type=float,
+        default=0.3,
+        help="Share of files repeating the content of an earlier file.",
+    )
+    argument_parser.add_argument(
+        "--empty-fraction", type=float, default=0.02, help="Share of empty files."
+    )
+    argument_parser.add_argument(
+        "--max-depth", type=int, default=8, help="Maximum directory depth of paths."
+    )
+    argument_parser.add_argument("--seed", type=int, default=0)
+    argument_parser.add_argument("out_dfxml")
+    args = argument_parser.parse_args()
+
+    if args.images < 1 or args.volumes < 1:
+        argument_parser.error("--images and --volumes must be at least 1.")
+    if args.duplicate_fraction + args.empty_fraction > 1:
+        argument_parser.error(
+            "--duplicate-fraction and --empty-fraction must not sum above 1."
+        )
+
+    with open(args.out_dfxml, "w", encoding="utf-8") as out_fh:
+        write_corpus(
+            out_fh,
+            images=args.images,
+            volumes=args.volumes,
+            files=args.files,
+            duplicate_fraction=args.duplicate_fraction,
+            empty_fraction=args.empty_fraction,
+            max_depth=args.max_depth,
+            seed=args.seed,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This script benchmarks the programs and library functions of case_dfxml over synthetic corpora of increasing size, and writes the results to a JSON file.
+
+For each corpus size, a DFXML document is generated with generate_corpus.py, and each target is run on it in its own process, recording wall time, throughput in files per second, and peak resident set size.  case_to_dfxml reads the graph written by dfxml_to_case for the same corpus.  Between consecutive sizes, a target's time growing faster than its corpus, by more than a tolerance, is reported as super-linear scaling.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Sequence
+
+_logger = logging.getLogger(os.path.basename(__file__))
+
+srcdir = Path(__file__).parent
+
+LIBRARY_TARGETS = ("dfxml_reader", "fileobject_to_trace")
+PROGRAM_TARGETS = ("dfxml_to_case", "case_to_dfxml")
+TARGETS = LIBRARY_TARGETS + PROGRAM_TARGETS
+
+
+class Measurement(NamedTuple):
+    target: str
+    files: int
+    wall_seconds: float
+    peak_rss_bytes: int
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+
+def _run_library_target(target: str, in_dfxml: str) -> None:
+    """
+    Run a library target in this process.  Mapped triples are discarded as each file is mapped.
+    """
+    from rdflib import Namespace
+
+    from case_dfxml import dfxml_reader
+
+    events = dfxml_reader.iterparse(in_dfxml)
+    if target == "dfxml_reader":
+        for _ in events:
+            pass
+        return
+
+    from case_dfxml.sinks import ListSink
+    from case_dfxml.traces import fileobject_to_trace, volumeobject_to_trace
+
+    ns_kb = Namespace("http://example.org/kb/")
+    sink = ListSink()
+    n_volume = None
+    for event, record in events:
+        if isinstance(record, dfxml_reader.VolumeRecord) and event == "start":
+            n_volume = volumeobject_to_trace(sink, ns_kb, record)
+        elif isinstance(record, dfxml_reader.FileRecord):
+            fileobject_to_trace(sink, ns_kb, record, parent_trace=n_volume)
+        sink.triples.clear()
+
+
+def measure(target: str, files: int, command: Sequence[str]) -> Measurement:
+    """
+    Run command in a child process, and measure its wall time and peak resident set size.
+    """
+    _logger.debug("Running %r.", command)
+    start_time = time.perf_counter()
+    process = subprocess.Popen(command)
+    _, status, rusage = os.wait4(process.pid, 0)
+    wall_seconds = time.perf_counter() - start_time
+    # Reap the process in the subprocess module's own bookkeeping.
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
+    # ru_maxrss is in kibibytes on Linux, and in bytes on macOS.
+    peak_rss_bytes = rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return Measurement(target, files, wall_seconds, peak_rss_bytes)
+
+
+def super_linear_scaling(
+    measurements: Sequence[Measurement], tolerance: float
+) -> List[Dict[str, Any]]:
+    """
+    Compare each target's measurements at consecutive corpus sizes.  Returns one record per comparison, flagged super_linear if time grew by more than tolerance times the growth in files.
+
+    >>> super_linear_scaling([
+    ...     Measurement("t", 1000, 1.0, 0),
+    ...     Measurement("t", 2000, 2.2, 0),
+    ...     Measurement("t", 4000, 6.6, 0),
+    ... ], 1.25)
+    [{'target': 't', 'from_files': 1000, 'to_files': 2000, 'time_ratio': 2.2, 'scaling_factor': 1.1, 'super_linear': False}, {'target': 't', 'from_files': 2000, 'to_files': 4000, 'time_ratio': 3.0, 'scaling_factor': 1.5, 'super_linear': True}]
+    """
+    comparisons: List[Dict[str, Any]] = []
+    for target in sorted({x.target for x in measurements}):
+        target_measurements = sorted(
+            (x for x in measurements if x.target == target), key=lambda x: x.files
+        )
+        for smaller, larger in zip(target_measurements, target_measurements[1:]):
+            if smaller.wall_seconds <= 0 or smaller.files == larger.files:
+                continue
+            time_ratio = larger.wall_seconds / smaller.wall_seconds
+            scaling_factor = time_ratio / (larger.files / smaller.files)
+            comparisons.append(
+                {
+                    "target": target,
+                    "from_files": smaller.files,
+                    "to_files": larger.files,
+                    "time_ratio": round(time_ratio, 3),
+                    "scaling_factor": round(scaling_factor, 3),
+                    "super_linear": scaling_factor > tolerance,
+                }
+            )
+    return comparisons
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("-d", "--debug", action="store_true")
+    argument_parser.add_argument(
+        "--sizes",
+        default="1000,2000,4000,8000",
+        help="Comma-separated corpus sizes, in files.",
+    )
+    argument_parser.add_argument("--images", type=int, default=1)
+    argument_parser.add_argument(
+        "--volumes", type=int, default=2, help="Volumes per disk image."
+    )
+    argument_parser.add_argument("--duplicate-fraction", type=float, default=0.3)
+    argument_parser.add_argument("--seed", type=int, default=0)
+    argument_parser.add_argument(
+        "--targets",
+        default=",".join(TARGETS),
+        help="Comma-separated targets to run, among: %s." % ", ".join(TARGETS),
+    )
+    argument_parser.add_argument(
+        "--dfxml-to-case-args",
+        default="--fast-reader --streaming",
+        help="Space-separated options for dfxml_to_case.  The default keeps memory use independent of corpus size.",
+    )
+    argument_parser.add_argument(
+        "--case-to-dfxml-args",
+        default="",
+        help="Space-separated options for case_to_dfxml.",
+    )
+    argument_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.25,
+        help="Factor by which time may grow faster than files between consecutive sizes before the growth is reported as super-linear.",
+    )
+    argument_parser.add_argument(
+        "--fail-on-super-linear",
+        action="store_true",
+        help="Exit with status 1 if any super-linear scaling is found.",
+    )
+    argument_parser.add_argument(
+        "--work-dir",
+        help="Directory for generated corpora and outputs.  Defaults to a temporary directory, removed afterwards.",
+    )
+    argument_parser.add_argument(
+        "--run-library-target",
+        choices=LIBRARY_TARGETS,
+        help=argparse.SUPPRESS,
+    )
+    argument_parser.add_argument("results_json", nargs="?")
+    args = argument_parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    if args.run_library_target is not None:
+        # Child-process mode, used by measure.
+        _run_library_target(args.run_library_target, args.results_json)
+        return
+
+    if args.results_json is None:
+        argument_parser.error("results_json is required.")
+    sizes = sorted(int(x) for x in args.sizes.split(","))
+    targets = [x for x in args.targets.split(",") if x != ""]
+    for target in targets:
+        if target not in TARGETS:
+            argument_parser.error("Unrecognized target: %r." % target)
+
+    temporary_directory = None
+    if args.work_dir is None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        work_dir = Path(temporary_directory.name)
+    else:
+        work_dir = Path(args.work_dir)
+        work_dir.mkdir(parents=True, exist_ok=True)
+
+    measurements: List[Measurement] = []
+    try:
+        for files in sizes:
+            in_dfxml = work_dir / ("corpus-%d.dfxml" % files)
+            out_graph = work_dir / ("corpus-%d.nt" % files)
+            out_dfxml = work_dir / ("corpus-%d-2.dfxml" % files)
+            _logger.info("Generating a corpus of %d files.", files)
+            subprocess.run(
+                [
+                    sys.executable,
+                    str(srcdir / "generate_corpus.py"),
+                    "--images",
+                    str(args.images),
+                    "--volumes",
+                    str(args.volumes),
+                    "--files",
+                    str(files),
+                    "--duplicate-fraction",
+                    str(args.duplicate_fraction),
+                    "--seed",
+                    str(args.seed),
+                    str(in_dfxml),
+                ],
+                check=True,
+            )
+            dfxml_to_case_command = (
+                [sys.executable, "-m", "case_dfxml.dfxml_to_case"]
+                + args.dfxml_to_case_args.split()
+                + [str(in_dfxml), str(out_graph)]
+            )
+            # Targets run in TARGETS order, so dfxml_to_case, if
+            # selected, writes the graph case_to_dfxml reads.
+            for target in TARGETS:
+                if target not in targets:
+                    continue
+                if target == "dfxml_to_case":
+                    command = dfxml_to_case_command
+                elif target == "case_to_dfxml":
+                    if not out_graph.exists():
+                        # Produce the input graph without measuring it.
+                        subprocess.run(dfxml_to_case_command, check=True)
+                    command = (
+                        [sys.executable, "-m", "case_dfxml.case_to_dfxml"]
+                        + args.case_to_dfxml_args.split()
+                        + [str(out_graph), str(out_dfxml)]
+                    )
+                else:
+                    command = [
+                        sys.executable,
+                        __file__,
+                        "--run-library-target",
+                        target,
+                        str(in_dfxml),
+                    ]
+                measurement = measure(target, files, command)
+                _logger.info(
+                    "%s: %d files in %.2fs (%.0f files/s), peak RSS %.1f MiB.",
+                    target,
+                    files,
+                    measurement.wall_seconds,
+                    measurement.files_per_second,
+                    measurement.peak_rss_bytes / (1 << 20),
+                )
+                measurements.append(measurement)
+            for path in (in_dfxml, out_graph, out_dfxml):
+                if path.exists():
+                    path.unlink()
+    finally:
+        if temporary_directory is not None:
+            temporary_directory.cleanup()
+
+    scaling = super_linear_scaling(measurements, args.tolerance)
+    results = {
+        "environment": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "options": {
+            "images": args.images,
+            "volumes": args.volumes,
+            "duplicate_fraction": args.duplicate_fraction,
+            "seed": args.seed,
+            "dfxml_to_case_args": args.dfxml_to_case_args,
+            "case_to_dfxml_args": args.case_to_dfxml_args,
+            "tolerance": args.tolerance,
+        },
+        "measurements": [
+            {
+                "target": x.target,
+                "files": x.files,
+                "wall_seconds": round(x.wall_seconds, 4),
+                "files_per_second": round(x.files_per_second, 1),
+                "peak_rss_bytes": x.peak_rss_bytes,
+            }
+            for x in measurements
+        ],
+        "scaling": scaling,
+    }
+    with open(args.results_json, "w") as out_fh:
+        json.dump(results, out_fh, indent=4)
+
+    super_linear = [x for x in scaling if x["super_linear"]]
+    for comparison in super_linear:
+        _logger.warning(
+            "%s scales super-linearly from %d to %d files: time grew %.2f times.",
+            comparison["target"],
+            comparison["from_files"],
+            comparison["to_files"],
+            comparison["time_ratio"],
+        )
+    if args.fail_on_super_linear and len(super_linear) > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
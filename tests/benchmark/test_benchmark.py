@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import collections
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import generate_corpus
+
+from case_dfxml import dfxml_reader
+
+srcdir = Path(__file__).parent
+
+
+def test_generate_corpus() -> None:
+    out_fh = io.StringIO()
+    assert (
+        generate_corpus.write_corpus(
+            out_fh, images=2, volumes=3, files=1000, max_depth=4, seed=1
+        )
+        == 1000
+    )
+    dfxml_text = out_fh.getvalue()
+
+    event_counts: collections.Counter[str] = collections.Counter()
+    md5_counts: collections.Counter[str] = collections.Counter()
+    for event, record in dfxml_reader.iterparse(io.BytesIO(dfxml_text.encode())):
+        event_counts[event + " " + type(record).__name__] += 1
+        if isinstance(record, dfxml_reader.FileRecord):
+            assert record.filename is not None
+            assert record.filename.count("/") <= 4
+            assert record.md5 is not None
+            md5_counts[record.md5] += 1
+    assert event_counts["start DiskImageRecord"] == 2
+    assert event_counts["start VolumeRecord"] == 6
+    assert event_counts["end FileRecord"] == 1000
+    # Content is duplicated, but most content is unique.
+    assert 1000 > len(md5_counts) > 500
+    assert max(md5_counts.values()) > 2
+
+    # The corpus is determined by its arguments.
+    out_fh_2 = io.StringIO()
+    generate_corpus.write_corpus(
+        out_fh_2, images=2, volumes=3, files=1000, max_depth=4, seed=1
+    )
+    assert out_fh_2.getvalue() == dfxml_text
+
+
+def test_run_benchmarks(tmp_path: Path) -> None:
+    results_json = tmp_path / "results.json"
+    subprocess.run(
+        [
+            sys.executable,
+            str(srcdir / "run_benchmarks.py"),
+            "--sizes",
+            "200,400",
+            "--targets",
+            "dfxml_reader",
+            "--work-dir",
+            str(tmp_path),
+            str(results_json),
+        ],
+        check=True,
+    )
+    with results_json.open() as in_fh:
+        results = json.load(in_fh)
+    assert [(x["target"], x["files"]) for x in results["measurements"]] == [
+        ("dfxml_reader", 200),
+        ("dfxml_reader", 400),
+    ]
+    for measurement in results["measurements"]:
+        assert measurement["wall_seconds"] > 0
+        assert measurement["peak_rss_bytes"] > 0
+    assert len(results["scaling"]) == 1
@@ -14,11 +14,70 @@
 #
 # We would appreciate acknowledgement if the software is used.
 
+import json
 import logging
 from pathlib import Path
+from typing import Any, Dict, List, Tuple
 
 import pytest
+from case_utils.namespace import NS_OWL, NS_RDF, NS_UCO_OBSERVABLE
 from dfxml import objects as Objects
+from rdflib import BNode, Dataset, Graph, Namespace, URIRef
+from rdflib.compare import isomorphic
+from rdflib.term import Node
+
+from case_dfxml.namespace import NS_DRAFTING
+
+NS_KB = Namespace("http://example.org/kb/")
+
+DFXML_FILE_PROPERTY_NAMES = (
+    "atime",
+    "crtime",
+    "ctime",
+    "filename",
+    "filesize",
+    "md5",
+    "mtime",
+    "sha1",
+    "sha256",
+)
+
+
+def _kb_iris_as_blank_nodes(graph: Graph) -> Graph:
+    """
+    Return a copy of graph with each kb: node IRI replaced by a blank node, so graphs that differ only in minted IRIs are isomorphic.
+    """
+    blank_nodes: Dict[Node, BNode] = dict()
+
+    def _node(node: Node) -> Node:
+        if isinstance(node, URIRef) and node.startswith(NS_KB):
+            if node not in blank_nodes:
+                blank_nodes[node] = BNode()
+            return blank_nodes[node]
+        return node
+
+    blank_graph = Graph()
+    for triple in graph:
+        blank_graph.add((_node(triple[0]), _node(triple[1]), _node(triple[2])))
+    return blank_graph
+
+
+def _dfxml_objects(in_dfxml: Path) -> List[Tuple[Any, ...]]:
+    """
+    List the mapped properties of the volumes and files of a DFXML file, in document order.
+    """
+    dfxml_objects: List[Tuple[Any, ...]] = []
+    for event, obj in Objects.iterparse(str(in_dfxml)):
+        if event != "end":
+            continue
+        if isinstance(obj, Objects.VolumeObject):
+            dfxml_objects.append(("volume", obj.ftype_str, obj.partition_offset))
+        elif isinstance(obj, Objects.FileObject):
+            dfxml_objects.append(
+                ("file",)
+                + tuple(str(getattr(obj, x)) for x in DFXML_FILE_PROPERTY_NAMES)
+            )
+    return dfxml_objects
 
 
 @pytest.mark.parametrize(
@@ -90,3 +149,116 @@ def test_single_filesystem_single_file_round_trip() -> None:
             )
     assert volumeobject_count > 0, "No file systems emitted."
     assert fileobject_count > 0, "No files emitted."
+
+
+def test_jobs_output_matches_serial_output() -> None:
+    srcdir = Path(__file__).parent
+    serial_graph = Graph()
+    serial_graph.parse(str(srcdir / "single_filesystem_multiple_files_1_jobs_1.nt"))
+    parallel_graph = Graph()
+    parallel_graph.parse(str(srcdir / "single_filesystem_multiple_files_1_jobs_4.nt"))
+    assert len(serial_graph) > 0, "No triples emitted."
+    assert set(serial_graph) == set(parallel_graph)
+
+
+@pytest.mark.parametrize(
+    ["in_graph"],
+    [
+        ("single_file_0_2_deltas.ttl",),
+        ("single_filesystem_single_file_0_2_deltas.ttl",),
+    ],
+)
+def test_delta_of_round_trip(in_graph: str) -> None:
+    """
+    The round trips compared in the deltas fixtures change nothing, so the delta graph only defines the annotation property.
+    """
+    srcdir = Path(__file__).parent
+    graph = Graph()
+    graph.parse(str(srcdir / in_graph))
+    assert (
+        NS_DRAFTING.deltaAnnotation,
+        NS_RDF.type,
+        NS_OWL.DatatypeProperty,
+    ) in graph
+    assert len(list(graph.subjects(NS_RDF.type, NS_UCO_OBSERVABLE.File))) == 0
+    assert len(list(graph.subjects(NS_DRAFTING.deltaAnnotation, None))) == 0
+
+
+@pytest.mark.parametrize(
+    ["in_graph"],
+    [
+        ("single_filesystem_single_file_1_counter.ttl",),
+        ("single_filesystem_single_file_1_fast_reader.ttl",),
+        ("single_filesystem_single_file_1_store.ttl",),
+        ("single_filesystem_single_file_1_streaming.ttl",),
+    ],
+)
+def test_dfxml_to_case_mode(in_graph: str) -> None:
+    srcdir = Path(__file__).parent
+    expected_graph = Graph()
+    expected_graph.parse(str(srcdir / "single_filesystem_single_file_1.ttl"))
+    computed_graph = Graph()
+    computed_graph.parse(str(srcdir / in_graph))
+    assert isomorphic(
+        _kb_iris_as_blank_nodes(expected_graph),
+        _kb_iris_as_blank_nodes(computed_graph),
+    )
+
+
+def test_dfxml_to_case_graph_name() -> None:
+    srcdir = Path(__file__).parent
+    expected_graph = Graph()
+    expected_graph.parse(str(srcdir / "single_filesystem_single_file_1.ttl"))
+    dataset = Dataset()
+    dataset.parse(
+        str(srcdir / "single_filesystem_single_file_1_graph_name.nq"), format="nquads"
+    )
+    named_graphs = [x for x in dataset.graphs() if len(x) > 0]
+    assert [x.identifier for x in named_graphs] == [URIRef("http://example.org/graph")]
+    assert isomorphic(
+        _kb_iris_as_blank_nodes(expected_graph),
+        _kb_iris_as_blank_nodes(named_graphs[0]),
+    )
+
+
+def test_dfxml_to_case_shards() -> None:
+    srcdir = Path(__file__).parent
+    shards_dir = srcdir / "single_filesystem_multiple_files_1_shards"
+    with (shards_dir / "manifest.json").open() as in_fh:
+        manifest = json.load(in_fh)
+    # 10 files, in shards of 3.
+    assert [x["instances"] for x in manifest["shards"]] == [3, 3, 3, 1]
+    expected_graph = Graph()
+    expected_graph.parse(str(srcdir / "single_filesystem_multiple_files_1_jobs_1.nt"))
+    computed_graph = Graph()
+    for shard in manifest["shards"]:
+        computed_graph.parse(str(shards_dir / shard["path"]), format="nt")
+    assert isomorphic(
+        _kb_iris_as_blank_nodes(expected_graph),
+        _kb_iris_as_blank_nodes(computed_graph),
+    )
+
+
+@pytest.mark.parametrize(
+    ["expected_dfxml", "computed_dfxml"],
+    [
+        ("single_file_2.json.dfxml", "single_file_2_streaming_input.json.dfxml"),
+        (
+            "single_filesystem_single_file_2.dfxml",
+            "single_filesystem_single_file_2_cache.dfxml",
+        ),
+        (
+            "single_filesystem_single_file_2.dfxml",
+            "single_filesystem_single_file_2_incremental.dfxml",
+        ),
+        (
+            "single_filesystem_single_file_2.dfxml",
+            "single_filesystem_single_file_2_store.dfxml",
+        ),
+    ],
+)
+def test_case_to_dfxml_mode(expected_dfxml: str, computed_dfxml: str) -> None:
+    srcdir = Path(__file__).parent
+    expected_objects = _dfxml_objects(srcdir / expected_dfxml)
+    assert len(expected_objects) > 0, "No objects emitted."
+    assert expected_objects == _dfxml_objects(srcdir / computed_dfxml)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import collections
+import io
+
+import pytest
+from case_utils.namespace import NS_RDF, NS_UCO_OBSERVABLE
+from rdflib import Graph
+
+import case_dfxml
+from case_dfxml import dfxml_reader
+from case_dfxml.sinks import NTriplesSink
+
+DFXML_TEXT = ("""\
+<dfxml xmlns="%s" version="1.2.0">
+  <volume>
+    <ftype_str>ntfs</ftype_str>
+    <fileobject>
+      <filename>a.txt</filename>
+      <filesize>3</filesize>
+      <hashdigest type="md5">900150983cd24fb0d6963f7d28e17f72</hashdigest>
+    </fileobject>
+    <fileobject>
+      <filename>b.txt</filename>
+      <filesize>0</filesize>
+    </fileobject>
+  </volume>
+</dfxml>
+""" % dfxml_reader.XMLNS_DFXML).encode()
+
+
+def test_dfxml_to_triples_events() -> None:
+    graph = Graph()
+    out_fh = io.StringIO()
+    sink = NTriplesSink(out_fh)
+    for triple in case_dfxml.dfxml_to_triples(
+        dfxml_reader.iterparse(io.BytesIO(DFXML_TEXT)),
+        ns_kb="http://example.org/kb/",
+        sink=sink,
+        use_inherent_uuids=True,
+    ):
+        graph.add(triple)
+    sink.close()
+    assert len(graph) == sink.triple_count
+    assert len(set(graph.subjects(NS_RDF.type, NS_UCO_OBSERVABLE.File))) == 2
+    assert len(set(graph.subjects(NS_RDF.type, NS_UCO_OBSERVABLE.FileSystem))) == 1
+    # Both files are related to the volume.
+    assert (
+        len(set(graph.subjects(NS_RDF.type, NS_UCO_OBSERVABLE.ObservableRelationship)))
+        == 2
+    )
+
+
+def test_dfxml_to_triples_objects() -> None:
+    # Bare objects are mapped without relationships to containers.
+    records = [
+        record
+        for (event, record) in dfxml_reader.iterparse(io.BytesIO(DFXML_TEXT))
+        if event == "end"
+    ]
+    graph = Graph()
+    for triple in case_dfxml.dfxml_to_triples(records):
+        graph.add(triple)
+    assert len(set(graph.subjects(NS_RDF.type, NS_UCO_OBSERVABLE.File))) == 2
+    assert (
+        len(set(graph.subjects(NS_RDF.type, NS_UCO_OBSERVABLE.ObservableRelationship)))
+        == 0
+    )
+
+
+@pytest.mark.parametrize("as_graph", [True, False])
+def test_round_trip(as_graph: bool) -> None:
+    pytest.importorskip("dfxml")
+    triples = case_dfxml.dfxml_to_triples(
+        dfxml_reader.iterparse(io.BytesIO(DFXML_TEXT))
+    )
+    if as_graph:
+        graph = Graph()
+        for triple in triples:
+            graph.add(triple)
+        events = case_dfxml.case_to_dfxml_events(graph)
+    else:
+        events = case_dfxml.case_to_dfxml_events(triples)
+
+    event_counts: collections.Counter[str] = collections.Counter()
+    filenames = set()
+    for event, obj in events:
+        event_counts[event + " " + type(obj).__name__] += 1
+        if type(obj).__name__ == "FileObject":
+            filenames.add(obj.filename)
+            if obj.filename == "a.txt":
+                assert obj.md5 == "900150983cd24fb0d6963f7d28e17f72"
+        else:
+            assert obj.ftype_str == "ntfs"
+    assert event_counts == {
+        "start VolumeObject": 1,
+        "end FileObject": 2,
+        "end VolumeObject": 1,
+    }
+    assert filenames == {"a.txt", "b.txt"}
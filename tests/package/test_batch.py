@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+Options of dfxml_to_case_batch that are checked before any conversion starts.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+@pytest.mark.parametrize("option", ["--profile", "--progress-file", "--stats"])
+def test_per_run_output_option_rejected(tmp_path: Path, option: str) -> None:
+    manifest_path = tmp_path / "manifest.tsv"
+    manifest_path.write_text("p1.dfxml\tp1.ttl\np2.dfxml\tp2.ttl\n")
+    completed_process = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "case_dfxml.batch",
+            "--manifest",
+            str(manifest_path),
+            option,
+            str(tmp_path / "run.json"),
+        ],
+        stderr=subprocess.PIPE,
+    )
+    assert completed_process.returncode == 2
+    assert option in completed_process.stderr.decode("utf-8")
+    assert not (tmp_path / "p1.ttl").exists()
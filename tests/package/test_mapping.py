@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+File facets, and Hash nodes mapped with and without a case_dfxml.mapping.HashInterner, as with dfxml_to_case --hash-cache-size.
+"""
+
+import hashlib
+import uuid
+from typing import List, Optional
+
+import pytest
+from case_utils.inherent_uuid import get_facet_uriref
+from case_utils.namespace import NS_RDF, NS_UCO_OBSERVABLE, NS_UCO_TYPES
+from rdflib import Namespace
+
+from case_dfxml.dfxml_reader import FileRecord
+from case_dfxml.mapping import HashInterner, file_facet_triples
+from case_dfxml.minting import NodeMinter
+from case_dfxml.sinks import Triple
+
+NS_KB = Namespace("http://example.org/kb/")
+
+RUN_UUID = uuid.UUID("12345678-1234-4234-8234-123456789abc")
+
+
+def _map_files(
+    contents: List[bytes], use_inherent_uuids: bool, hash_cache_size: Optional[int]
+) -> List[Triple]:
+    """
+    Map one file per item of contents, with repeatable IRIs.  If hash_cache_size is None, no HashInterner is used.
+    """
+    node_minter = NodeMinter(NS_KB, counter=True, run_uuid=RUN_UUID)
+    hash_interner = (
+        None if hash_cache_size is None else HashInterner(maxsize=hash_cache_size)
+    )
+    triples: List[Triple] = []
+    for content in contents:
+        record = FileRecord()
+        record.filesize = len(content)
+        record.md5 = hashlib.md5(content).hexdigest()
+        triples.extend(
+            file_facet_triples(
+                node_minter,
+                node_minter.mint("File-"),
+                record,
+                hash_interner=hash_interner,
+                use_inherent_uuids=use_inherent_uuids,
+            )
+        )
+    return triples
+
+
+def _hash_node_count(triples: List[Triple]) -> int:
+    return sum(1 for x in triples if x[1:] == (NS_RDF.type, NS_UCO_TYPES.Hash))
+
+
+@pytest.mark.parametrize("use_inherent_uuids", [False, True])
+@pytest.mark.parametrize("hash_cache_size", [0, 1, 2, 65536])
+def test_interned_triples(use_inherent_uuids: bool, hash_cache_size: int) -> None:
+    contents = [b"a", b"b", b"a", b"a", b"c", b"b"]
+    expected_triples = _map_files(contents, use_inherent_uuids, None)
+    computed_triples = _map_files(contents, use_inherent_uuids, hash_cache_size)
+    # Interning only leaves out repeated Hash node triples, so each
+    # file references the same Hash IRIs.
+    assert set(expected_triples) == set(computed_triples)
+    assert [x for x in expected_triples if x[1] == NS_UCO_OBSERVABLE.hash] == [
+        x for x in computed_triples if x[1] == NS_UCO_OBSERVABLE.hash
+    ]
+    if not use_inherent_uuids:
+        # Minted Hash IRIs are not interned.
+        assert expected_triples == computed_triples
+
+
+@pytest.mark.parametrize(
+    ["hash_cache_size", "expected_hash_node_count"],
+    [
+        # Each file emits its Hash node.
+        (0, 6),
+        # Only the Hash node of the previous file is reused.
+        (1, 5),
+        # "b" is evicted by "c", as "a" was used more recently.
+        (2, 4),
+        # Each distinct Hash node is emitted once.
+        (3, 3),
+    ],
+)
+def test_interner_eviction(hash_cache_size: int, expected_hash_node_count: int) -> None:
+    contents = [b"a", b"b", b"a", b"a", b"c", b"b"]
+    triples = _map_files(contents, True, hash_cache_size)
+    assert _hash_node_count(triples) == expected_hash_node_count
+
+
+def test_inherent_facets() -> None:
+    # Only ContentDataFacet IRIs are inherent; FileFacet IRIs are minted.
+    node_minter = NodeMinter(NS_KB, counter=True, run_uuid=RUN_UUID)
+    n_file = node_minter.mint("File-")
+    record = FileRecord()
+    record.filename = "a.txt"
+    record.filesize = 1
+    triples = file_facet_triples(node_minter, n_file, record, use_inherent_uuids=True)
+    facets = {o: s for (s, p, o) in triples if p == NS_RDF.type}
+    assert facets[NS_UCO_OBSERVABLE.ContentDataFacet] == get_facet_uriref(
+        n_file, NS_UCO_OBSERVABLE.ContentDataFacet, namespace=NS_KB
+    )
+    assert facets[NS_UCO_OBSERVABLE.FileFacet] != get_facet_uriref(
+        n_file, NS_UCO_OBSERVABLE.FileFacet, namespace=NS_KB
+    )
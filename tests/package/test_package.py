@@ -14,8 +14,14 @@
 #
 # We would appreciate acknowledgement if the software is used.
 
-from case_dfxml import foo
+import pytest
+
+import case_dfxml
+from case_dfxml import api
 
 
 def test_package() -> None:
-    assert foo() == "x"
+    for name in case_dfxml.__all__:
+        assert getattr(case_dfxml, name) is getattr(api, name)
+    with pytest.raises(AttributeError):
+        getattr(case_dfxml, "foo")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+Conversions reading standard input and writing standard output, as in a shell pipeline.
+"""
+
+import gzip
+import subprocess
+import sys
+from typing import List
+
+import pytest
+from case_utils.namespace import NS_UCO_OBSERVABLE
+from rdflib import Graph, Literal
+
+from case_dfxml import dfxml_reader
+
+DFXML_TEXT = ("""\
+<dfxml xmlns="%s" version="1.2.0">
+  <volume>
+    <ftype_str>ntfs</ftype_str>
+    <fileobject>
+      <filename>a.txt</filename>
+      <filesize>3</filesize>
+    </fileobject>
+  </volume>
+</dfxml>
+""" % dfxml_reader.XMLNS_DFXML).encode("utf-8")
+
+
+@pytest.mark.parametrize(
+    ["options", "compress"],
+    [
+        (["--output-format", "nt"], False),
+        (["--output-format", "nt", "--streaming"], False),
+        (["--output-format", "nt", "--input-compression", "gzip"], True),
+    ],
+)
+def test_dfxml_to_case_stdio(options: List[str], compress: bool) -> None:
+    completed_process = subprocess.run(
+        [sys.executable, "-m", "case_dfxml.dfxml_to_case"] + options + ["-", "-"],
+        input=gzip.compress(DFXML_TEXT) if compress else DFXML_TEXT,
+        check=True,
+        stdout=subprocess.PIPE,
+    )
+    graph = Graph()
+    graph.parse(data=completed_process.stdout.decode("utf-8"), format="nt")
+    assert len(list(graph.subjects(NS_UCO_OBSERVABLE.filePath, Literal("a.txt")))) == 1
+
+
+def test_case_to_dfxml_stdin_requires_format() -> None:
+    completed_process = subprocess.run(
+        [sys.executable, "-m", "case_dfxml.case_to_dfxml", "-", "-"],
+        input=b"",
+        stderr=subprocess.PIPE,
+    )
+    assert completed_process.returncode == 2
+    assert b"--input-format" in completed_process.stderr
+
+
+def test_case_to_dfxml_streaming_stdin_unsupported() -> None:
+    pytest.importorskip("dfxml")
+    # A remote @context is not supported by the streaming reader.
+    completed_process = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "case_dfxml.case_to_dfxml",
+            "--input-format",
+            "json-ld",
+            "--streaming-input",
+            "-",
+            "-",
+        ],
+        input=b'{"@context": "http://example.org/context.jsonld", "@graph": []}',
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    assert completed_process.returncode == 2
+    assert b"--streaming-input" in completed_process.stderr
+    assert b"Traceback" not in completed_process.stderr
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+Platform portability: the modules that use Unix-only facilities, such as the resource module, must still import and run where those are unavailable, as on Windows.
+"""
+
+import json
+import subprocess
+import sys
+
+# Setting a sys.modules entry to None makes importing that module raise ImportError.
+WITHOUT_RESOURCE = """
+import sys
+sys.modules["resource"] = None
+"""
+
+STATS_REPORT = """
+import json
+from case_dfxml import stats
+run_stats = stats.RunStats("example")
+with run_stats.phase("map"):
+    run_stats.count("files")
+print(json.dumps(run_stats.report()))
+"""
+
+
+def _run(script: str) -> str:
+    completed_process = subprocess.run(
+        [sys.executable, "-c", script], check=True, stdout=subprocess.PIPE
+    )
+    return completed_process.stdout.decode("utf-8")
+
+
+def test_stats_without_resource() -> None:
+    report = json.loads(_run(WITHOUT_RESOURCE + STATS_REPORT))
+    assert report["peak_rss_bytes"] is None
+    assert report["children_peak_rss_bytes"] is None
+    assert report["cpu_seconds"] >= 0
+    assert report["counters"] == {"files": 1}
+
+
+PROGRESS_REPORT = """
+import io
+from case_dfxml import progress
+
+def open_unavailable(*args, **kwargs):
+    raise OSError("/proc is unavailable")
+
+# Shadows the built-in open, so /proc/self/statm cannot be read either.
+progress.open = open_unavailable
+side_channel = io.StringIO()
+progress_reporter = progress.ProgressReporter("example", "parse", interval=0, side_channel=side_channel)
+progress_reporter.finish(10)
+print(side_channel.getvalue())
+"""
+
+
+def test_progress_without_resource() -> None:
+    record = json.loads(_run(WITHOUT_RESOURCE + PROGRESS_REPORT))
+    assert record["done"] is True
+    assert record["rss_bytes"] is None
+
+
+MINT_WITHOUT_FORK = """
+import os
+del os.register_at_fork
+from case_dfxml import minting
+print(minting.random_uuids(1)[0])
+"""
+
+
+def test_minting_without_fork() -> None:
+    assert len(_run(MINT_WITHOUT_FORK).strip()) == 36
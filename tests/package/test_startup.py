@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+The import budget of the command-line programs: importing a program's module and parsing its arguments, up to --help or an argument error, may only import the standard library and case_dfxml.  rdflib, case_utils and dfxml are imported once a conversion starts.
+"""
+
+import json
+import subprocess
+import sys
+from typing import List, Set
+
+import pytest
+
+LIST_MODULES = """
+import json
+import sys
+print(json.dumps(sorted(sys.modules)))
+"""
+
+PARSE_ARGS = """
+import contextlib
+import io
+import json
+import sys
+
+from case_dfxml import %(module)s
+
+with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+    try:
+        %(module)s.parse_args(%(module)s.make_argument_parser(), %(argv)r)
+    except SystemExit:
+        pass
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def _imported_modules(script: str) -> Set[str]:
+    completed_process = subprocess.run(
+        [sys.executable, "-c", script], check=True, stdout=subprocess.PIPE
+    )
+    return set(json.loads(completed_process.stdout))
+
+
+@pytest.mark.parametrize("module", ["case_to_dfxml", "dfxml_to_case"])
+@pytest.mark.parametrize("argv", [["--debug"], ["--jobs", "many", "in", "out"]])
+def test_startup_imports(module: str, argv: List[str]) -> None:
+    # Modules imported by interpreter start-up, e.g. by site.
+    baseline = _imported_modules(LIST_MODULES)
+    imported = _imported_modules(PARSE_ARGS % {"module": module, "argv": argv})
+    over_budget = sorted(
+        x
+        for x in imported - baseline
+        if x.split(".")[0] not in sys.stdlib_module_names
+        and x.split(".")[0] != "case_dfxml"
+    )
+    assert over_budget == []